@@ -0,0 +1,66 @@
+"""
+Benchmark of the import time of BibLy and of building a client.
+
+Each statement runs in a fresh interpreter, so module caches do not carry
+over. Reports the median wall time over ``--repeat`` runs and which backend
+libraries ended up imported. The interpreters run with a temporary home
+directory, so the configuration files the backends write on initialization
+do not end up in the real one.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_import --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_BACKENDS = ("pybliometrics", "sprynger", "pyalex")
+
+_STATEMENTS = {
+    "import bibly": "import bibly",
+    "BibLy(openalex_key)": "from bibly import BibLy; BibLy(openalex_key='bench')",
+    "BibLy(all keys)": "from bibly import BibLy; BibLy(openalex_key='bench', scopus_key='bench', "
+                       "springer_key='bench')",
+}
+
+_TEMPLATE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ",".join(m for m in {backends!r} if m in sys.modules))
+"""
+
+
+def measure(statement: str, repeat: int) -> tuple[float, str]:
+    """Median seconds of ``statement`` in fresh interpreters, and the backends it imported."""
+    times, backends = [], ""
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as home:
+            env = {**os.environ, "HOME": home, "USERPROFILE": home}
+            output = subprocess.run([sys.executable, "-c", _TEMPLATE.format(statement=statement, backends=_BACKENDS)],
+                                    capture_output=True, text=True, check=True, env=env).stdout
+        # Backends may print to stdout on first use, the measurement is the last line
+        output = output.strip().splitlines()[-1].split()
+        times.append(float(output[0]))
+        backends = output[1] if len(output) > 1 else ""
+    return statistics.median(times), backends
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per statement")
+    args = parser.parse_args(argv)
+
+    for name, statement in _STATEMENTS.items():
+        seconds, backends = measure(statement, args.repeat)
+        print(f"{name:<22} {seconds * 1000:8.1f} ms  backends: {backends or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
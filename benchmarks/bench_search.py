@@ -0,0 +1,169 @@
+"""
+Offline benchmark of searching, deduplicating and batching results.
+
+Runs ``BibLy.search`` against the fake backends of :mod:`benchmarks.fakes`
+for each size, unsharded and sharded by year, then the post-processing
+stages, and reports the rows each stage processed, wall time, throughput,
+the time of each handler phase (from :data:`bibly.utils.metrics`) and the
+peak memory traced by :mod:`tracemalloc`.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.bench_search --sizes 1000 100000 1000000 --latency 0.01
+    python -m benchmarks.bench_search --sizes 1000 --json current.json --baseline baseline.json
+
+With ``--baseline``, the exit status is 1 if a stage got slower by more than
+``--tolerance``, so the benchmark can gate regressions in CI.
+"""
+from typing import Callable
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from bibly import BibLy
+from bibly.base_handler import SearchHandler
+from bibly.utils import deduplicate, iter_deduplicate_on_disk, metrics, ResultBatch
+
+from benchmarks.fakes import Corpus, install
+
+_KEYS = {"scopus_key": "bench", "springer_key": "bench", "openalex_key": "bench"}
+
+
+def _measure(func: Callable, memory: bool) -> tuple[float, int, object]:
+    """Run ``func`` and return its wall time, peak traced memory (0 if not traced) and result."""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        value = func()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else 0
+        if memory:
+            tracemalloc.stop()
+    return elapsed, peak, value
+
+
+def _phase_seconds() -> dict[str, float]:
+    """Total time per handler phase recorded since the last reset."""
+    totals: dict[str, float] = {}
+    for labels, histogram in metrics.to_dict()["histograms"].get("phase_seconds", []):
+        totals[labels["phase"]] = totals.get(labels["phase"], 0.0) + histogram["sum"]
+    return totals
+
+
+def run(size: int, latency: float, memory: bool) -> dict:
+    """
+    Benchmark one corpus size.
+
+    :param size: Total number of results of all providers.
+    :param latency: Simulated seconds per request.
+    :param memory: Whether to trace the peak memory (runs each stage a second time).
+
+    :return: The measurements of each stage.
+    """
+    corpus = Corpus(size, latency=latency)
+    install(corpus)
+    client = BibLy(**_KEYS)
+    # A client whose handlers have to split the years into about three shards
+    sharded = BibLy(**_KEYS)
+    for handler in sharded.handlers.values():
+        handler.max_results = max(1, corpus.size // 3)
+    metrics.reset()
+
+    stages = {}
+    elapsed, _, results = _measure(lambda: client.search("benchmark", 2015, 2020), False)
+    if client.errors:
+        raise RuntimeError(f"Benchmark search failed: {client.errors}")
+    stages["search"] = {"rows": len(results), "seconds": elapsed, "phases": _phase_seconds()}
+    metrics.reset()
+    elapsed, _, shard_results = _measure(lambda: sharded.search("benchmark", 2015, 2020, shard=True), False)
+    if sharded.errors:
+        raise RuntimeError(f"Benchmark sharded search failed: {sharded.errors}")
+    stages["shard"] = {"rows": len(shard_results), "seconds": elapsed, "phases": _phase_seconds()}
+    elapsed, _, unique = _measure(lambda: deduplicate(results), False)
+    stages["deduplicate"] = {"rows": len(results), "seconds": elapsed}
+    elapsed, _, _ = _measure(lambda: sum(1 for _ in iter_deduplicate_on_disk(results)), False)
+    stages["disk_dedup"] = {"rows": len(results), "seconds": elapsed}
+    elapsed, _, batch = _measure(lambda: ResultBatch.from_results(results), False)
+    stages["batch"] = {"rows": len(batch), "seconds": elapsed}
+
+    if memory:
+        stages["search"]["peak_bytes"] = _measure(lambda: client.search("benchmark", 2015, 2020), True)[1]
+        stages["shard"]["peak_bytes"] = _measure(
+            lambda: sharded.search("benchmark", 2015, 2020, shard=True), True)[1]
+        stages["deduplicate"]["peak_bytes"] = _measure(lambda: deduplicate(results), True)[1]
+        stages["disk_dedup"]["peak_bytes"] = _measure(
+            lambda: sum(1 for _ in iter_deduplicate_on_disk(results)), True)[1]
+        stages["batch"]["peak_bytes"] = _measure(lambda: ResultBatch.from_results(results), True)[1]
+
+    for stage in stages.values():
+        stage["results_per_second"] = stage["rows"] / stage["seconds"] if stage["seconds"] else None
+    return {"size": size, "results": len(results), "unique": len(unique), "stages": stages}
+
+
+def _report(measurement: dict):
+    print(f"\n{measurement['results']:,} of {measurement['size']:,} results ({measurement['unique']:,} unique)")
+    for name, stage in measurement["stages"].items():
+        line = (f"  {name:<12} {stage['rows']:>10,} rows {stage['seconds']:8.3f}s  "
+                f"{stage['results_per_second'] or 0:12,.0f} results/s")
+        if "peak_bytes" in stage:
+            line += f"  peak {stage['peak_bytes'] / 1024 ** 2:8.1f} MiB"
+        print(line)
+        for phase, seconds in sorted(stage.get("phases", {}).items()):
+            print(f"    {phase:<10} {seconds:8.3f}s")
+
+
+def _regressions(measurements: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """Stages that are slower than in the baseline by more than ``tolerance``."""
+    previous = {m["size"]: m for m in baseline}
+    slower = []
+    for measurement in measurements:
+        reference = previous.get(measurement["size"])
+        if reference is None:
+            continue
+        for name, stage in measurement["stages"].items():
+            before = reference["stages"].get(name, {}).get("seconds")
+            if before and stage["seconds"] > before * (1 + tolerance):
+                slower.append(f"{name} at {measurement['size']:,}: {before:.3f}s -> {stage['seconds']:.3f}s")
+    return slower
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000],
+                        help="Total results per run, e.g. 1000 100000 1000000")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per request")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", help="Write the measurements to this file")
+    parser.add_argument("--baseline", help="Compare against measurements written with --json")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    # The fakes are local, so the provider quotas do not apply
+    for provider in list(SearchHandler.scheduler.buckets):
+        SearchHandler.scheduler.set_rate(provider, 1e9)
+
+    measurements = []
+    for size in args.sizes:
+        measurement = run(size, args.latency, not args.no_memory)
+        _report(measurement)
+        measurements.append(measurement)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(measurements, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            slower = _regressions(measurements, json.load(file), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Offline stand-ins for the backend clients of the handlers.
+
+The fakes mimic the objects of pybliometrics (``ScopusSearch``,
+``ScienceDirectSearch``, ``ArticleMetadata``), sprynger (``Meta``) and pyalex
+(``Works``) closely enough for the handlers' parsing code, and serve a
+deterministic synthetic corpus. Searches and counts are restricted to the
+publication dates of the request, so year windows (e.g. of sharded
+searches) return the right share of the corpus. Each request sleeps for a
+configurable latency. :func:`install` patches them into the handler modules.
+"""
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import Iterator, Optional, Sequence
+import random
+import re
+import time
+
+from bibly.handlers import openalex_handler, sciencedirect_handler, scopus_handler, springer_handler
+
+_WORDS = ("migration integration refugees labour market panel survey evidence germany "
+          "education health language employment policy households children welfare "
+          "networks discrimination asylum wages mobility returns outcomes cohort").split()
+
+ScopusDocument = namedtuple("ScopusDocument", "doi title description author_names coverDate")
+ScienceDirectDocument = namedtuple("ScienceDirectDocument", "doi title authors publicationDate")
+ArticleMetadataEntry = namedtuple("ArticleMetadataEntry", "doi title abstract_text authors coverDate")
+Creator = namedtuple("Creator", "creator")
+SpringerRecord = namedtuple("SpringerRecord", "doi title abstract creators publicationDate")
+
+_DOI_RE = re.compile(r"DOI\(([^)]+)\)")
+_PUBYEAR_FROM_RE = re.compile(r"PUBYEAR > (\d+)")
+_PUBYEAR_TO_RE = re.compile(r"PUBYEAR < (\d+)")
+_YEARS_RE = re.compile(r"(\d{4})-(\d{4})")
+_DATE_FROM_RE = re.compile(r"datefrom:(\S+)")
+_DATE_TO_RE = re.compile(r"dateto:(\S+)")
+
+
+class Corpus:
+    """
+    Deterministic synthetic records, split across the providers.
+
+    Each provider serves an equal share of consecutive records. The ranges of
+    consecutive providers overlap by ``overlap``, so that deduplication has
+    work to do.
+    """
+
+    PROVIDERS = ("Scopus", "ScienceDirect", "Springer", "OpenAlex")
+
+    def __init__(self, size: int, overlap: float = 0.2, latency: float = 0.0, seed: int = 1):
+        """
+        :param size: Total number of results, split evenly across the providers.
+        :param overlap: Share of records a provider shares with the previous one.
+        :param latency: Seconds each request sleeps.
+        :param seed: Seed of the synthetic titles, abstracts and authors.
+        """
+        self.size = size // len(self.PROVIDERS)
+        self.latency = latency
+        step = max(1, int(self.size * (1 - overlap)))
+        self.offsets = {provider: i * step for i, provider in enumerate(self.PROVIDERS)}
+        # Corpus positions of the records of each provider and date window
+        self._matches: dict[tuple, Sequence[int]] = {}
+
+        # Records are assembled from small pools, so that generating the
+        # fixtures costs little compared to the code being measured
+        rng = random.Random(seed)
+        self._titles = [" ".join(rng.choices(_WORDS, k=8)).capitalize() for _ in range(997)]
+        self._abstracts = [" ".join(rng.choices(_WORDS, k=60)) for _ in range(101)]
+        self._authors = [[f"Author{rng.randrange(1000)} Surname{rng.randrange(5000)}" for _ in range(3)]
+                         for _ in range(503)]
+
+    def record(self, i: int) -> dict:
+        """The fields of record ``i``."""
+        return {
+            "doi": f"10.5555/bench.{i}",
+            "title": f"{self._titles[i % 997]} {i}",
+            "abstract": self._abstracts[i % 101],
+            "authors": self._authors[i % 503],
+            "date": self.date(i),
+        }
+
+    @staticmethod
+    def date(i: int) -> str:
+        """The publication date of record ``i``, between 2015 and 2020."""
+        return f"{2015 + i % 6}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+
+    def matches(self,
+                provider: str,
+                date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> Sequence[int]:
+        """The corpus positions of the records of a provider published between the ISO dates, inclusive."""
+        offset = self.offsets[provider]
+        if date_from is None and date_to is None:
+            return range(offset, offset + self.size)
+        key = (provider, date_from, date_to)
+        if key not in self._matches:
+            self._matches[key] = [i for i in range(offset, offset + self.size)
+                                  if (date_from is None or self.date(i) >= date_from)
+                                  and (date_to is None or self.date(i) <= date_to)]
+        return self._matches[key]
+
+    def count(self, provider: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> int:
+        """The number of records of a provider published between the dates."""
+        return len(self.matches(provider, date_from, date_to))
+
+    def records(self,
+                provider: str,
+                start: int = 0,
+                stop: int = None,
+                date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> Iterator[dict]:
+        """The records of a provider in the range ``[start, stop)`` of its result list between the dates."""
+        for i in self.matches(provider, date_from, date_to)[start:stop]:
+            yield self.record(i)
+
+    def wait(self):
+        """Simulate the network latency of one request."""
+        if self.latency:
+            time.sleep(self.latency)
+
+
+def install(corpus: Corpus):
+    """Patch the backend clients of all handler modules to serve ``corpus``."""
+
+    def init(*args, **kwargs):
+        pass
+
+    class ScopusSearch:
+        def __init__(self, query, view=None, download=True, refresh=False, **kwargs):
+            corpus.wait()
+            year_from = _PUBYEAR_FROM_RE.search(query)
+            year_to = _PUBYEAR_TO_RE.search(query)
+            self.window = (f"{int(year_from[1]) + 1}-01-01" if year_from else None,
+                           f"{int(year_to[1]) - 1}-12-31" if year_to else None)
+            self.results = None
+            if download:
+                self.results = [ScopusDocument(r["doi"], r["title"], r["abstract"],
+                                               ";".join(r["authors"]), r["date"])
+                                for r in corpus.records("Scopus", 0, None, *self.window)]
+
+        def get_results_size(self):
+            return corpus.count("Scopus", *self.window)
+
+    class ScienceDirectSearch:
+        def __init__(self, query, date=None, download=True, refresh=False, **kwargs):
+            corpus.wait()
+            years = _YEARS_RE.fullmatch(date or "")
+            self.window = (f"{years[1]}-01-01", f"{years[2]}-12-31") if years else (None, None)
+            self.results = None
+            if download:
+                self.results = [ScienceDirectDocument(r["doi"], r["title"], ";".join(r["authors"]), r["date"])
+                                for r in corpus.records("ScienceDirect", 0, None, *self.window)]
+
+        def get_results_size(self):
+            return corpus.count("ScienceDirect", *self.window)
+
+    class ArticleMetadata:
+        def __init__(self, query, **kwargs):
+            corpus.wait()
+            results = []
+            for doi in _DOI_RE.findall(query):
+                r = corpus.record(int(doi.rsplit(".", 1)[1]))
+                results.append(ArticleMetadataEntry(r["doi"], r["title"], r["abstract"],
+                                                    ";".join(r["authors"]), r["date"]))
+            self.results = results
+
+    class Meta(list):
+        def __init__(self, query, start=1, nr_results=10, refresh=False, **kwargs):
+            corpus.wait()
+            date_from = _DATE_FROM_RE.search(query)
+            date_to = _DATE_TO_RE.search(query)
+            window = (date_from[1] if date_from else None, date_to[1] if date_to else None)
+            super().__init__(SpringerRecord(r["doi"], r["title"], r["abstract"],
+                                            [Creator(a) for a in r["authors"]], r["date"])
+                             for r in corpus.records("Springer", start - 1, start - 1 + nr_results, *window))
+            self.results = SimpleNamespace(total=corpus.count("Springer", *window))
+
+    class Works:
+        def __init__(self):
+            self.window = (None, None)
+
+        def search_filter(self, **kwargs):
+            return self
+
+        def filter(self, from_publication_date=None, to_publication_date=None, **kwargs):
+            self.window = (from_publication_date, to_publication_date)
+            return self
+
+        def select(self, fields):
+            return self
+
+        def count(self):
+            corpus.wait()
+            return corpus.count("OpenAlex", *self.window)
+
+        def paginate(self, per_page=25, cursor="*", n_max=10000, **kwargs):
+            return Paginator(per_page, cursor, n_max, self.window)
+
+    class ResponseList(list):
+        """A page of works with the metadata of the response."""
+
+        def __init__(self, works, meta):
+            super().__init__(works)
+            self.meta = meta
+
+    class Paginator:
+        """Cursor paginator; the fake cursor is the offset of the next page."""
+
+        def __init__(self, per_page, cursor, n_max, window):
+            self.per_page = per_page
+            self.n_max = n_max
+            self.window = window
+            self.n = 0
+            self._next_value = "0" if cursor == "*" else cursor
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            if self._next_value is None or (self.n_max and self.n >= self.n_max):
+                raise StopIteration
+            corpus.wait()
+            start = int(self._next_value)
+            page = [_openalex_work(r) for r in corpus.records("OpenAlex", start, start + self.per_page,
+                                                               *self.window)]
+            if not page:
+                raise StopIteration
+            total = corpus.count("OpenAlex", *self.window)
+            self._next_value = str(start + len(page)) if start + len(page) < total else None
+            self.n += len(page)
+            return ResponseList(page, {"next_cursor": self._next_value})
+
+    for module in (scopus_handler, sciencedirect_handler, springer_handler):
+        module.init = init
+    scopus_handler.ScopusSearch = ScopusSearch
+    sciencedirect_handler.ScienceDirectSearch = ScienceDirectSearch
+    sciencedirect_handler.ArticleMetadata = ArticleMetadata
+    springer_handler.Meta = Meta
+    openalex_handler.Works = Works
+
+    # Serve every page of the corpus, not just the first 500 (Springer)
+    # records, so every size is processed in full
+    springer_handler.SpringerHandler._MAX_RESULTS = max(corpus.size, springer_handler.SpringerHandler._MAX_RESULTS)
+
+
+def _openalex_work(record: dict) -> dict:
+    """An OpenAlex work with an inverted abstract index."""
+    inverted: dict[str, list[int]] = {}
+    for position, word in enumerate(record["abstract"].split()):
+        inverted.setdefault(word, []).append(position)
+    return {
+        "doi": f"https://doi.org/{record['doi']}",
+        "title": record["title"],
+        "abstract_inverted_index": inverted,
+        "authorships": [{"author": {"display_name": a}} for a in record["authors"]],
+        "publication_date": record["date"],
+    }
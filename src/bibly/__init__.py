@@ -1,2 +1,12 @@
 from bibly.client import BibLy
-from bibly.utils.logger import get_logger
\ No newline at end of file
+from bibly.utils.logger import get_logger
+
+__all__ = ["AsyncBibLy", "BibLy", "get_logger"]
+
+
+def __getattr__(name: str):
+    """Import :class:`AsyncBibLy` on first access, so that ``import bibly`` does not load asyncio."""
+    if name == "AsyncBibLy":
+        from bibly.async_client import AsyncBibLy
+        return AsyncBibLy
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
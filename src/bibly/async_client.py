@@ -0,0 +1,184 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+
+from bibly.async_handler import AsyncSearchHandler, ExecutorHandler
+from bibly.base_handler import SearchHandler, _filter_kwargs, _unrequested_fields
+from bibly.client import _filtered_kind, _search_kind
+from bibly.handler_registry import HandlerRegistry
+from bibly.handlers import *
+from bibly.utils import deduplicate as _deduplicate, Filters, ResultCache, SearchResult
+
+logger = logging.getLogger("bibly")
+
+
+class AsyncBibLy:
+    """
+    An asyncio client for BibLy.
+
+    All handlers run on the caller's event loop. Handlers with a native
+    :class:`AsyncSearchHandler` implementation are awaited directly; blocking
+    handlers go through an :class:`ExecutorHandler` on a thread pool owned by
+    the client, with the concurrent calls per API host bounded by a
+    semaphore. Native handlers manage their own connections and concurrency.
+    Results and counts are cached in the optional :class:`ResultCache`
+    under the same keys as by :class:`BibLy`, so both clients can share it.
+
+    Use it as an async context manager, or call :meth:`close`, to release the
+    thread pool.
+    """
+    async def count(self,
+                    query: str,
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    refresh: bool = False,
+                    filters: Optional[Filters] = None) -> dict[str, int]:
+        """
+        Get an approximate count of results for a given query for each API.
+
+        Handlers that fail or time out are left out of the result and reported
+        in :attr:`errors`.
+
+        :param refresh: If True, bypass the cache and overwrite its entries.
+        :param filters: Optional filters, see :meth:`BibLy.search`.
+        """
+        counts, self.errors = await self._gather(
+            {name: (lambda n=name, h=handler: self._cached(
+                        _filtered_kind("count", filters), n, query, year_from, year_to, refresh,
+                        lambda: h.count(query, year_from, year_to, **_filter_kwargs(filters))))
+             for name, handler in self.handlers.items()})
+        return counts
+
+    async def search(self,
+                     query: str,
+                     year_from: Optional[str | int] = None,
+                     year_to: Optional[str | int] = None,
+                     deduplicate: bool = False,
+                     refresh: bool = False,
+                     fields: Optional[list[str]] = None,
+                     filters: Optional[Filters] = None) -> list[SearchResult]:
+        """
+        Search for a given query using the initialized search handlers.
+
+        Same semantics as :meth:`BibLy.search`: results follow handler order,
+        and handlers that fail or time out are reported in :attr:`errors`.
+
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param deduplicate: If True, remove duplicate results, see :meth:`BibLy.search`.
+        :param refresh: If True, bypass the cache and overwrite its entries.
+        :param fields: Optional fields to retrieve, see :meth:`BibLy.search`.
+        :param filters: Optional filters, see :meth:`BibLy.search`.
+
+        :return: List of search results
+        """
+        _unrequested_fields(fields)  # Fail early on unknown fields
+        handler_results, self.errors = await self._gather(
+            {name: (lambda n=name, h=handler: self._cached(
+                        _filtered_kind(_search_kind(fields), filters), n, query, year_from, year_to, refresh,
+                        lambda: h.search(query, year_from, year_to, fields, **_filter_kwargs(filters))))
+             for name, handler in self.handlers.items()})
+
+        results = []
+        for handler_result in handler_results.values():
+            results.extend(handler_result)
+        if deduplicate:
+            results = _deduplicate(results)
+        return results
+
+    async def _gather(self,
+                      tasks: dict[str, Callable[[], Awaitable]]) -> tuple[dict, dict[str, Exception]]:
+        """Await the tasks concurrently and collect their results and errors in task order."""
+        async def run(name: str, task: Callable[[], Awaitable]):
+            try:
+                return await asyncio.wait_for(task(), self.timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{name} did not finish within {self.timeout}s") from None
+
+        outcomes = await asyncio.gather(*(run(name, task) for name, task in tasks.items()),
+                                        return_exceptions=True)
+        results, errors = {}, {}
+        for name, outcome in zip(tasks, outcomes):
+            # Cancellation and interrupts are not handler errors
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+            if isinstance(outcome, Exception):
+                logger.warning(f"{name} skipped: {outcome}")
+                errors[name] = outcome
+            else:
+                results[name] = outcome
+        return results, errors
+
+    async def _cached(self,
+                      kind: str,
+                      name: str,
+                      query: str,
+                      year_from: Optional[str | int],
+                      year_to: Optional[str | int],
+                      refresh: bool,
+                      func: Callable[[], Awaitable]):
+        """Serve a handler call from the cache if possible, otherwise await it and store its result."""
+        if self.cache is None:
+            return await func()
+        # The cache blocks on SQLite, so it is accessed from the thread pool
+        loop = asyncio.get_running_loop()
+        if not refresh:
+            cached = await loop.run_in_executor(self._executor, self.cache.get, kind, name, query, year_from, year_to)
+            if cached is not None:
+                return cached
+        value = await func()
+        await loop.run_in_executor(self._executor, self.cache.set, kind, name, query, year_from, year_to, value)
+        return value
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        """The semaphore shared by all handlers of a host."""
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    def close(self):
+        """Shut down the thread pool of the blocking handlers."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncBibLy":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def __init__(self,
+                 max_per_host: int = 4,
+                 max_threads: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cache: Optional[ResultCache] = None,
+                 **kwargs):
+        """
+        To use the different APIs, you need to provide the corresponding API keys.
+
+        :param max_per_host: Maximum number of concurrent calls per API host.
+        :param max_threads: Size of the thread pool running blocking handlers.
+            Defaults to ``max_per_host`` per handler.
+        :param timeout: Optional time budget in seconds for each handler call.
+            Handlers exceeding it are reported in :attr:`errors`; blocking
+            calls finish in the background and their result is discarded.
+        :param cache: Optional :class:`ResultCache` for the results of ``search``
+            and ``count``.
+        :param kwargs: API keys and handler options, see :class:`BibLy`.
+        """
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.cache = cache
+        # Per-handler errors of the last ``count``/``search`` call
+        self.errors: dict[str, Exception] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+        handlers = HandlerRegistry.initialize_async_handlers(**kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=max_threads or max_per_host * max(1, len(handlers)),
+                                            thread_name_prefix="bibly-async")
+        self.handlers: dict[str, AsyncSearchHandler] = {}
+        for name, handler in handlers.items():
+            if isinstance(handler, SearchHandler):
+                handler = ExecutorHandler(handler, self._semaphore(handler.host or name), self._executor)
+            self.handlers[name] = handler
@@ -0,0 +1,127 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Optional
+import asyncio
+
+from bibly.base_handler import _INIT_LOCK, _filter_kwargs, SearchHandler
+from bibly.utils import Filters, SearchResult
+
+
+class AsyncSearchHandler(ABC):
+    """
+    Abstract base class for search handlers with a native asyncio interface.
+
+    Async handlers are registered in the :class:`HandlerRegistry` like
+    blocking ones and built the same way, with the parameters of the client.
+    Only :class:`AsyncBibLy` uses them; :class:`BibLy` leaves them out.
+    """
+
+    # Define required parameters for initialization
+    required_params: list[str] = []
+
+    # Host serving the API, used to bound concurrent requests per host
+    host: str = ""
+
+    @classmethod
+    def can_initialize(cls, **kwargs) -> bool:
+        """
+        Check if the handler can be initialized with the given parameters.
+
+        :param kwargs: Parameters to validate
+        :return: True if all required parameters are present, False otherwise
+        """
+        return all(param in kwargs and kwargs[param] is not None for param in cls.required_params)
+
+    def __init__(self, **kwargs):
+        """
+        Ensure the handler is initialized during instantiation, one handler at a time.
+
+        :param kwargs: Parameters of the client, e.g. API keys. Subclasses
+            read theirs before calling this constructor.
+        """
+        with _INIT_LOCK:
+            self.initialize()
+
+    @abstractmethod
+    def initialize(self):
+        """
+        Initialize the search handler.
+
+        Runs outside of the event loop, so connections are opened in the
+        coroutines, on the loop of the client.
+        """
+        pass
+
+    @abstractmethod
+    async def count(self,
+                    query: str,
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    filters: Optional[Filters] = None) -> int:
+        """Count the number of results for a given query, see :meth:`SearchHandler.count`."""
+        pass
+
+    @abstractmethod
+    async def search(self,
+                     query: str,
+                     year_from: Optional[str | int] = None,
+                     year_to: Optional[str | int] = None,
+                     fields: Optional[list[str]] = None,
+                     since: Optional[str] = None,
+                     filters: Optional[Filters] = None) -> list[SearchResult]:
+        """Search for a given query, see :meth:`SearchHandler.search`."""
+        pass
+
+
+class ExecutorHandler(AsyncSearchHandler):
+    """
+    Adapter running a blocking :class:`SearchHandler` on an executor.
+
+    The backend libraries of the built-in handlers issue blocking requests
+    with their own HTTP sessions, so each call still occupies one executor
+    thread while it runs. The adapter keeps the event loop free and bounds the
+    number of calls in flight per host with a semaphore shared by all
+    handlers of that host.
+    """
+
+    def __init__(self,
+                 handler: SearchHandler,
+                 semaphore: asyncio.Semaphore,
+                 executor: Optional[Executor] = None):
+        """
+        :param handler: The blocking handler to wrap.
+        :param semaphore: Semaphore bounding the concurrent calls to the handler's host.
+        :param executor: Executor running the calls. Defaults to the loop's default executor.
+        """
+        self.handler = handler
+        self.host = handler.host
+        self.semaphore = semaphore
+        self.executor = executor
+
+    def initialize(self):
+        """The wrapped handler is initialized when it is built."""
+        pass
+
+    async def count(self,
+                    query: str,
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    filters: Optional[Filters] = None) -> int:
+        return await self._run(self.handler.count, query, year_from, year_to, **_filter_kwargs(filters))
+
+    async def search(self,
+                     query: str,
+                     year_from: Optional[str | int] = None,
+                     year_to: Optional[str | int] = None,
+                     fields: Optional[list[str]] = None,
+                     since: Optional[str] = None,
+                     filters: Optional[Filters] = None) -> list[SearchResult]:
+        return await self._run(self.handler.search, query, year_from, year_to, fields, since,
+                               **_filter_kwargs(filters))
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking call on the executor once its host has a free slot."""
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
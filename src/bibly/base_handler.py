@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Callable, ContextManager, Iterator, Optional
+import threading
 
-from bibly.utils import log_count, log_initialization, log_search, SearchResult
+from bibly.utils import (canonical_doi, Filters, log_count, log_initialization, log_search, metrics,
+                         normalize_results, RequestScheduler, ResultBatch, SearchResult)
+
+# Serializes handler initialization, which changes the global configuration
+# of backend libraries (pybliometrics, pyalex, sprynger)
+_INIT_LOCK = threading.RLock()
+# Arguments of the last call of each library configuration function, see _configure
+_CONFIGURED: dict[Callable, tuple] = {}
 
 
 class SearchHandler(ABC):
@@ -10,10 +18,37 @@ class SearchHandler(ABC):
     # Define required parameters for initialization
     required_params: list[str] = []
 
+    # Provider whose quota the requests of the handler count against
+    provider: str = ""
+
+    # Host serving the API, used to bound concurrent requests per host
+    host: str = ""
+
+    # Max number of results a single search can retrieve, or None if unlimited.
+    # Larger searches are split into year ranges when sharding is enabled.
+    max_results: Optional[int] = None
+
+    # Whether ``year_from`` and ``year_to`` may also be ISO dates
+    # (``YYYY-MM-DD``), so that sharding can split a year into months
+    date_windows: bool = False
+
+    # Fields that cost an extra request per batch of results. When searching
+    # with fusion, they are only fetched for results no other provider covers.
+    deferred_fields: tuple[str, ...] = ()
+
+    # Filters (see :class:`Filters`) the API of the handler applies server-side
+    supported_filters: frozenset[str] = frozenset()
+
+    # Scheduler shared by all handlers, so that concurrent searches respect
+    # the provider quotas together. Clients with their own rate limits
+    # replace it on their handlers.
+    scheduler: RequestScheduler = RequestScheduler()
+
     def __init__(self):
-        """Ensure the handler is initialized during instantiation."""
-        self.initialize()
-    
+        """Ensure the handler is initialized during instantiation, one handler at a time."""
+        with _INIT_LOCK:
+            self.initialize()
+
     @classmethod
     def can_initialize(cls, **kwargs) -> bool:
         """
@@ -24,6 +59,16 @@ class SearchHandler(ABC):
         """
         return all(param in kwargs and kwargs[param] is not None for param in cls.required_params)
 
+    def _request(self, func: Callable, *args, **kwargs) -> Any:
+        """Issue a request to the provider through the shared scheduler."""
+        metrics.inc("requests_total", handler=self.__class__.__name__)
+        with self._timer("request"):
+            return self.scheduler.call(self.provider, func, *args, **kwargs)
+
+    def _timer(self, phase: str) -> ContextManager[None]:
+        """Time a phase of this handler in the shared :data:`~bibly.utils.metrics.metrics`."""
+        return metrics.timer(self.__class__.__name__, phase)
+
     @abstractmethod
     @log_initialization
     def initialize(self):
@@ -35,15 +80,229 @@ class SearchHandler(ABC):
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> int:
-        """Count the number of results for a given query."""
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
+        """
+        Count the number of results for a given query.
+
+        :param filters: Optional filters, see :meth:`iter_pages`. Filters
+            applied locally are not reflected in the count.
+        """
         pass
 
     @abstractmethod
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        """
+        Yield the results for a given query page by page, as they are retrieved.
+
+        Pages are normalized column by column afterwards (see
+        :func:`normalize_results`), so handlers pass DOIs, dates and author
+        lists on as the API returns them; authors may be a list of names.
+
+        :param fields: Optional hint of the fields the caller needs. Handlers
+            use it to request less data from the API where possible.
+        :param since: Optional ISO date (``YYYY-MM-DD``). Only records
+            published on or after it are needed, so handlers narrow their date
+            clauses to it, at the granularity their API supports.
+        :param filters: Optional filters. Handlers compile the ones in
+            :attr:`supported_filters` to native filters of their API; the
+            others are applied by :meth:`iter_search`.
+        """
+        pass
+
+    def iter_checkpoints(self,
+                         query: str,
+                         year_from: Optional[str | int] = None,
+                         year_to: Optional[str | int] = None,
+                         fields: Optional[list[str]] = None,
+                         since: Optional[str] = None,
+                         position: Any = None,
+                         filters: Optional[Filters] = None) -> Iterator[tuple[list[SearchResult], Any]]:
+        """
+        Yield the result pages together with the position to resume from after each page.
+
+        Positions are JSON-serializable. Passing one back as ``position``
+        continues with the page after it. The default implementation counts
+        pages and, when resuming, fetches and skips the pages before the
+        position. Handlers whose API can start mid-way override it.
+
+        :param position: A position yielded earlier, or None to start from the first page.
+        """
+        skip = position or 0
+        pages = self.iter_pages(query, year_from, year_to, fields, since, **_filter_kwargs(filters))
+        for number, page in enumerate(pages, start=1):
+            if number > skip:
+                yield page, number
+
+    @abstractmethod
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        """Yield the records of the given DOIs, as far as the API knows them."""
+        pass
+
+    def iter_search(self,
+                    query: str,
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    fields: Optional[list[str]] = None,
+                    since: Optional[str] = None,
+                    filters: Optional[Filters] = None) -> Iterator[SearchResult]:
+        """
+        Yield the results for a given query one by one, fetching the pages lazily.
+
+        Each page is normalized before its results are yielded, see
+        :func:`normalize_results`.
+
+        :param fields: Optional fields to retrieve. Other fields are left empty;
+            ``doi`` and ``source`` are always kept. Defaults to all fields.
+        :param since: Optional ISO date, see :meth:`iter_pages`.
+        :param filters: Optional filters, see :meth:`iter_pages`.
+
+        :raises ValueError: If a filter can neither be pushed to the API nor applied locally.
+        """
+        unrequested = _unrequested_fields(fields)
+        local = self._local_filters(filters)
+        pages = self.iter_pages(query, year_from, year_to, fields, since, **_filter_kwargs(filters))
+        while True:
+            with self._timer("page"):
+                page = next(pages, None)
+            if page is None:
+                return
+            metrics.inc("pages_total", handler=self.__class__.__name__)
+            with self._timer("normalize"):
+                normalize_results(page)
+            if local is not None:
+                page = local.apply(page)
+            for result in page:
+                for name in unrequested:
+                    setattr(result, name, None)
+                yield result
+
     @log_search
     def search(self,
                query: str,
                year_from: Optional[str | int] = None,
-               year_to: Optional[str | int] = None) -> list[SearchResult]:
+               year_to: Optional[str | int] = None,
+               fields: Optional[list[str]] = None,
+               since: Optional[str] = None,
+               filters: Optional[Filters] = None) -> list[SearchResult]:
         """Search for a given query."""
-        pass
+        return list(self.iter_search(query, year_from, year_to, fields, since, filters))
+
+    def search_batch(self,
+                     query: str,
+                     year_from: Optional[str | int] = None,
+                     year_to: Optional[str | int] = None,
+                     fields: Optional[list[str]] = None,
+                     since: Optional[str] = None,
+                     filters: Optional[Filters] = None) -> ResultBatch:
+        """Search for a given query and collect the results in a columnar :class:`ResultBatch`."""
+        return ResultBatch.from_results(self.iter_search(query, year_from, year_to, fields, since, filters))
+
+    def hydrate(self,
+                results: list[SearchResult],
+                fields: Optional[list[str]] = None) -> list[SearchResult]:
+        """
+        Fill in missing fields of search results in place by looking up their DOIs.
+
+        :param results: Search results, e.g. retrieved with a ``fields`` selection.
+        :param fields: The fields to fill in. Defaults to all fields.
+
+        :return: The same results. Results without a DOI are left unchanged.
+        """
+        fields = [name for name in ResultBatch.FIELDS if name not in _unrequested_fields(fields)]
+        incomplete: dict[str, list[SearchResult]] = {}
+        for result in results:
+            if result.doi and any(getattr(result, name) is None for name in fields):
+                incomplete.setdefault(canonical_doi(result.doi), []).append(result)
+        if not incomplete:
+            return results
+
+        for record in normalize_results(list(self.lookup(list(incomplete)))):
+            for result in incomplete.get(canonical_doi(record.doi), []):
+                for name in fields:
+                    if getattr(result, name) is None:
+                        setattr(result, name, getattr(record, name))
+        return results
+
+
+    def _local_filters(self, filters: Optional[Filters]) -> Optional[Filters]:
+        """
+        The filters the handler applies to its results locally, i.e. those its API does not support.
+
+        :raises ValueError: If such a filter cannot be evaluated on a :class:`SearchResult`.
+        """
+        if not filters:
+            return None
+        local = {name: value for name, value in filters.active().items() if name not in self.supported_filters}
+        unsupported = sorted(set(local) - Filters.LOCAL)
+        if unsupported:
+            raise ValueError(f"{self.provider or self.__class__.__name__} cannot filter by {', '.join(unsupported)}")
+        return Filters(**local) if local else None
+
+
+def _configure(init: Callable, *args, **kwargs):
+    """
+    Apply a global configuration of a backend library, e.g. pybliometrics' ``init``.
+
+    Calls are serialized, and skipped if the configuration is unchanged, so
+    building more handlers does not reset a library while other threads use it.
+    """
+    with _INIT_LOCK:
+        if _CONFIGURED.get(init) == (args, kwargs):
+            return
+        init(*args, **kwargs)
+        _CONFIGURED[init] = (args, kwargs)
+
+
+def _filter_kwargs(filters: Optional[Filters]) -> dict:
+    """Pass filters on as keyword argument only if there are any, so handlers without filter support keep working."""
+    return {'filters': filters} if filters else {}
+
+
+def _narrow_year_from(year_from: Optional[str | int], since: Optional[str]) -> Optional[str | int]:
+    """Start year of a search, moved forward to the year of ``since`` if that is later."""
+    if since is None:
+        return year_from
+    since_year = int(since[:4])
+    if year_from is None or since_year > int(year_from):
+        return since_year
+    return year_from
+
+
+def _date_from(year_from: Optional[str | int]) -> Optional[str]:
+    """Start date of a search from a year or an ISO date, see :attr:`SearchHandler.date_windows`."""
+    if not year_from:
+        return None
+    return f'{year_from}-01-01' if len(str(year_from)) == 4 else str(year_from)
+
+
+def _date_to(year_to: Optional[str | int]) -> Optional[str]:
+    """End date of a search from a year or an ISO date, see :attr:`SearchHandler.date_windows`."""
+    if not year_to:
+        return None
+    return f'{year_to}-12-31' if len(str(year_to)) == 4 else str(year_to)
+
+
+def _narrow_date_from(year_from: Optional[str | int], since: Optional[str]) -> Optional[str]:
+    """Start date of a search, moved forward to ``since`` if that is later."""
+    date_from = _date_from(year_from)
+    if since is not None and (date_from is None or since > date_from):
+        return since
+    return date_from
+
+
+def _unrequested_fields(fields: Optional[list[str]]) -> tuple[str, ...]:
+    """Fields of :class:`SearchResult` left out by a selection. ``doi`` and ``source`` are always kept."""
+    if fields is None:
+        return ()
+    unknown = set(fields) - set(ResultBatch.FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s) {sorted(unknown)}, expected a subset of {list(ResultBatch.FIELDS)}")
+    return tuple(name for name in ResultBatch.FIELDS
+                 if name not in fields and name not in ('doi', 'source'))
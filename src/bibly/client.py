@@ -1,55 +1,729 @@
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+import copy
+import logging
+import threading
+import time
 
+from bibly.base_handler import SearchHandler, _filter_kwargs, _unrequested_fields
 from bibly.handler_registry import HandlerRegistry
+from bibly.harvest import HarvestJob
 from bibly.handlers import *
-from bibly.utils import SearchResult, deduplicate as _deduplicate
+from bibly.utils import (CountMemo, CountResult, Deduplicator, export_results, Filters, fuse_fields, IncrementalStore,
+                         index_by_doi, LocalIndex, metrics, near_deduplicate, normalize_query, ResultBatch,
+                         ResultCache, SearchResult, set_provenance, SingleFlight,
+                         TaggedResult, deduplicate as _deduplicate, iter_deduplicate, iter_deduplicate_on_disk,
+                         plan_shards, rewind_date,
+                         RequestScheduler, run_concurrently)
+from bibly.utils.dedup import _normalize_doi, _normalize_title
+
+logger = logging.getLogger("bibly")
 
 
 class BibLy:
-    """A class to create a client for BibLy."""
+    """
+    A class to create a client for BibLy.
+
+    A client can be shared by several threads, e.g. of a web service.
+    Identical ``count`` and ``search`` calls of different threads that run at
+    the same time are coalesced (see :attr:`flights`), and :attr:`errors`
+    holds the errors of the last call of the calling thread.
+    """
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> dict[str, int]:
+              year_to: Optional[str | int] = None,
+              refresh: bool = False,
+              filters: Optional[Filters] = None) -> dict[str, int]:
         """
         Get an approximate count of results for a given query for each API.
+
+        Handlers are queried concurrently. Handlers that fail or time out are
+        left out of the result and reported in :attr:`errors`.
+
+        :param refresh: If True, bypass the cache and overwrite its entries.
+        :param filters: Optional filters, see :meth:`search`.
         """
-        counts = {}
-        for name, handler in self.handlers.items():
-            counts[name] = handler.count(query, year_from, year_to)
+        tasks = {name: (lambda n=name, h=handler: self._cached(
+                            _filtered_kind("count", filters), n, query, year_from, year_to, refresh,
+                            lambda: h.count(query, year_from, year_to, **_filter_kwargs(filters))))
+                 for name, handler in self.handlers.items()}
+        counts, self.errors = self._run(tasks)
+        if not filters:
+            for name, count in counts.items():
+                # Counts served by the cache keep the age of their entry
+                age = self.cache.age("count", name, query, year_from, year_to) if self.cache is not None else None
+                self.count_memo.set(name, query, year_from, year_to, count, age or 0.0)
         return counts
 
+    def estimate_count(self,
+                       query: str,
+                       year_from: Optional[str | int] = None,
+                       year_to: Optional[str | int] = None,
+                       budget: float = 0.5) -> dict[str, CountResult]:
+        """
+        Get the counts for a given query for each API within a latency budget, e.g. while a query is typed.
+
+        Counts of the last ``count_memo.ttl`` seconds are answered from
+        :attr:`count_memo` without a request. Older memoized counts are
+        answered as well, and revalidated in the background. All other
+        handlers are counted concurrently; those that do not finish within
+        ``budget`` are reported as missing and keep counting in the
+        background, so a later call finds their count. Concurrent calls for
+        the same count share one request.
+
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param budget: Seconds to wait for handlers without a memoized count.
+
+        :return: A :class:`CountResult` per handler, in handler order. Failed
+            and late handlers are reported in :attr:`errors`.
+        """
+        deadline = time.monotonic() + budget
+        estimates: dict[str, Optional[CountResult]] = {}
+        pending: dict[str, Future] = {}
+        for name, handler in self.handlers.items():
+            memoized = self.count_memo.get(name, query, year_from, year_to)
+            if memoized is None:
+                estimates[name] = None
+                pending[name] = self._count_in_background(name, handler, query, year_from, year_to)
+                continue
+            count, age = memoized
+            estimates[name] = CountResult(count, "cached", age)
+            if not self.count_memo.is_fresh(age):
+                self._count_in_background(name, handler, query, year_from, year_to)
+
+        wait(pending.values(), timeout=max(0.0, deadline - time.monotonic()))
+        self.errors = {}
+        for name, future in pending.items():
+            if not future.done():
+                self.errors[name] = TimeoutError(f"{name} did not count within {budget}s")
+            elif future.exception() is not None:
+                self.errors[name] = future.exception()
+            else:
+                estimates[name] = CountResult(future.result(), "exact", 0.0)
+                continue
+            estimates[name] = CountResult(None, "missing")
+            logger.debug(f"{name} count missing: {self.errors[name]}")
+        for name, estimate in estimates.items():
+            metrics.inc("count_estimates_total", handler=name, status=estimate.status)
+        return estimates
+
+    def _count_in_background(self,
+                             name: str,
+                             handler: SearchHandler,
+                             query: str,
+                             year_from: Optional[str | int],
+                             year_to: Optional[str | int]) -> Future:
+        """Count with a handler on the background pool and memoize the count, joining a running count of the same key."""
+        key = self.count_memo.key(name, query, year_from, year_to)
+
+        def count() -> int:
+            try:
+                value = handler.count(query, year_from, year_to)
+                self.count_memo.set(name, query, year_from, year_to, value)
+                return value
+            except Exception as e:
+                logger.warning(f"{name} count failed: {e}")
+                raise
+            finally:
+                with self._counting_lock:
+                    del self._counting[key]
+
+        with self._counting_lock:
+            future = self._counting.get(key)
+            if future is None:
+                if self._count_executor is None:
+                    self._count_executor = ThreadPoolExecutor(thread_name_prefix="bibly-count")
+                future = self._counting[key] = self._count_executor.submit(count)
+        return future
+
     def search(self,
                query: str,
                year_from: Optional[str | int] = None,
                year_to: Optional[str | int] = None,
-               deduplicate: bool = False) -> list[SearchResult]:
+               deduplicate: bool | str = False,
+               refresh: bool = False,
+               fields: Optional[list[str]] = None,
+               shard: bool = False,
+               fuse: bool = False,
+               filters: Optional[Filters] = None) -> list[SearchResult]:
         """
         Search for a given query using the initialized search handlers.
 
+        Handlers are queried concurrently. Handlers that fail or time out
+        contribute no results and are reported in :attr:`errors`. Results are
+        always returned in handler order, regardless of which finishes first.
+
         :param query: The search query
         :param year_from: Optional start year for the search
         :param year_to: Optional end year for the search
         :param deduplicate: If True, remove duplicate results. Two entries are
             considered duplicates if they share the same normalized title OR the
-            same (non-empty) DOI. The first occurrence is kept.
+            same (non-empty) DOI. The first occurrence is kept. With
+            ``"near"``, near-duplicates (e.g. titles that differ in
+            punctuation, a subtitle or a typo) are collapsed as well, and each
+            kept entry is completed with the fields of its duplicates (see
+            :func:`near_deduplicate`).
+        :param refresh: If True, bypass the cache and overwrite its entries.
+        :param fields: Optional fields to retrieve, e.g. ``["title", "date"]``.
+            Handlers request less data where the API allows it and leave the
+            other fields empty; ``doi`` and ``source`` are always kept. Missing
+            fields can be loaded later with :meth:`hydrate`.
+        :param shard: If True and both years are given, handlers whose result
+            limit the query exceeds split the year range into windows below
+            that limit (based on ``count``), search them in parallel and
+            merge them in chronological order. Handlers that accept dates
+            (e.g. Springer) split a year over the limit into months and
+            a month into days. A handler fails as a whole, with an error in
+            :attr:`errors`, if any of its windows fails or is over the limit
+            and cannot be split further, so sharded results are never
+            silently truncated.
+        :param fuse: If True, merge the results of all handlers by DOI before
+            fetching expensive fields (e.g. the ScienceDirect abstracts from
+            the Article Metadata API). Such fields are copied from other
+            providers that returned the same DOI and only fetched for the
+            remaining results. Every result gets a ``provenance`` mapping each
+            field to the provider it came from.
+        :param filters: Optional :class:`Filters`, e.g.
+            ``Filters(doc_types=["article"], languages=["en"], open_access=True)``.
+            Each handler compiles them to the native filters of its API, so
+            filtered-out records are not downloaded. Handlers that can neither
+            push nor locally apply a filter are reported in :attr:`errors`.
 
-        :return: List of search results
+        :return: List of search results. If the client has a local index that
+            covers the query (see :meth:`LocalIndex.can_answer`) and none of
+            ``refresh``, ``fields`` and ``filters`` is given, the results come
+            from the index, without duplicates and without querying the providers.
         """
+        _unrequested_fields(fields)  # Fail early on unknown fields
+        if deduplicate not in (True, False, "near"):
+            raise ValueError(f"Unknown deduplicate mode {deduplicate!r}, expected True, False or 'near'")
+        if (self.index is not None and not refresh and fields is None and not filters
+                and self.index.can_answer(query, year_from, year_to)):
+            self.errors = {}
+            logger.info(f"Local index answered query='{query}'")
+            results = self.index.answer(query, year_from, year_to)
+            return near_deduplicate(results) if deduplicate == "near" else results
+
+        search = self._search_sharded if shard else self._search_handler
+        tasks = {}
+        for name, handler in self.handlers.items():
+            handler_fields = _eager_fields(handler, fields) if fuse else fields
+            tasks[name] = (lambda n=name, h=handler, f=handler_fields: self._cached(
+                               _filtered_kind(_search_kind(f, shard), filters), n, query, year_from, year_to, refresh,
+                               lambda: search(h, query, year_from, year_to, f, filters)))
+        handler_results, self.errors = self._run(tasks)
+        if fuse:
+            self._fuse(handler_results, fields)
+
         results = []
-        for handler in self.handlers.values():
-            results.extend(handler.search(query, year_from, year_to))
-        if deduplicate:
+        for handler_result in handler_results.values():
+            results.extend(handler_result)
+        if self.index is not None and fields is None and not filters:
+            # Only a complete result set makes the query answerable locally
+            complete = not self.errors and self._complete(handler_results, query, year_from, year_to)
+            self.index.add(results, query if complete else None, year_from, year_to)
+        if deduplicate == "near":
+            results = near_deduplicate(results)
+        elif deduplicate:
             results = _deduplicate(results)
         return results
 
-    def __init__(self, **kwargs):
+    def _complete(self,
+                  handler_results: dict[str, list[SearchResult]],
+                  query: str,
+                  year_from: Optional[str | int],
+                  year_to: Optional[str | int]) -> bool:
+        """
+        Whether no handler truncated its results at its ``max_results``.
+
+        Handlers that returned fewer results than their limit are complete;
+        the others are counted, and complete if the count does not exceed
+        their results. Failed counts make the result set incomplete.
+        """
+        tasks = {name: (lambda h=self.handlers[name]: h.count(query, year_from, year_to))
+                 for name, results in handler_results.items()
+                 if self.handlers[name].max_results is not None
+                 and len(results) >= self.handlers[name].max_results}
+        counts, errors = self._run(tasks)
+        if errors:
+            return False
+        truncated = [name for name, count in counts.items() if count > len(handler_results[name])]
+        if truncated:
+            logger.info(f"Not indexing query='{query}' as complete: truncated by {', '.join(truncated)}")
+        return not truncated
+
+    def _fuse(self,
+              handler_results: dict[str, list[SearchResult]],
+              fields: Optional[list[str]]):
+        """Fill the deferred fields of each handler's results from other providers, then fetch the rest."""
+        index = index_by_doi(result for results in handler_results.values() for result in results)
+        tasks = {}
+        for name, results in handler_results.items():
+            handler = self.handlers[name]
+            deferred = _deferred_fields(handler, fields)
+            if not deferred:
+                continue
+            incomplete = fuse_fields(results, index, deferred)
+            fused = len(results) - len(incomplete)
+            metrics.inc("fused_results_total", fused, handler=name)
+            logger.info(f"FUSION | {name:<20} | {fused} of {len(results)} results completed by other providers")
+            if incomplete:
+                tasks[name] = lambda h=handler, r=incomplete, d=deferred: h.hydrate(r, list(d))
+        _, errors = self._run(tasks)
+        self.errors.update(errors)
+        for results in handler_results.values():
+            set_provenance(results)
+
+    def search_many(self,
+                    queries: Iterable[str],
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    deduplicate: bool = True,
+                    refresh: bool = False,
+                    fields: Optional[list[str]] = None) -> list[TaggedResult]:
+        """
+        Search for many queries at once.
+
+        Every (query, handler) pair is scheduled on one shared worker pool.
+        Queries that are identical up to whitespace run only once. Failed pairs
+        are reported in :attr:`errors` under ``"<handler>: <query>"``.
+
+        :param queries: The search queries
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param deduplicate: If True, remove duplicates across all queries with
+            the same semantics as :meth:`search`. The kept entry is tagged
+            with every query that returned one of its duplicates.
+        :param refresh: If True, bypass the cache and overwrite its entries.
+        :param fields: Optional fields to retrieve, see :meth:`search`.
+
+        :return: List of tagged results, ordered by query, then handler
+        """
+        _unrequested_fields(fields)  # Fail early on unknown fields
+
+        # Coalesce queries that only differ in formatting
+        aliases: dict[str, list[str]] = {}
+        for query in queries:
+            originals = aliases.setdefault(normalize_query(query), [])
+            if query not in originals:
+                originals.append(query)
+
+        tasks = {}
+        for normalized in aliases:
+            for name, handler in self.handlers.items():
+                tasks[f"{name}: {normalized}"] = (
+                    lambda q=normalized, n=name, h=handler: self._cached(
+                        _search_kind(fields), n, q, year_from, year_to, refresh,
+                        lambda: h.search(q, year_from, year_to, fields)))
+        handler_results, self.errors = self._run(tasks, self.max_workers or min(32, len(tasks) or 1))
+
+        tagged: list[TaggedResult] = []
+        by_title: dict[str, TaggedResult] = {}
+        by_doi: dict[str, TaggedResult] = {}
+        for normalized, originals in aliases.items():
+            for name in self.handlers:
+                for result in handler_results.get(f"{name}: {normalized}", []):
+                    if not deduplicate:
+                        tagged.append(TaggedResult(result, list(originals)))
+                        continue
+                    title_key = _normalize_title(result.title)
+                    doi_key = _normalize_doi(result.doi)
+                    entry = by_title.get(title_key) or by_doi.get(doi_key)
+                    if entry is not None:
+                        entry.queries.extend(q for q in originals if q not in entry.queries)
+                        continue
+                    entry = TaggedResult(result, list(originals))
+                    if title_key is not None:
+                        by_title[title_key] = entry
+                    if doi_key is not None:
+                        by_doi[doi_key] = entry
+                    tagged.append(entry)
+        return tagged
+
+    def search_incremental(self,
+                           query: str,
+                           year_from: Optional[str | int] = None,
+                           year_to: Optional[str | int] = None,
+                           store: Optional[IncrementalStore] = None,
+                           lookback: int = 30) -> list[SearchResult]:
+        """
+        Search for a given query, fetching only the records published since the last run.
+
+        For each handler, the results of previous runs are kept in ``store``
+        together with their latest publication date (the watermark). Later
+        runs pass the watermark, moved back by ``lookback`` days, to the
+        handler, which narrows its date clauses (to the year for Scopus and
+        ScienceDirect, to the day for Springer and OpenAlex). Fresh records
+        come first and replace stored records with the same title or DOI, so
+        records fetched again within the overlap are not duplicated. Failed
+        handlers keep their stored state and are reported in :attr:`errors`.
+
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param store: The :class:`IncrementalStore` to use. Defaults to the store
+            at ``INCREMENTAL_STORE``.
+        :param lookback: Days of overlap with the previous run. Records that
+            are indexed after their publication date, e.g. backdated journal
+            issues, are only found within this window.
+
+        :return: The full, merged result set of all handlers
+        """
+        store = store or IncrementalStore()
+        tasks = {name: (lambda n=name, h=handler: self._search_incremental(
+                            n, h, query, year_from, year_to, store, lookback))
+                 for name, handler in self.handlers.items()}
+        handler_results, self.errors = self._run(tasks)
+
+        results = []
+        for handler_result in handler_results.values():
+            results.extend(handler_result)
+        return results
+
+    @staticmethod
+    def _search_incremental(name: str,
+                            handler: SearchHandler,
+                            query: str,
+                            year_from: Optional[str | int],
+                            year_to: Optional[str | int],
+                            store: IncrementalStore,
+                            lookback: int) -> list[SearchResult]:
+        """Fetch the records of one handler since its rewound watermark and merge them into its stored set."""
+        watermark, stored = store.load(name, query, year_from, year_to)
+        since = rewind_date(watermark, lookback)
+        fresh = handler.search(query, year_from, year_to, since=since)
+
+        deduplicator = Deduplicator()
+        for result in fresh:
+            deduplicator.is_duplicate(result)
+        merged = fresh + [result for result in stored if not deduplicator.is_duplicate(result)]
+
+        logger.info(f"{name} incremental: {len(merged) - len(stored)} new since {since}")
+        store.save(name, query, year_from, year_to, merged)
+        return merged
+
+    def harvest(self,
+                query: str,
+                year_from: Optional[str | int] = None,
+                year_to: Optional[str | int] = None,
+                fields: Optional[list[str]] = None,
+                directory: Optional[str] = None,
+                max_retries: int = 3,
+                refresh: bool = False) -> list[SearchResult]:
+        """
+        Search for a given query with checkpoints, so that long searches can be resumed.
+
+        Each handler runs as a :class:`HarvestJob` that checkpoints its
+        position and results after every page and retries failed pages. If a
+        handler still fails, it is reported in :attr:`errors` and calling
+        ``harvest`` again with the same arguments continues where it stopped.
+        A completed harvest is kept: calling ``harvest`` again returns its
+        results without requests until ``refresh`` is given.
+
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param fields: Optional fields to retrieve, see :meth:`search`.
+        :param directory: Optional directory of the checkpoints, with one
+            subdirectory per handler. Defaults to ``HARVEST_DIR``.
+        :param max_retries: Maximum number of consecutive retries of a failed page.
+        :param refresh: If True, delete the checkpoints and harvest from scratch.
+
+        :return: List of search results
+        """
+        _unrequested_fields(fields)  # Fail early on unknown fields
+        tasks = {name: (lambda n=name, h=handler: HarvestJob(
+                            h, query, year_from, year_to, fields,
+                            Path(directory) / n if directory else None, max_retries).run(refresh))
+                 for name, handler in self.handlers.items()}
+        handler_results, self.errors = self._run(tasks)
+
+        results = []
+        for handler_result in handler_results.values():
+            results.extend(handler_result)
+        return results
+
+    def iter_search(self,
+                    query: str,
+                    year_from: Optional[str | int] = None,
+                    year_to: Optional[str | int] = None,
+                    deduplicate: bool | str = False,
+                    fields: Optional[list[str]] = None,
+                    filters: Optional[Filters] = None) -> Iterator[SearchResult]:
+        """
+        Search for a given query, yielding the results as the pages arrive.
+
+        Handlers are consumed one after another in handler order, so only the
+        current page is held in memory. A handler that fails midway is skipped
+        and reported in :attr:`errors`; the results it already yielded stay.
+
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param deduplicate: If True, drop duplicates on the fly with the same
+            semantics as :meth:`search`. With ``"disk"``, the keys seen so far
+            are kept on disk, so memory stays bounded for any number of
+            results (see :func:`iter_deduplicate_on_disk`).
+        :param fields: Optional fields to retrieve, see :meth:`search`.
+        :param filters: Optional filters, see :meth:`search`.
+
+        :return: Iterator over the search results
+        """
+        _unrequested_fields(fields)  # Fail early on unknown fields
+        if deduplicate not in (True, False, "disk"):
+            raise ValueError(f"Unknown deduplicate mode {deduplicate!r}, expected True, False or 'disk'")
+        self.errors = {}
+        results = self._iter_handlers(query, year_from, year_to, fields, filters)
+        if deduplicate == "disk":
+            results = iter_deduplicate_on_disk(results)
+        elif deduplicate:
+            results = iter_deduplicate(results)
+        yield from results
+
+    def _iter_handlers(self,
+                       query: str,
+                       year_from: Optional[str | int],
+                       year_to: Optional[str | int],
+                       fields: Optional[list[str]],
+                       filters: Optional[Filters]) -> Iterator[SearchResult]:
+        """Chain the result streams of all handlers, skipping the ones that fail."""
+        for name, handler in self.handlers.items():
+            try:
+                yield from handler.iter_search(query, year_from, year_to, fields, filters=filters)
+            except Exception as e:
+                logger.warning(f"{name} skipped: {e}")
+                self.errors[name] = e
+
+    def export(self,
+               path: str,
+               query: str,
+               year_from: Optional[str | int] = None,
+               year_to: Optional[str | int] = None,
+               format: Optional[str] = None,
+               deduplicate: bool | str = False,
+               fields: Optional[list[str]] = None,
+               chunk_size: int = 10_000,
+               compression: Optional[str] = None,
+               filters: Optional[Filters] = None) -> int:
+        """
+        Search for a given query and write the results to a file as they arrive.
+
+        Results are streamed from :meth:`iter_search` and written in chunks on
+        a background thread, so memory stays bounded for any result set.
+        Failed handlers are reported in :attr:`errors`.
+
+        :param path: The output file, e.g. ``results.parquet`` or ``results.ris.gz``.
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param format: ``parquet``, ``jsonl``, ``csv``, ``bibtex`` or ``ris``.
+            Defaults to the format of the file suffix.
+        :param deduplicate: If True, drop duplicates on the fly, see :meth:`search`.
+            ``"disk"`` keeps the seen keys on disk, see :meth:`iter_search`.
+        :param fields: Optional fields to retrieve, see :meth:`search`.
+        :param chunk_size: Number of results per written chunk (Parquet row group).
+        :param compression: ``gzip`` for text formats or a Parquet codec such
+            as ``zstd``. Defaults to gzip for ``.gz`` paths, else none.
+        :param filters: Optional filters, see :meth:`search`.
+
+        :return: The number of written results
+        """
+        results = self.iter_search(query, year_from, year_to, deduplicate, fields, filters)
+        return export_results(results, path, format, chunk_size, compression)
+
+    @staticmethod
+    def _search_handler(handler: SearchHandler,
+                        query: str,
+                        year_from: Optional[str | int],
+                        year_to: Optional[str | int],
+                        fields: Optional[list[str]],
+                        filters: Optional[Filters]) -> list[SearchResult]:
+        """Search with a single handler."""
+        return handler.search(query, year_from, year_to, fields, filters=filters)
+
+    def _search_sharded(self,
+                        handler: SearchHandler,
+                        query: str,
+                        year_from: Optional[str | int],
+                        year_to: Optional[str | int],
+                        fields: Optional[list[str]],
+                        filters: Optional[Filters]) -> list[SearchResult]:
+        """Search with a single handler, split into year (or month) windows below its result limit."""
+        if handler.max_results is None or year_from is None or year_to is None:
+            return handler.search(query, year_from, year_to, fields, filters=filters)
+
+        shards = plan_shards(lambda start, end: handler.count(query, start, end, **_filter_kwargs(filters)),
+                             int(year_from), int(year_to), handler.max_results, handler.date_windows)
+        tasks = {f"{start}-{end}": (lambda start=start, end=end: handler.search(query, start, end, fields,
+                                                                                filters=filters))
+                 for start, end in shards}
+        shard_results, errors = run_concurrently(tasks, self.max_workers or len(tasks))
+        if errors:
+            failed = ", ".join(f"{years} ({error})" for years, error in errors.items())
+            raise RuntimeError(f"Failed year range(s): {failed}")
+
+        results = []
+        for shard_result in shard_results.values():
+            results.extend(shard_result)
+        return results
+
+    def hydrate(self,
+                results: list[SearchResult],
+                fields: Optional[list[str]] = None) -> list[SearchResult]:
+        """
+        Load missing fields of search results in bulk, e.g. after a search with ``fields``.
+
+        Results are looked up by DOI with the handler they came from, so
+        results without a DOI stay unchanged. Handlers that fail are reported
+        in :attr:`errors`.
+
+        :param results: The search results to complete. They are updated in place.
+        :param fields: The fields to load, e.g. ``["abstract"]``. Defaults to all fields.
+
+        :return: The same results
+        """
+        by_source: dict[str, list[SearchResult]] = {}
+        for result in results:
+            by_source.setdefault(result.source, []).append(result)
+        tasks = {name: (lambda h=handler, r=by_source[name]: h.hydrate(r, fields))
+                 for name, handler in self.handlers.items() if name in by_source}
+        _, self.errors = self._run(tasks)
+        return results
+
+    def _cached(self,
+                kind: str,
+                name: str,
+                query: str,
+                year_from: Optional[str | int],
+                year_to: Optional[str | int],
+                refresh: bool,
+                func: Callable):
+        """
+        Serve a handler call from the cache if possible, otherwise run it and store its result.
+
+        A call identical to one in flight in another thread waits for it instead of running again.
+        """
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(kind, name, query, year_from, year_to)
+            if cached is not None:
+                return cached
+
+        def call():
+            value = func()
+            if self.cache is not None:
+                self.cache.set(kind, name, query, year_from, year_to, value)
+            return value
+
+        key = ResultCache.key(kind, name, query, year_from, year_to)
+        return self.flights.do(key, call, handler=name)
+
+    def _run(self,
+             tasks: dict,
+             max_workers: Optional[int] = None) -> tuple[dict, dict[str, Exception]]:
+        """Run the tasks concurrently and log the ones that failed."""
+        results, errors = run_concurrently(tasks, max_workers or self.max_workers, self.timeout)
+        for name, error in errors.items():
+            logger.warning(f"{name} skipped: {error}")
+        return results, errors
+
+    @property
+    def errors(self) -> dict[str, Exception]:
+        """Per-handler errors of the last call of the current thread."""
+        return self._local.__dict__.setdefault("errors", {})
+
+    @errors.setter
+    def errors(self, errors: dict[str, Exception]):
+        self._local.errors = errors
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 cache: Optional[ResultCache] = None,
+                 rate_limits: Optional[dict[str, float]] = None,
+                 index: Optional[LocalIndex] = None,
+                 count_memo: Optional[CountMemo] = None,
+                 **kwargs):
         """
         To use the different APIs, you need to provide the corresponding API keys.
 
+        :param max_workers: Maximum number of handlers queried at the same time.
+            Defaults to all initialized handlers.
+        :param timeout: Optional time budget in seconds for each handler call.
+            Handlers exceeding it are reported in :attr:`errors`.
+        :param cache: Optional :class:`ResultCache` for the results of ``search``
+            and ``count``. Streaming searches bypass it.
+        :param rate_limits: Optional calls per second per provider, e.g.
+            ``{"Springer": 5}`` for a premium key. The handlers of the client
+            then get their own :attr:`scheduler`; otherwise they share
+            ``SearchHandler.scheduler`` with all other clients.
+        :param index: Optional :class:`LocalIndex`. Results of ``search`` are
+            added to it, and later queries it covers are answered locally.
+        :param count_memo: Optional :class:`CountMemo` of recent counts, used
+            by :meth:`estimate_count`. Defaults to a memo with a TTL of 5 minutes.
         :param openalex_key: OpenAlex API key
         :param scopus_key: Scopus API key
         :param scopus_token: Scopus API token
         :param springer_key: Springer API key
+        :param sciencedirect_enrich: Whether ScienceDirect fetches the Article
+            Metadata (abstract) of every result. Defaults to True.
         """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self.index = index
+        self.count_memo = count_memo if count_memo is not None else CountMemo()
+        # Background counts of estimate_count, by memo key
+        self._counting: dict[tuple, Future] = {}
+        self._counting_lock = threading.Lock()
+        self._count_executor: Optional[ThreadPoolExecutor] = None
+        # Identical handler calls in flight, shared by the threads using the client
+        self.flights = SingleFlight(clone=_copy_results)
+        # Per-thread errors, see errors
+        self._local = threading.local()
         self.handlers = HandlerRegistry.initialize_handlers(**kwargs)
+        # Scheduler pacing the calls of the handlers of this client
+        self.scheduler = RequestScheduler(rate_limits) if rate_limits else SearchHandler.scheduler
+        for handler in self.handlers.values():
+            handler.scheduler = self.scheduler
+
+
+def _copy_results(value):
+    """Copy the results of a coalesced search for each caller, as fusion and hydration modify them in place."""
+    if isinstance(value, list):
+        return [copy.copy(result) for result in value]
+    return value
+
+
+def _deferred_fields(handler: SearchHandler, fields: Optional[list[str]]) -> tuple[str, ...]:
+    """Fields of a search that the handler fetches only for results other providers do not cover when fusing."""
+    return tuple(name for name in handler.deferred_fields if fields is None or name in fields)
+
+
+def _eager_fields(handler: SearchHandler, fields: Optional[list[str]]) -> Optional[list[str]]:
+    """Fields a handler searches for when fusing, i.e. the requested fields without its deferred ones."""
+    deferred = _deferred_fields(handler, fields)
+    if not deferred:
+        return fields
+    return [name for name in fields or ResultBatch.FIELDS if name not in deferred]
+
+
+def _search_kind(fields: Optional[list[str]], shard: bool = False) -> str:
+    """
+    Cache kind of a search, so that sharded searches and searches with a field
+    selection are cached separately, e.g. ``search:sharded:date,title``.
+    """
+    kind = "search:sharded" if shard else "search"
+    if fields is None:
+        return kind
+    return f"{kind}:{','.join(sorted(fields))}"
+
+
+def _filtered_kind(kind: str, filters: Optional[Filters]) -> str:
+    """Cache kind of a filtered search or count, e.g. ``count[open_access=1]``."""
+    if not filters:
+        return kind
+    return f"{kind}[{filters.key()}]"
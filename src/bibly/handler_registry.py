@@ -1,42 +1,150 @@
 """Module to manage the registration of handlers for different APIs."""
+from dataclasses import dataclass
+from importlib import import_module
+from importlib.metadata import entry_points
 import logging
-from typing import Type, Dict
+import sys
+import threading
+from typing import Type, Dict, Optional, TYPE_CHECKING
 
 from bibly.base_handler import SearchHandler
 
+if TYPE_CHECKING:
+    from bibly.async_handler import AsyncSearchHandler
+
 logger = logging.getLogger("bibly")
 
+# Entry point group under which other packages can register handlers
+ENTRY_POINT_GROUP = "bibly.handlers"
+
+
+@dataclass(frozen=True)
+class HandlerDescriptor:
+    """
+    Lightweight reference to a handler class, imported only when it is built.
+
+    :param target: Either ``"package.module:ClassName"`` or the handler class itself.
+    :param required_params: The parameters the handler needs, checked before
+        its module is imported. Defaults to the ``required_params`` of the
+        class, which requires importing it.
+    """
+    target: str | Type[SearchHandler]
+    required_params: Optional[tuple[str, ...]] = None
+
+    def load(self) -> Type[SearchHandler]:
+        """Import and return the handler class."""
+        if not isinstance(self.target, str):
+            return self.target
+        module_name, _, class_name = self.target.partition(":")
+        return getattr(import_module(module_name), class_name)
+
+    def missing_params(self, **kwargs) -> list[str]:
+        """The required parameters that are missing or None in ``kwargs``."""
+        required = self.required_params
+        if required is None:
+            required = self.load().required_params
+        return [p for p in required if kwargs.get(p) is None]
+
 
 class HandlerRegistry:
     """
     A registry to manage different search handlers.
     This allows for dynamic loading and management of different search handlers.
+
+    Handlers are registered as :class:`HandlerDescriptor` and imported only
+    when :meth:`initialize_handlers` builds them, so unused backend libraries
+    are never loaded. Other packages can register handlers through the
+    ``bibly.handlers`` entry point group; an entry point may point to a
+    handler class or to a :class:`HandlerDescriptor`.
+
+    Handlers with a native asyncio interface (:class:`AsyncSearchHandler`)
+    are registered the same way; :meth:`initialize_handlers` leaves them out
+    and :meth:`initialize_async_handlers` builds them with the others.
+
+    The registry is safe to use from several threads, and handlers are
+    initialized one at a time (see :class:`SearchHandler`).
     """
-    _registry: Dict[str, Type[SearchHandler]] = {}
+    _registry: Dict[str, HandlerDescriptor] = {}
+    _entry_points_loaded: bool = False
+    # Guards the registry and the loading of entry points
+    _lock = threading.RLock()
+
+    @classmethod
+    def register_handler(cls,
+                         name: str,
+                         handler: str | Type[SearchHandler] | HandlerDescriptor,
+                         required_params: Optional[list[str]] = None):
+        """
+        Register a handler under a name.
+
+        :param name: Name of the handler, used as key of the results.
+        :param handler: The handler class, its import path
+            (``"package.module:ClassName"``) or a descriptor.
+        :param required_params: Required parameters of a handler given by its
+            import path, so they can be checked without importing it.
+        """
+        if not isinstance(handler, HandlerDescriptor):
+            handler = HandlerDescriptor(handler, tuple(required_params) if required_params is not None else None)
+        with cls._lock:
+            cls._registry[name] = handler
 
     @classmethod
-    def register_handler(cls, name: str, handler: Type[SearchHandler]):
-        cls._registry[name] = handler
-    
+    def load_entry_points(cls):
+        """Register the handlers of the ``bibly.handlers`` entry point group, once."""
+        with cls._lock:
+            if cls._entry_points_loaded:
+                return
+            cls._entry_points_loaded = True
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                if entry_point.name in cls._registry:
+                    continue
+                try:
+                    cls.register_handler(entry_point.name, entry_point.load())
+                except Exception as e:
+                    logger.error(f"{entry_point.name} failed to load: {e}", exc_info=True)
+
     @classmethod
     def initialize_handlers(cls, **kwargs) -> Dict[str, SearchHandler]:
         """
         Dynamically initialize all handlers that can be initialized with the given parameters.
 
+        Async handlers are left out, see :meth:`initialize_async_handlers`.
+
+        :param kwargs: Parameters to pass to the handlers
+        :return: A dictionary of initialized handlers
+        """
+        return cls._initialize(False, kwargs)
+
+    @classmethod
+    def initialize_async_handlers(cls, **kwargs) -> Dict[str, 'SearchHandler | AsyncSearchHandler']:
+        """
+        Initialize all handlers, blocking and async, that can be initialized with the given parameters.
+
         :param kwargs: Parameters to pass to the handlers
         :return: A dictionary of initialized handlers
         """
+        return cls._initialize(True, kwargs)
+
+    @classmethod
+    def _initialize(cls, include_async: bool, kwargs: dict) -> Dict[str, 'SearchHandler | AsyncSearchHandler']:
+        """Initialize the registered handlers, optionally including the async ones."""
+        cls.load_entry_points()
+        with cls._lock:
+            registry = list(cls._registry.items())
         initialized_handlers = {}
-        for name, handler_class in cls._registry.items():
-            if not handler_class.can_initialize(**kwargs):
-                missing = [p for p in handler_class.required_params
-                           if kwargs.get(p) is None]
-                logger.warning(
-                    f"{name} not initialized: missing required parameter(s) "
-                    f"{missing}"
-                )
-                continue
+        for name, descriptor in registry:
             try:
+                missing = descriptor.missing_params(**kwargs)
+                if missing:
+                    logger.warning(
+                        f"{name} not initialized: missing required parameter(s) "
+                        f"{missing}"
+                    )
+                    continue
+                handler_class = descriptor.load()
+                if not include_async and _is_async(handler_class):
+                    logger.debug(f"{name} not initialized: async handlers need AsyncBibLy")
+                    continue
                 initialized_handlers[name] = handler_class(**kwargs)
             except Exception as e:
                 logger.error(
@@ -47,4 +155,17 @@ class HandlerRegistry:
 
     @classmethod
     def list_handlers(cls) -> list[str]:
-        return list(cls._registry.keys())
\ No newline at end of file
+        cls.load_entry_points()
+        with cls._lock:
+            return list(cls._registry.keys())
+
+
+def _is_async(handler_class: type) -> bool:
+    """
+    Whether a handler class is an :class:`AsyncSearchHandler`.
+
+    No class can be one before ``bibly.async_handler`` is imported, so the
+    check does not import it, and with it asyncio.
+    """
+    module = sys.modules.get("bibly.async_handler")
+    return module is not None and issubclass(handler_class, module.AsyncSearchHandler)
@@ -1 +1,17 @@
-from bibly.handlers.register_handlers import *
\ No newline at end of file
+from importlib import import_module
+
+from bibly.handlers.register_handlers import *
+
+# Handler classes, imported on first access to keep `import bibly` light
+_HANDLER_MODULES = {
+    "SciencedirectHandler": "bibly.handlers.sciencedirect_handler",
+    "ScopusHandler": "bibly.handlers.scopus_handler",
+    "SpringerHandler": "bibly.handlers.springer_handler",
+    "OpenAlexHandler": "bibly.handlers.openalex_handler",
+}
+
+
+def __getattr__(name: str):
+    if name in _HANDLER_MODULES:
+        return getattr(import_module(_HANDLER_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
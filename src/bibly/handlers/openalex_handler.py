@@ -1,60 +1,154 @@
-from typing import Optional
+from typing import Any, Iterator, Optional
 
-from pyalex import Works
+from pyalex import invert_abstract, Works
 import pyalex
 
-from bibly.base_handler import SearchHandler
-from bibly.utils import get_field_value, log_count, log_initialization, log_search, SearchResult
+from bibly.base_handler import _configure, _date_from, _date_to, _narrow_date_from, SearchHandler
+from bibly.utils import Filters, get_field_value, log_count, log_initialization, SearchResult
 
 class OpenAlexHandler(SearchHandler):
     required_params = ['openalex_key']
+    provider = 'OpenAlex'
+    host = 'api.openalex.org'
+    # Cursor paging has no depth limit, so searches are never split into
+    # shards. pyalex's paginate stops at n_max=10000 by default, which is lifted.
+    max_results = None
+    # The publication date filters take full dates
+    date_windows = True
+
+    # OpenAlex fields to select for each SearchResult field
+    _SELECT = {
+        'doi': ['doi'],
+        'title': ['title'],
+        'abstract': ['abstract_inverted_index'],
+        'authors': ['authorships'],
+        'date': ['publication_date'],
+    }
+    # Max number of DOIs per lookup request (limit of OpenAlex OR filters)
+    _LOOKUP_BATCH_SIZE = 50
+    supported_filters = frozenset({'doc_types', 'languages', 'open_access', 'has_doi'})
+    # OpenAlex work types of the unified document types. Conference papers
+    # are typed as articles, so they cannot be told apart.
+    _DOC_TYPES = {'article': 'article', 'review': 'review', 'book': 'book', 'book-chapter': 'book-chapter'}
 
     @log_initialization
     def initialize(self):
         """ Initialize the OpenAlex search handler with API key."""
-        pyalex.config.api_key = self.api_key
+        _configure(_set_api_key, self.api_key)
 
     @log_count
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> int:
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
         """ Count the number of results for a given query using the OpenAlex API."""
-        count = (Works().search_filter(title_and_abstract=query)
-                        .filter(from_publication_date=f'{year_from}-01-01',
-                                to_publication_date=f'{year_to}-12-31')
-                        .count())
+        works = (Works().search_filter(title_and_abstract=query)
+                        .filter(from_publication_date=_date_from(year_from),
+                                to_publication_date=_date_to(year_to),
+                                **self._filter_params(filters)))
+        count = self._request(works.count)
         return count
 
-    @log_search
-    def search(self,
-               query: str,
-               year_from: Optional[str | int] = None,
-               year_to: Optional[str | int] = None) -> list[SearchResult]:
-        """ Search for a given query using the OpenAlex API."""
-        pager = (Works().search_filter(title_and_abstract=query)
-                .filter(from_publication_date=f'{year_from}-01-01',
-                        to_publication_date=f'{year_to}-12-31')
-                .paginate(per_page=200))
-        
-        results = []
-        for page in pager:
-            for document in page:
-                doi = get_field_value(document, 'doi', '').replace('https://doi.org/', '') or None
-                
-                authorships = get_field_value(document, 'authorships', [])
-                authors = '; '.join([a.get('author', {}).get('display_name') for a in authorships])
-
-                results.append(SearchResult(
-                    doi=doi,
-                    title=document.get('title'),
-                    abstract=document.get('abstract'),
-                    authors=authors,
-                    date=document.get('publication_date'),
-                    source='OpenAlex'
-                ))
-        
-        return results
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        """
+        Yield the results for a given query page by page using the OpenAlex API.
+
+        Only the requested ``fields`` are selected in the API response.
+        ``since`` narrows the publication date filter to that day. Filters
+        become ``type``, ``language``, ``is_oa`` and ``has_doi`` filters.
+        """
+        for results, _ in self.iter_checkpoints(query, year_from, year_to, fields, since, filters=filters):
+            yield results
+
+    def iter_checkpoints(self,
+                         query: str,
+                         year_from: Optional[str | int] = None,
+                         year_to: Optional[str | int] = None,
+                         fields: Optional[list[str]] = None,
+                         since: Optional[str] = None,
+                         position: Any = None,
+                         filters: Optional[Filters] = None) -> Iterator[tuple[list[SearchResult], Any]]:
+        """
+        Yield the result pages with their position, see :meth:`SearchHandler.iter_checkpoints`.
+
+        The position holds the cursor of the next page and the number of
+        records fetched so far, so resuming fetches no page twice.
+        """
+        works = (Works().search_filter(title_and_abstract=query)
+                .filter(from_publication_date=_narrow_date_from(year_from, since),
+                        to_publication_date=_date_to(year_to),
+                        **self._filter_params(filters)))
+        if fields is not None:
+            works = works.select(sorted({'doi', *(f for name in fields for f in self._SELECT.get(name, []))}))
+        position = position or {'cursor': '*', 'fetched': 0}
+        if position['cursor'] is None:
+            return
+        pager = works.paginate(per_page=200, cursor=position['cursor'], n_max=None)
+
+        # Fetch each page through the scheduler. The pager keeps its cursor
+        # when a request fails, so throttled pages can simply be retried.
+        pages = iter(pager)
+        fetched = position['fetched']
+        while (page := self._request(next, pages, None)) is not None:
+            with self._timer('parse'):
+                results = [self._to_result(document) for document in page]
+            fetched += len(results)
+            # The response names the cursor of the following page, None after the last one
+            yield results, {'cursor': page.meta['next_cursor'], 'fetched': fetched}
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        """ Yield the records of the given DOIs using the OpenAlex API."""
+        for i in range(0, len(dois), self._LOOKUP_BATCH_SIZE):
+            batch = dois[i:i + self._LOOKUP_BATCH_SIZE]
+            works = Works().filter(doi='|'.join(batch))
+            for document in self._request(works.get, per_page=self._LOOKUP_BATCH_SIZE):
+                yield self._to_result(document)
+
+    def _filter_params(self, filters: Optional[Filters]) -> dict:
+        """The OpenAlex filters for the unified filters. Alternatives are joined with ``|`` (OR)."""
+        self._local_filters(filters)
+        if not filters:
+            return {}
+        params = {}
+        if filters.doc_types:
+            unknown = sorted(set(filters.doc_types) - set(self._DOC_TYPES))
+            if unknown:
+                raise ValueError(f"OpenAlex cannot filter by document type(s) {unknown}")
+            params['type'] = '|'.join(self._DOC_TYPES[t] for t in filters.doc_types)
+        if filters.languages:
+            params['language'] = '|'.join(filters.languages)
+        if filters.open_access is not None:
+            params['is_oa'] = filters.open_access
+        if filters.has_doi is not None:
+            params['has_doi'] = filters.has_doi
+        return params
+
+    @staticmethod
+    def _to_result(document: dict) -> SearchResult:
+        """
+        Convert an OpenAlex work to a SearchResult.
+
+        The DOI (a ``https://doi.org/`` URL) and the list of author names are
+        cleaned up by the column-wise normalization of the whole page.
+        """
+        authorships = get_field_value(document, 'authorships', [])
+        authors = [a.get('author', {}).get('display_name') for a in authorships]
+
+        return SearchResult(
+            doi=document.get('doi'),
+            title=document.get('title'),
+            abstract=invert_abstract(document.get('abstract_inverted_index')),
+            authors=authors,
+            date=document.get('publication_date'),
+            source='OpenAlex'
+        )
 
 
     def __init__(self, **kwargs):
@@ -65,3 +159,8 @@ class OpenAlexHandler(SearchHandler):
         """
         self.api_key = kwargs.get('openalex_key')
         super().__init__()
+
+
+def _set_api_key(api_key: str):
+    """Set the API key of pyalex, which is global to the process."""
+    pyalex.config.api_key = api_key
@@ -1,13 +1,13 @@
-from bibly.handlers.sciencedirect_handler import SciencedirectHandler
-from bibly.handlers.scopus_handler import ScopusHandler
-from bibly.handlers.springer_handler import SpringerHandler
-from bibly.handlers.openalex_handler import OpenAlexHandler
-
 # Import the HandlerRegistry to ensure handlers are registered
 from bibly.handler_registry import HandlerRegistry
 
-# Explicitly register all handlers
-HandlerRegistry.register_handler("ScienceDirect", SciencedirectHandler)
-HandlerRegistry.register_handler("Scopus", ScopusHandler)
-HandlerRegistry.register_handler("Springer", SpringerHandler)
-HandlerRegistry.register_handler("OpenAlex", OpenAlexHandler)
+# Register all handlers by import path, so that the backend libraries are only
+# imported when a handler is actually initialized
+HandlerRegistry.register_handler("ScienceDirect", "bibly.handlers.sciencedirect_handler:SciencedirectHandler",
+                                 required_params=['scopus_key'])
+HandlerRegistry.register_handler("Scopus", "bibly.handlers.scopus_handler:ScopusHandler",
+                                 required_params=['scopus_key'])
+HandlerRegistry.register_handler("Springer", "bibly.handlers.springer_handler:SpringerHandler",
+                                 required_params=['springer_key'])
+HandlerRegistry.register_handler("OpenAlex", "bibly.handlers.openalex_handler:OpenAlexHandler",
+                                 required_params=['openalex_key'])
@@ -1,15 +1,33 @@
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Optional
+import logging
+import threading
 
+from pybliometrics.exception import Scopus400Error, Scopus414Error
 from pybliometrics.sciencedirect import init, ArticleMetadata, ScienceDirectSearch
 
-from bibly.base_handler import SearchHandler
-from bibly.utils import log_count, log_initialization, log_search, PYBLIOMETRICS_CONFIG, SearchResult
+from bibly.base_handler import _configure, _narrow_year_from, SearchHandler
+from bibly.utils import Filters, log_count, log_initialization, metrics, PYBLIOMETRICS_CONFIG, SearchResult
+
+logger = logging.getLogger("bibly")
 
 class SciencedirectHandler(SearchHandler):
     required_params = ['scopus_key']
-
-    # Max number of DOIs per Article Metadata query to avoid overly long requests
-    _METADATA_BATCH_SIZE = 25
+    provider = 'ScienceDirect'
+    host = 'api.elsevier.com'
+    # Max offset of the ScienceDirect Search API
+    max_results = 6000
+
+    # Initial max length of an Article Metadata query. The API rejects overly
+    # long queries; the limit is lowered automatically when that happens.
+    _MAX_QUERY_LENGTH = 4000
+    # Number of Article Metadata batches fetched concurrently
+    _METADATA_WORKERS = 4
+    # The Article Metadata API has its own quota, separate from the search
+    _METADATA_PROVIDER = 'ArticleMetadata'
+    # The Search API only filters by open access
+    supported_filters = frozenset({'open_access'})
 
     @log_initialization
     def initialize(self):
@@ -20,52 +38,183 @@ class SciencedirectHandler(SearchHandler):
         :param api_token: Scopus API token
         """
         if self.api_token:
-            init(config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key], inst_tokens=[self.api_token])
+            _configure(init, config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key], inst_tokens=[self.api_token])
         else:
-            init(config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key])
+            _configure(init, config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key])
 
     @log_count
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> int:
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
         """ Count the number of results for a given query using the ScienceDirectSearch API."""
-        sciencedirect_results = ScienceDirectSearch(query, date=f'{year_from}-{year_to}',
-                                                    download=False, refresh=True)
+        sciencedirect_results = self._request(ScienceDirectSearch, query,
+                                              date=f'{year_from}-{year_to}',
+                                              download=False, refresh=True,
+                                              **self._filter_params(filters))
 
         return sciencedirect_results.get_results_size()
 
-    @log_search
-    def search(self,
-               query: str,
-               year_from: Optional[str | int] = None,
-               year_to: Optional[str | int] = None) -> list[SearchResult]:
-        """ Search for a given query using the ScienceDirectSearch API."""
-        # Search for dois using the ScienceDirectSearch API
-        search_results = ScienceDirectSearch(query, date=f'{year_from}-{year_to}')
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        """
+        Yield the results for a given query using the ScienceDirectSearch API.
+
+        Unless enrichment is disabled, or no abstract is requested in
+        ``fields``, each page holds the entries of one Article Metadata batch.
+        Batches are fetched concurrently and yielded in order. ``since``
+        narrows the date range to its year. The open-access filter is passed
+        to the Search API.
+        """
+        documents = self._search_documents(query, year_from, year_to, since, filters)
+
+        if not self._enriches(fields):
+            with self._timer('parse'):
+                results = [SearchResult(doi=d.doi, title=d.title, abstract=None, authors=d.authors,
+                                        date=d.publicationDate, source="ScienceDirect")
+                           for d in documents]
+            yield results
+            return
+
+        yield from self._iter_metadata([d.doi for d in documents])
+
+    def iter_checkpoints(self,
+                         query: str,
+                         year_from: Optional[str | int] = None,
+                         year_to: Optional[str | int] = None,
+                         fields: Optional[list[str]] = None,
+                         since: Optional[str] = None,
+                         position: Any = None,
+                         filters: Optional[Filters] = None) -> Iterator[tuple[list[SearchResult], Any]]:
+        """
+        Yield the result pages with their position, see :meth:`SearchHandler.iter_checkpoints`.
+
+        With enrichment, the position holds the DOIs of the search and the
+        number of DOIs whose Article Metadata was fetched, so resuming skips
+        the search and continues with the next metadata batch.
+        """
+        if not self._enriches(fields):
+            yield from super().iter_checkpoints(query, year_from, year_to, fields, since, position, filters)
+            return
+
+        if position is None:
+            dois = [d.doi for d in self._search_documents(query, year_from, year_to, since, filters)]
+            done = 0
+        else:
+            dois, done = position['dois'], position['done']
+        for batch, results in self._iter_metadata_batches(dois[done:]):
+            done += len(batch)
+            yield results, {'dois': dois, 'done': done}
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        """ Yield the records of the given DOIs using the Article Metadata API."""
+        for page in self._iter_metadata(dois):
+            yield from page
+
+    def _search_documents(self,
+                          query: str,
+                          year_from: Optional[str | int],
+                          year_to: Optional[str | int],
+                          since: Optional[str],
+                          filters: Optional[Filters] = None) -> list:
+        """Search the documents with a DOI using the ScienceDirectSearch API."""
+        year_from = _narrow_year_from(year_from, since)
+        search_results = self._request(ScienceDirectSearch, query, date=f'{year_from}-{year_to}',
+                                       **self._filter_params(filters))
+        return [d for d in search_results.results or [] if d.doi]
+
+    def _filter_params(self, filters: Optional[Filters]) -> dict:
+        """The parameters of the Search API for the filters it supports."""
+        self._local_filters(filters)
+        if not filters or filters.open_access is None:
+            return {}
+        return {'filters': {'openAccess': filters.open_access}}
+
+    def _enriches(self, fields: Optional[list[str]]) -> bool:
+        """Whether the Article Metadata is fetched for a search with the given fields."""
+        return self.enrich_metadata and (fields is None or 'abstract' in fields)
+
+    def _iter_metadata(self, dois: list[str]) -> Iterator[list[SearchResult]]:
+        """Fetch the Article Metadata of the DOIs in concurrent batches and yield them in order."""
+        for _, results in self._iter_metadata_batches(dois):
+            yield results
+
+    def _iter_metadata_batches(self, dois: list[str]) -> Iterator[tuple[list[str], list[SearchResult]]]:
+        """Fetch the Article Metadata of the DOIs in concurrent batches and yield each batch with its results."""
+        with ThreadPoolExecutor(max_workers=self._METADATA_WORKERS,
+                                thread_name_prefix="bibly-sciencedirect") as executor:
+            # Keep a bounded window of batches in flight so memory stays flat
+            pending = deque()
+            for batch in self._batch_dois(dois):
+                pending.append((batch, executor.submit(self._fetch_metadata, batch)))
+                if len(pending) >= 2 * self._METADATA_WORKERS:
+                    batch, future = pending.popleft()
+                    yield batch, future.result()
+            while pending:
+                batch, future = pending.popleft()
+                yield batch, future.result()
+
+    def _batch_dois(self, dois: list[str]) -> Iterator[list[str]]:
+        """Pack DOIs into batches whose query stays below the accepted query length."""
+        batch, length = [], 0
+        for doi in dois:
+            term_length = len(doi) + len('DOI() OR ')
+            if batch and length + term_length > self._max_query_length:
+                yield batch
+                batch, length = [], 0
+            batch.append(doi)
+            length += term_length
+        if batch:
+            yield batch
+
+    def _fetch_metadata(self, batch: list[str]) -> list[SearchResult]:
+        """
+        Fetch the Article Metadata of one batch of DOIs.
+
+        If the API rejects the query as too long, the accepted query length is
+        lowered for all later batches and this batch is split and retried. If
+        it rejects the query as invalid, the batch is split to isolate the
+        offending DOIs, which are skipped and counted in ``skipped_dois_total``.
+        """
+        q = ' OR '.join([f'DOI({doi})' for doi in batch])
+        try:
+            metrics.inc("requests_total", handler=self.__class__.__name__)
+            with self._timer('enrich'):
+                metadata_results = self.scheduler.call(self._METADATA_PROVIDER, ArticleMetadata, q)
+        except (Scopus400Error, Scopus414Error) as e:
+            # A batch built before the limit was lowered elsewhere is merely too long
+            too_long = isinstance(e, Scopus414Error) or len(q) > self._max_query_length
+            if len(batch) == 1:
+                if too_long:
+                    raise
+                logger.warning(f"{self.provider} skipped DOI {batch[0]}: {e}")
+                metrics.inc("skipped_dois_total", handler=self.__class__.__name__)
+                return []
+            if isinstance(e, Scopus414Error):
+                with self._lock:
+                    self._max_query_length = min(self._max_query_length, len(q) // 2)
+            middle = len(batch) // 2
+            return self._fetch_metadata(batch[:middle]) + self._fetch_metadata(batch[middle:])
 
         results = []
-        if search_results.results:
-            # Get all metadata including the abstract. The Article Metadata API
-            # rejects overly long queries, so batch the DOIs into chunks.
-            dois = [d.doi for d in search_results.results if d.doi]
-            for i in range(0, len(dois), self._METADATA_BATCH_SIZE):
-                batch = dois[i:i + self._METADATA_BATCH_SIZE]
-                q = ' OR '.join([f'DOI({doi})' for doi in batch])
-                metadata_results = ArticleMetadata(q)
-
-                for entry in metadata_results.results or []:
-                    results.append(
-                        SearchResult(
-                            doi=entry.doi,
-                            title=entry.title,
-                            abstract=entry.abstract_text,
-                            authors=entry.authors,
-                            date=entry.coverDate,
-                            source="ScienceDirect"
-                        )
+        with self._timer('parse'):
+            for entry in metadata_results.results or []:
+                results.append(
+                    SearchResult(
+                        doi=entry.doi,
+                        title=entry.title,
+                        abstract=entry.abstract_text,
+                        authors=entry.authors,
+                        date=entry.coverDate,
+                        source="ScienceDirect"
                     )
-
+                )
         return results
 
 
@@ -75,8 +224,17 @@ class SciencedirectHandler(SearchHandler):
 
         :param api_key: ScienceDirect API key
         :param api_token: ScienceDirect API token
+        :param sciencedirect_enrich: Whether to fetch the Article Metadata
+            (abstract, full author list) of every result. If False, results
+            only hold the fields of the search response, and the others can be
+            loaded later with ``BibLy.hydrate``. Defaults to True.
         """
         self.api_key = kwargs.get('scopus_key')
         self.api_token = kwargs.get('scopus_token')
+        self.enrich_metadata = kwargs.get('sciencedirect_enrich', True)
+        # The abstract needs the Article Metadata API
+        self.deferred_fields = ('abstract',) if self.enrich_metadata else ()
+        self._max_query_length = self._MAX_QUERY_LENGTH
+        self._lock = threading.Lock()
         super().__init__()
 
@@ -1,12 +1,30 @@
-from typing import Optional
+from typing import Iterator, Optional
 
 from pybliometrics.scopus import init, ScopusSearch
 
-from bibly.base_handler import SearchHandler
-from bibly.utils import log_count, log_initialization, log_search, PYBLIOMETRICS_CONFIG, SearchResult
+from bibly.base_handler import _configure, _narrow_year_from, SearchHandler
+from bibly.utils import Filters, log_count, log_initialization, PYBLIOMETRICS_CONFIG, SearchResult
 
 class ScopusHandler(SearchHandler):
     required_params = ['scopus_key']
+    provider = 'Scopus'
+    host = 'api.elsevier.com'
+    # pybliometrics pages with a cursor (subscriber access), which has no
+    # deep-paging limit, so searches are never split into shards
+    max_results = None
+
+    # Fields only returned by the COMPLETE view of the Scopus Search API
+    _COMPLETE_VIEW_FIELDS = {'abstract', 'authors'}
+    # Max number of DOIs per lookup query to avoid overly long requests
+    _LOOKUP_BATCH_SIZE = 25
+    supported_filters = frozenset({'doc_types', 'languages', 'open_access'})
+    # DOCTYPE codes of the unified document types
+    _DOC_TYPES = {'article': 'ar', 'review': 're', 'book': 'bk', 'book-chapter': 'ch', 'conference-paper': 'cp'}
+    # LANGUAGE names of ISO 639-1 codes
+    _LANGUAGES = {'ar': 'arabic', 'cs': 'czech', 'da': 'danish', 'de': 'german', 'en': 'english', 'es': 'spanish',
+                  'fi': 'finnish', 'fr': 'french', 'hu': 'hungarian', 'it': 'italian', 'ja': 'japanese',
+                  'ko': 'korean', 'nl': 'dutch', 'no': 'norwegian', 'pl': 'polish', 'pt': 'portuguese',
+                  'ru': 'russian', 'sv': 'swedish', 'tr': 'turkish', 'zh': 'chinese'}
 
     @log_initialization
     def initialize(self):
@@ -14,48 +32,92 @@ class ScopusHandler(SearchHandler):
         Initialize the Scopus search handler with API key and token.
         """
         if self.api_token:
-            init(config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key], inst_tokens=[self.api_token])
+            _configure(init, config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key], inst_tokens=[self.api_token])
         else:
-            init(config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key])
+            _configure(init, config_path=PYBLIOMETRICS_CONFIG, keys=[self.api_key])
     
     @log_count
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> int:
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
         """ Count the number of results for a given query using the Scopus API."""
         query += f" AND PUBYEAR > {year_from - 1}" if year_from else ""
         query += f" AND PUBYEAR < {year_to + 1}" if year_to else ""
+        query += self._filter_clauses(filters)
 
-        scopus_search = ScopusSearch(query, download=False, refresh=True)
+        scopus_search = self._request(ScopusSearch, query, download=False, refresh=True)
         return scopus_search.get_results_size()
         
     
-    @log_search
-    def search(self,
-               query: str,
-               year_from: Optional[str | int] = None,
-               year_to: Optional[str | int] = None) -> list[SearchResult]:
-        """ Search for a given query using the Scopus API."""
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        """
+        Yield the results for a given query using the Scopus API.
+
+        pybliometrics downloads the whole result set at once, so everything is
+        yielded as a single page. If neither abstracts nor authors are needed,
+        the lighter STANDARD view is requested. ``since`` narrows the
+        ``PUBYEAR`` clause to its year. Filters become ``DOCTYPE``,
+        ``LANGUAGE`` and ``OPENACCESS`` clauses.
+        """
+        year_from = _narrow_year_from(year_from, since)
         query += f" AND PUBYEAR > {year_from - 1}" if year_from else ""
         query += f" AND PUBYEAR < {year_to + 1}" if year_to else ""
+        query += self._filter_clauses(filters)
+
+        view = None
+        if fields is not None and not set(fields) & self._COMPLETE_VIEW_FIELDS:
+            view = 'STANDARD'
+        scopus_search = self._request(ScopusSearch, query, view=view)
+
+        with self._timer('parse'):
+            results = [self._to_result(entry) for entry in scopus_search.results or []]
+        yield results
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        """ Yield the records of the given DOIs using the Scopus API."""
+        for i in range(0, len(dois), self._LOOKUP_BATCH_SIZE):
+            batch = dois[i:i + self._LOOKUP_BATCH_SIZE]
+            q = ' OR '.join([f'DOI({doi})' for doi in batch])
+            scopus_search = self._request(ScopusSearch, q)
+            for entry in scopus_search.results or []:
+                yield self._to_result(entry)
 
-        scopus_search = ScopusSearch(query)
+    def _filter_clauses(self, filters: Optional[Filters]) -> str:
+        """The clauses to append to a query for the filters Scopus supports."""
+        self._local_filters(filters)
+        if not filters:
+            return ""
+        clauses = ""
+        if filters.doc_types:
+            clauses += " AND (" + " OR ".join(f"DOCTYPE({self._DOC_TYPES[t]})" for t in filters.doc_types) + ")"
+        if filters.languages:
+            unknown = sorted(set(filters.languages) - set(self._LANGUAGES))
+            if unknown:
+                raise ValueError(f"Scopus cannot filter by language(s) {unknown}")
+            clauses += " AND (" + " OR ".join(f"LANGUAGE({self._LANGUAGES[l]})" for l in filters.languages) + ")"
+        if filters.open_access is not None:
+            clauses += f" AND OPENACCESS({int(filters.open_access)})"
+        return clauses
 
-        results = []
-        if scopus_search.results:
-            for entry in scopus_search.results:
-                results.append(
-                    SearchResult(
-                        doi=entry.doi,
-                        title=entry.title,
-                        abstract=entry.description,
-                        authors=entry.author_names,
-                        date=entry.coverDate,
-                        source="Scopus"
-                    )
-                )
-        return results
+    @staticmethod
+    def _to_result(entry) -> SearchResult:
+        """ Convert a ScopusSearch document to a SearchResult."""
+        return SearchResult(
+            doi=entry.doi,
+            title=entry.title,
+            abstract=entry.description,
+            authors=entry.author_names,
+            date=entry.coverDate,
+            source="Scopus"
+        )
 
 
     def __init__(self, **kwargs):
@@ -1,57 +1,128 @@
-from typing import Optional
+from typing import Any, Iterator, Optional
 from sprynger import init, Meta
 
-from bibly.base_handler import SearchHandler
-from bibly.utils import log_count, log_initialization, log_search, SearchResult
+from bibly.base_handler import _configure, _date_from, _date_to, _narrow_date_from, SearchHandler
+from bibly.utils import Filters, log_count, log_initialization, SearchResult
 
 
 class SpringerHandler(SearchHandler):
     required_params = ['springer_key']
+    provider = 'Springer'
+    host = 'api.springernature.com'
+
+    # Max number of results retrieved per search
+    _MAX_RESULTS = 500
+    max_results = _MAX_RESULTS
+    # datefrom and dateto take full dates
+    date_windows = True
+    # Records per request, the page length of the Meta API for basic plans
+    _PAGE_SIZE = 25
+    # The Meta API only distinguishes journals from books, not document types
+    supported_filters = frozenset({'languages', 'open_access'})
 
     @log_initialization
     def initialize(self):
         """
         Initialize the Springer search handler with API key.
         """
-        init(api_key = self.api_key)
+        _configure(init, api_key=self.api_key)
 
     @log_count
     def count(self,
               query: str,
               year_from: Optional[str | int] = None,
-              year_to: Optional[str | int] = None) -> int:
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
           """ Count the number of results for a given query using the Springer API."""
-          query += f" AND datefrom:{year_from}-01-01" if year_from else ""
-          query += f" AND dateto:{year_to}-12-31" if year_to else ""
+          query += f" AND datefrom:{_date_from(year_from)}" if year_from else ""
+          query += f" AND dateto:{_date_to(year_to)}" if year_to else ""
+          query += self._filter_constraints(filters)
     
-          springer_search = Meta(query, nr_results=1, refresh=True)
+          springer_search = self._request(Meta, query, nr_results=1, refresh=True)
           return springer_search.results.total
 
-    @log_search
-    def search(self,
-               query: str,
-               year_from: Optional[str | int] = None,
-               year_to: Optional[str | int] = None) -> list[SearchResult]:
-        """ Search for a given query using the Springer API."""
-        query += f" AND datefrom:{year_from}-01-01" if year_from else ""
-        query += f" AND dateto:{year_to}-12-31" if year_to else ""
-
-        springer_search = Meta(query, nr_results=500)
-
-        results = []
-        for entry in springer_search:
-            creators = '; '.join([c.creator for c in entry.creators])
-            results.append(
-                SearchResult(
-                    doi=entry.doi,
-                    title=entry.title,
-                    abstract=entry.abstract,
-                    authors=creators,
-                    date=entry.publicationDate,
-                    source="Springer"
-                )
-            )
-        return results
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        """
+        Yield the results for a given query page by page using the Springer API.
+
+        The Meta API always returns full records, so ``fields`` is not used.
+        ``since`` narrows the ``datefrom`` clause to that day. Filters become
+        ``language`` and ``openaccess`` constraints.
+        """
+        for results, _ in self.iter_checkpoints(query, year_from, year_to, fields, since, filters=filters):
+            yield results
+
+    def iter_checkpoints(self,
+                         query: str,
+                         year_from: Optional[str | int] = None,
+                         year_to: Optional[str | int] = None,
+                         fields: Optional[list[str]] = None,
+                         since: Optional[str] = None,
+                         position: Any = None,
+                         filters: Optional[Filters] = None) -> Iterator[tuple[list[SearchResult], Any]]:
+        """
+        Yield the result pages with their position, see :meth:`SearchHandler.iter_checkpoints`.
+
+        The position is the offset of the next record, so resuming fetches no page twice.
+        """
+        date_from = _narrow_date_from(year_from, since)
+        query += f" AND datefrom:{date_from}" if date_from else ""
+        query += f" AND dateto:{_date_to(year_to)}" if year_to else ""
+        query += self._filter_constraints(filters)
+
+        start = position or 1
+        while start <= self._MAX_RESULTS:
+            nr_results = min(self._PAGE_SIZE, self._MAX_RESULTS - start + 1)
+            springer_search = self._request(Meta, query, start=start, nr_results=nr_results)
+
+            with self._timer('parse'):
+                results = [self._to_result(entry) for entry in springer_search]
+
+            start += nr_results
+            yield results, start
+            if len(results) < nr_results or start > springer_search.results.total:
+                break
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        """ Yield the records of the given DOIs using the Springer API."""
+        for i in range(0, len(dois), self._PAGE_SIZE):
+            batch = dois[i:i + self._PAGE_SIZE]
+            q = ' OR '.join([f'doi:{doi}' for doi in batch])
+            springer_search = self._request(Meta, q, nr_results=len(batch))
+            for entry in springer_search:
+                yield self._to_result(entry)
+
+    def _filter_constraints(self, filters: Optional[Filters]) -> str:
+        """The constraints to append to a query for the filters Springer supports."""
+        self._local_filters(filters)
+        if not filters:
+            return ""
+        constraints = ""
+        if filters.languages:
+            constraints += " AND (" + " OR ".join(f"language:{l}" for l in filters.languages) + ")"
+        if filters.open_access is False:
+            raise ValueError("Springer can only filter for open access, not exclude it")
+        if filters.open_access:
+            constraints += " AND openaccess:true"
+        return constraints
+
+    @staticmethod
+    def _to_result(entry) -> SearchResult:
+        """ Convert a Meta record to a SearchResult. The list of creators is joined by the normalization."""
+        return SearchResult(
+            doi=entry.doi,
+            title=entry.title,
+            abstract=entry.abstract,
+            authors=[c.creator for c in entry.creators],
+            date=entry.publicationDate,
+            source="Springer"
+        )
 
     def __init__(self, **kwargs):
         """
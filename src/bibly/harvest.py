@@ -0,0 +1,169 @@
+"""Resumable, checkpointed harvesting of long-running searches."""
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Optional
+import hashlib
+import json
+import logging
+import os
+import time
+
+from bibly.base_handler import SearchHandler, _unrequested_fields
+from bibly.utils import HARVEST_DIR, normalize_query, normalize_results, SearchResult
+
+logger = logging.getLogger("bibly")
+
+
+class HarvestJob:
+    """
+    Harvest of one query with one handler that survives failures and restarts.
+
+    After every page, the page's results are appended to ``results.jsonl``
+    and the handler's resume position (see
+    :meth:`SearchHandler.iter_checkpoints`) is written to ``state.json`` in
+    the job directory. Running a job again continues after the last
+    checkpoint. A failed page is retried from the last checkpoint with
+    exponential backoff, without restarting the query. Once complete, the
+    checkpoint holds the result set and running the job again returns it
+    without requests, unless it is refreshed.
+    """
+
+    def __init__(self,
+                 handler: SearchHandler,
+                 query: str,
+                 year_from: Optional[str | int] = None,
+                 year_to: Optional[str | int] = None,
+                 fields: Optional[list[str]] = None,
+                 directory: Optional[str | Path] = None,
+                 max_retries: int = 3,
+                 backoff: float = 5.0):
+        """
+        :param handler: The handler to harvest with.
+        :param query: The search query
+        :param year_from: Optional start year for the search
+        :param year_to: Optional end year for the search
+        :param fields: Optional fields to retrieve, see :meth:`BibLy.search`.
+        :param directory: Directory of the checkpoint. Defaults to a directory
+            below ``HARVEST_DIR`` named after the handler and a hash of the search.
+        :param max_retries: Maximum number of consecutive retries of a failed page.
+        :param backoff: Delay in seconds before the first retry, doubled on each further retry.
+        """
+        self.handler = handler
+        self.query = query
+        self.year_from = year_from
+        self.year_to = year_to
+        self.fields = fields
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._unrequested = _unrequested_fields(fields)
+        self._search = {"query": normalize_query(query),
+                        "year_from": None if year_from is None else str(year_from),
+                        "year_to": None if year_to is None else str(year_to),
+                        "fields": None if fields is None else sorted(fields)}
+        if directory is None:
+            digest = hashlib.sha1(json.dumps(self._search, sort_keys=True).encode()).hexdigest()[:16]
+            directory = HARVEST_DIR / f"{handler.__class__.__name__}-{digest}"
+        self.directory = Path(directory)
+        self._state_path = self.directory / "state.json"
+        self._results_path = self.directory / "results.jsonl"
+
+    def run(self, refresh: bool = False) -> list[SearchResult]:
+        """
+        Harvest the remaining pages and return all results.
+
+        :param refresh: If True, delete the checkpoint first and harvest from
+            scratch, e.g. to pick up records published since a completed run.
+
+        :raises Exception: The error of a page that still fails after
+            ``max_retries`` retries. The checkpoint is kept, so the job can be
+            run again later.
+        """
+        if refresh:
+            self.reset()
+        state = self._load()
+        name = self.handler.__class__.__name__
+        retries = 0
+        while not state["complete"]:
+            try:
+                for page, position in self.handler.iter_checkpoints(self.query, self.year_from, self.year_to,
+                                                                    self.fields, position=state["position"]):
+                    self._commit(state, page, position)
+                    retries = 0
+                state["complete"] = True
+                self._save(state)
+            except Exception as e:
+                if retries >= self.max_retries:
+                    logger.error(f"HARVEST| {name:<20} | query='{self.query}' | "
+                                 f"page {state['pages'] + 1} FAILED: {e}")
+                    raise
+                delay = self.backoff * 2 ** retries
+                retries += 1
+                logger.warning(f"HARVEST| {name:<20} | query='{self.query}' | "
+                               f"page {state['pages'] + 1} failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+        logger.info(f"HARVEST| {name:<20} | query='{self.query}' | "
+                    f"pages={state['pages']} | results={state['results']}")
+        return self.results()
+
+    @property
+    def complete(self) -> bool:
+        """Whether the checkpoint holds the complete result set."""
+        return self._state_path.exists() and self._read_state()["complete"]
+
+    def results(self) -> list[SearchResult]:
+        """The results checkpointed so far."""
+        if not self._state_path.exists():
+            return []
+        size = self._read_state()["size"]
+        with open(self._results_path, "rb") as file:
+            lines = file.read(size).splitlines()
+        return [SearchResult(**json.loads(line)) for line in lines]
+
+    def reset(self):
+        """Delete the checkpoint, so the next run starts from scratch."""
+        self._state_path.unlink(missing_ok=True)
+        self._results_path.unlink(missing_ok=True)
+
+    def _load(self) -> dict:
+        """Load the checkpoint, dropping results written after it, or start a new one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._state_path.exists():
+            state = self._read_state()
+            if state["search"] != self._search:
+                raise ValueError(f"{self.directory} holds the checkpoint of another search: {state['search']}")
+        else:
+            state = {"search": self._search, "position": None, "pages": 0, "results": 0,
+                     "size": 0, "complete": False}
+        # Results of a page whose checkpoint was not written are fetched again
+        with open(self._results_path, "ab") as file:
+            file.truncate(state["size"])
+        return state
+
+    def _commit(self, state: dict, page: list[SearchResult], position: Any):
+        """Normalize a page, append it to the results and move the checkpoint past it."""
+        normalize_results(page)
+        for result in page:
+            for name in self._unrequested:
+                setattr(result, name, None)
+        with open(self._results_path, "ab") as file:
+            file.writelines(json.dumps(asdict(result), ensure_ascii=False).encode() + b"\n" for result in page)
+            file.flush()
+            os.fsync(file.fileno())
+            state["size"] = file.tell()
+        state["position"] = position
+        state["pages"] += 1
+        state["results"] += len(page)
+        self._save(state)
+
+    def _save(self, state: dict):
+        """Replace the state file atomically."""
+        temporary = self._state_path.with_suffix(".tmp")
+        with open(temporary, "w") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self._state_path)
+
+    def _read_state(self) -> dict:
+        with open(self._state_path) as file:
+            return json.load(file)
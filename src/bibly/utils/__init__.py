@@ -1,5 +1,20 @@
+from bibly.utils.cache import *
+from bibly.utils.concurrency import *
 from bibly.utils.constants import *
+from bibly.utils.count_memo import *
 from bibly.utils.data_types import *
 from bibly.utils.dedup import *
+from bibly.utils.disk_dedup import *
+from bibly.utils.export import *
+from bibly.utils.filters import *
+from bibly.utils.fusion import *
+from bibly.utils.incremental import *
+from bibly.utils.local_index import *
 from bibly.utils.logger import *
-from bibly.utils.parse import *
\ No newline at end of file
+from bibly.utils.metrics import *
+from bibly.utils.near_dedup import *
+from bibly.utils.normalize import *
+from bibly.utils.parse import *
+from bibly.utils.rate_limit import *
+from bibly.utils.sharding import *
+from bibly.utils.singleflight import *
\ No newline at end of file
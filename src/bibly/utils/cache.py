@@ -0,0 +1,188 @@
+"""Persistent cache for search results and counts."""
+from dataclasses import astuple
+from pathlib import Path
+from typing import Any, Optional
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from bibly.utils.constants import RESULT_CACHE
+from bibly.utils.data_types import SearchResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    handler TEXT NOT NULL,
+    query TEXT NOT NULL,
+    year_from TEXT NOT NULL,
+    year_to TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, handler, query, year_from, year_to)
+)
+"""
+
+
+def normalize_query(query: str) -> str:
+    """Strip the query and collapse internal whitespace, so formatting does not split cache keys."""
+    return " ".join(query.split())
+
+
+class ResultCache:
+    """
+    SQLite-backed cache for the search results and counts of each handler.
+
+    Entries are keyed by kind (``count``, or ``search`` optionally followed
+    by ``:sharded`` and a field selection, e.g. ``search:sharded:date,title``,
+    either optionally followed by filters, e.g. ``count[open_access=1]``), handler name,
+    normalized query and year range. Entries older than ``ttl`` are ignored
+    and the least recently used entries are evicted once the payloads exceed
+    ``max_bytes``. The cache is safe to share between threads.
+    """
+
+    def __init__(self,
+                 path: str | Path = RESULT_CACHE,
+                 ttl: Optional[float] = 7 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 ** 2):
+        """
+        :param path: Path of the SQLite database. Created if it does not exist.
+        :param ttl: Time to live of an entry in seconds. None keeps entries forever.
+        :param max_bytes: Maximum size of all (compressed) payloads in bytes.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def get(self,
+            kind: str,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> Any:
+        """
+        Look up a cached value.
+
+        :return: The cached value, or None if it is missing or expired.
+        """
+        key = self.key(kind, handler, query, year_from, year_to)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, created FROM entries WHERE kind=? AND handler=? AND query=? "
+                "AND year_from=? AND year_to=?", key).fetchone()
+            if row is None:
+                return None
+            payload, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed=? WHERE kind=? AND handler=? AND query=? "
+                "AND year_from=? AND year_to=?", (now, *key))
+
+        value = json.loads(zlib.decompress(payload))
+        if kind.startswith("search"):
+            return [SearchResult(*row) for row in value]
+        return value
+
+    def age(self,
+            kind: str,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> Optional[float]:
+        """
+        Seconds since an entry was stored.
+
+        :return: The age, or None if the entry is missing.
+        """
+        key = self.key(kind, handler, query, year_from, year_to)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT created FROM entries WHERE kind=? AND handler=? AND query=? "
+                "AND year_from=? AND year_to=?", key).fetchone()
+        return None if row is None else max(0.0, time.time() - row[0])
+
+    def set(self,
+            kind: str,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int],
+            year_to: Optional[str | int],
+            value: Any):
+        """Store a value, replacing any previous entry with the same key."""
+        if kind.startswith("search"):
+            value = [astuple(result) for result in value]
+        payload = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        key = self.key(kind, handler, query, year_from, year_to)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, payload, len(payload), now, now))
+            self._evict()
+
+    def invalidate(self,
+                   handler: Optional[str] = None,
+                   query: Optional[str] = None,
+                   kind: Optional[str] = None) -> int:
+        """
+        Remove the entries matching all given criteria. Without criteria, everything is removed.
+
+        :return: The number of removed entries.
+        """
+        clauses, params = [], []
+        for column, value in (("handler", handler), ("kind", kind)):
+            if value is not None:
+                clauses.append(f"{column}=?")
+                params.append(value)
+        if query is not None:
+            clauses.append("query=?")
+            params.append(normalize_query(query))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock, self._conn:
+            return self._conn.execute(f"DELETE FROM entries{where}", params).rowcount
+
+    def clear(self):
+        """Remove all entries."""
+        self.invalidate()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """Drop expired entries and the least recently used ones until the size bound holds."""
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT rowid, size FROM entries ORDER BY accessed").fetchall()
+        stale = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((rowid,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE rowid=?", stale)
+
+    @staticmethod
+    def key(kind: str,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> tuple[str, str, str, str, str]:
+        """Build the primary key of an entry. Years are stored as text so None and int compare equal across runs."""
+        return (kind, handler, normalize_query(query),
+                "" if year_from is None else str(year_from),
+                "" if year_to is None else str(year_to))
@@ -0,0 +1,49 @@
+"""Helpers to run handler calls concurrently."""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+import time
+
+
+def run_concurrently(tasks: dict[str, Callable[[], Any]],
+                     max_workers: Optional[int] = None,
+                     timeout: Optional[float] = None) -> tuple[dict[str, Any], dict[str, Exception]]:
+    """
+    Run named callables on a thread pool and collect their outcomes.
+
+    A task that raises, or that has not finished ``timeout`` seconds after the
+    call started, is reported in the errors instead of aborting the others.
+    Timed-out tasks cannot be interrupted; they finish in the background and
+    their result is discarded.
+
+    :param tasks: Mapping of task name to a callable without arguments.
+    :param max_workers: Maximum number of threads. Defaults to one per task.
+    :param timeout: Optional time budget in seconds for each task.
+
+    :return: A tuple ``(results, errors)`` of dictionaries keyed by task name.
+        Both follow the insertion order of ``tasks``.
+    """
+    results: dict[str, Any] = {}
+    errors: dict[str, Exception] = {}
+    if not tasks:
+        return results, errors
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(tasks),
+                                  thread_name_prefix="bibly")
+    try:
+        start = time.monotonic()
+        futures = {name: executor.submit(task) for name, task in tasks.items()}
+        for name, future in futures.items():
+            remaining = None
+            if timeout is not None:
+                remaining = max(0.0, timeout - (time.monotonic() - start))
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                future.cancel()
+                errors[name] = TimeoutError(f"{name} did not finish within {timeout}s")
+            except Exception as e:
+                errors[name] = e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, errors
@@ -7,3 +7,15 @@ from pathlib import Path
 # If the file does not exist, pybliometrics creates a fork-compatible one on
 # ``init`` using the provided keys.
 PYBLIOMETRICS_CONFIG = Path.home() / '.config' / 'pybliometrics_bibly.cfg'
+
+# Default location of the persistent result cache (see ``ResultCache``)
+RESULT_CACHE = Path.home() / '.cache' / 'bibly' / 'results.sqlite'
+
+# Default location of the result sets of incremental searches (see ``IncrementalStore``)
+INCREMENTAL_STORE = Path.home() / '.cache' / 'bibly' / 'incremental.sqlite'
+
+# Default location of the local full-text index (see ``LocalIndex``)
+LOCAL_INDEX = Path.home() / '.cache' / 'bibly' / 'index.sqlite'
+
+# Default directory of the checkpoints of harvest jobs (see ``HarvestJob``)
+HARVEST_DIR = Path.home() / '.cache' / 'bibly' / 'harvests'
@@ -0,0 +1,102 @@
+"""In-memory memo of recent counts, for low-latency count estimates."""
+from collections import OrderedDict
+from typing import Optional
+import threading
+import time
+
+from bibly.utils.cache import normalize_query
+
+
+class CountMemo:
+    """
+    Thread-safe in-memory memo of the counts of each handler.
+
+    Entries are keyed by handler name, normalized query and year range.
+    Entries younger than ``ttl`` are fresh. Older entries can still be served
+    until ``max_stale`` while they are revalidated, see
+    ``BibLy.estimate_count``. The least recently used entries are evicted
+    beyond ``max_entries``.
+    """
+
+    def __init__(self,
+                 ttl: float = 300,
+                 max_stale: Optional[float] = 24 * 3600,
+                 max_entries: int = 10_000):
+        """
+        :param ttl: Seconds during which a count is fresh.
+        :param max_stale: Seconds after which a count is dropped instead of
+            served while it is revalidated. None keeps stale counts forever.
+        :param max_entries: Maximum number of memoized counts.
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[int, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> Optional[tuple[int, float]]:
+        """
+        Look up a memoized count.
+
+        :return: A tuple ``(count, age)`` with the age in seconds, or None if
+            the count is missing or older than ``max_stale``.
+        """
+        key = self.key(handler, query, year_from, year_to)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            count, created = entry
+            age = time.monotonic() - created
+            if self.max_stale is not None and age > self.max_stale:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return count, age
+
+    def set(self,
+            handler: str,
+            query: str,
+            year_from: Optional[str | int],
+            year_to: Optional[str | int],
+            count: int,
+            age: float = 0.0):
+        """
+        Memoize a count, replacing any previous one.
+
+        :param age: Seconds since the count was retrieved, e.g. for a count
+            read from a :class:`ResultCache`.
+        """
+        key = self.key(handler, query, year_from, year_to)
+        with self._lock:
+            self._entries[key] = (count, time.monotonic() - age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_fresh(self, age: float) -> bool:
+        """Whether a count of the given age does not need to be revalidated."""
+        return age <= self.ttl
+
+    def clear(self):
+        """Remove all counts."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def key(handler: str,
+            query: str,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> tuple[str, str, str, str]:
+        """The key of a count, equal for queries that only differ in formatting."""
+        return (handler, normalize_query(query),
+                "" if year_from is None else str(year_from),
+                "" if year_to is None else str(year_to))
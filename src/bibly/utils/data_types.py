@@ -1,13 +1,167 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Iterator, Optional
+import sys
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """
-    Represents a search result from the Bibly API."""
+    Represents a search result from the Bibly API.
+
+    Uses ``__slots__`` instead of a per-instance ``__dict__`` to keep large
+    result sets compact. See :class:`ResultBatch` for a columnar container.
+
+    ``provenance`` maps field names to the provider each value came from. It
+    is only set on results merged across providers, see ``BibLy.search``."""
     doi: Optional[str]
     title: Optional[str]
     abstract: Optional[str]
     authors: Optional[str]
     date: Optional[str]
     source: Optional[str]
+    provenance: Optional[dict[str, str]] = field(default=None, repr=False, compare=False)
+
+
+class ResultBatch:
+    """
+    Columnar container for search results.
+
+    Each field of :class:`SearchResult` is stored as one Python list, which
+    handlers append to and deduplication reorders without a dependency on
+    ``pyarrow``. Values of the low-cardinality columns (``source``, ``date``,
+    ``authors``) are shared, so repeated strings are held only once.
+    Converting to and from :class:`SearchResult` is lossless, except for
+    ``provenance``, which is not stored. Exports to Arrow or pandas copy the
+    columns once.
+    """
+    FIELDS: tuple[str, ...] = tuple(f.name for f in fields(SearchResult) if f.name != 'provenance')
+    _SHARED_FIELDS = ('source', 'date', 'authors')
+
+    def __init__(self, columns: Optional[dict[str, list]] = None):
+        """
+        :param columns: Optional mapping of field name to column. All fields
+            must be present and the columns must have the same length.
+        """
+        self._pool: dict[str, str] = {}
+        if columns is None:
+            self.columns: dict[str, list] = {name: [] for name in self.FIELDS}
+            return
+        missing = set(self.FIELDS) - set(columns)
+        if missing:
+            raise ValueError(f"Missing columns: {sorted(missing)}")
+        if len({len(columns[name]) for name in self.FIELDS}) > 1:
+            raise ValueError("All columns must have the same length")
+        self.columns = {name: list(columns[name]) for name in self.FIELDS}
+        for name in self._SHARED_FIELDS:
+            self.columns[name] = [self._share(value) for value in self.columns[name]]
+
+    @classmethod
+    def from_results(cls, results: Iterable[SearchResult]) -> 'ResultBatch':
+        """Build a batch from search results, e.g. a handler's ``iter_search`` stream."""
+        batch = cls()
+        batch.extend(results)
+        return batch
+
+    def append(self, result: SearchResult):
+        """Append a single search result."""
+        for name in self.FIELDS:
+            value = getattr(result, name)
+            if name in self._SHARED_FIELDS:
+                value = self._share(value)
+            self.columns[name].append(value)
+
+    def extend(self, results: Iterable[SearchResult]):
+        """Append several search results."""
+        for result in results:
+            self.append(result)
+
+    def take(self, indices: Iterable[int]) -> 'ResultBatch':
+        """Return a new batch with the rows at the given positions, in that order."""
+        indices = list(indices)
+        batch = ResultBatch()
+        batch.columns = {name: [column[i] for i in indices] for name, column in self.columns.items()}
+        batch._pool = self._pool
+        return batch
+
+    def to_results(self) -> list[SearchResult]:
+        """Convert the batch back to a list of search results."""
+        return list(self)
+
+    def to_arrow(self):
+        """
+        Convert the batch to a ``pyarrow.Table``. The ``source`` column is dictionary encoded.
+
+        The columns are copied into Arrow buffers. Requires ``pyarrow``.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("ResultBatch.to_arrow requires pyarrow: pip install pyarrow") from e
+        arrays = {name: pa.array(column, type=pa.string()) for name, column in self.columns.items()}
+        arrays['source'] = arrays['source'].dictionary_encode()
+        return pa.table(arrays)
+
+    def to_pandas(self):
+        """
+        Convert the batch to a ``pandas.DataFrame``.
+
+        Goes through Arrow-backed columns if ``pyarrow`` is installed, so the
+        frame holds Arrow buffers rather than one Python object per cell.
+        Requires ``pandas``.
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("ResultBatch.to_pandas requires pandas: pip install pandas") from e
+        try:
+            return self.to_arrow().to_pandas(types_mapper=pd.ArrowDtype)
+        except ImportError:
+            frame = pd.DataFrame(self.columns)
+            frame['source'] = frame['source'].astype('category')
+            return frame
+
+    def _share(self, value: Optional[str]) -> Optional[str]:
+        """Return the shared instance of a string value."""
+        if value is None:
+            return None
+        if len(value) < 32:
+            return sys.intern(value)
+        return self._pool.setdefault(value, value)
+
+    def __len__(self) -> int:
+        return len(self.columns['doi'])
+
+    def __iter__(self) -> Iterator[SearchResult]:
+        for row in zip(*(self.columns[name] for name in self.FIELDS)):
+            yield SearchResult(*row)
+
+    def __getitem__(self, index: int | slice) -> 'SearchResult | ResultBatch':
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return SearchResult(*(self.columns[name][index] for name in self.FIELDS))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ResultBatch) and self.columns == other.columns
+
+    def __repr__(self) -> str:
+        return f"ResultBatch({len(self)} results)"
+
+
+@dataclass(slots=True)
+class TaggedResult:
+    """
+    A search result together with the queries that returned it, see ``BibLy.search_many``."""
+    result: SearchResult
+    queries: list[str]
+
+
+@dataclass(slots=True)
+class CountResult:
+    """
+    The count of one handler returned by ``BibLy.estimate_count``.
+
+    ``status`` is ``exact`` for a count fetched within the latency budget,
+    ``cached`` for a memoized count (``age`` seconds old) and ``missing`` if
+    no count was available in time."""
+    count: Optional[int]
+    status: str
+    age: Optional[float] = None
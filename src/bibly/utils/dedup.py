@@ -1,6 +1,7 @@
 import re
+from typing import Iterable, Iterator
 
-from bibly.utils.data_types import SearchResult
+from bibly.utils.data_types import ResultBatch, SearchResult
 
 _WHITESPACE_RE = re.compile(r"\s+")
 
@@ -21,35 +22,90 @@ def _normalize_doi(doi: str | None) -> str | None:
     return normalized or None
 
 
-def deduplicate(results: list[SearchResult]) -> list[SearchResult]:
+class Deduplicator:
     """
-    Remove duplicate search results, keeping the first occurrence.
+    Stateful deduplicator that remembers the keys it has seen across calls.
 
-    Two entries are considered duplicates if they share the same normalized
-    title OR the same DOI. Empty titles and empty DOIs never match, so entries
-    lacking both are always kept.
+    Feed it consecutive chunks of a result stream (e.g. pages) and it drops
+    every entry that duplicates an entry of the current or any earlier chunk,
+    with the same semantics as :func:`deduplicate`.
+    """
 
-    :param results: The search results to deduplicate.
+    def __init__(self):
+        self.seen_titles: set[str] = set()
+        self.seen_dois: set[str] = set()
 
-    :return: The deduplicated results, in their original order.
-    """
-    seen_titles: set[str] = set()
-    seen_dois: set[str] = set()
-    unique: list[SearchResult] = []
+    def is_duplicate(self, result: SearchResult) -> bool:
+        """
+        Check whether a result duplicates an earlier one and remember its keys if not.
 
-    for result in results:
-        title_key = _normalize_title(result.title)
-        doi_key = _normalize_doi(result.doi)
+        :param result: The search result to check.
+
+        :return: True if the result was seen before, False otherwise.
+        """
+        return self._is_duplicate(result.title, result.doi)
 
-        is_duplicate = (title_key is not None and title_key in seen_titles) or \
-                       (doi_key is not None and doi_key in seen_dois)
+    def _is_duplicate(self, title: str | None, doi: str | None) -> bool:
+        """Check a (title, DOI) pair and remember its keys if it is new."""
+        title_key = _normalize_title(title)
+        doi_key = _normalize_doi(doi)
+
+        is_duplicate = (title_key is not None and title_key in self.seen_titles) or \
+                       (doi_key is not None and doi_key in self.seen_dois)
         if is_duplicate:
-            continue
+            return True
 
         if title_key is not None:
-            seen_titles.add(title_key)
+            self.seen_titles.add(title_key)
         if doi_key is not None:
-            seen_dois.add(doi_key)
-        unique.append(result)
+            self.seen_dois.add(doi_key)
+        return False
+
+    def __call__(self, results: Iterable[SearchResult]) -> list[SearchResult]:
+        """
+        Remove the duplicates from a chunk of results.
+
+        :param results: The next chunk of search results.
+
+        :return: The entries of the chunk that were not seen before, in order.
+        """
+        return [result for result in results if not self.is_duplicate(result)]
+
+
+def iter_deduplicate(results: Iterable[SearchResult]) -> Iterator[SearchResult]:
+    """
+    Lazily remove duplicate search results from a stream, keeping the first occurrence.
 
-    return unique
+    Uses the same semantics as :func:`deduplicate` but only holds the seen
+    keys in memory, not the results themselves.
+
+    :param results: An iterable of search results, e.g. from ``iter_search``.
+
+    :return: An iterator over the unique results, in their original order.
+    """
+    deduplicator = Deduplicator()
+    for result in results:
+        if not deduplicator.is_duplicate(result):
+            yield result
+
+
+def deduplicate(results: list[SearchResult] | ResultBatch) -> list[SearchResult] | ResultBatch:
+    """
+    Remove duplicate search results, keeping the first occurrence.
+
+    Two entries are considered duplicates if they share the same normalized
+    title OR the same DOI. Empty titles and empty DOIs never match, so entries
+    lacking both are always kept.
+
+    :param results: The search results to deduplicate. A :class:`ResultBatch`
+        is processed column-wise without materializing its rows.
+
+    :return: The deduplicated results, in their original order and of the same
+        type as ``results``.
+    """
+    if isinstance(results, ResultBatch):
+        deduplicator = Deduplicator()
+        keys = zip(results.columns['title'], results.columns['doi'])
+        return results.take(i for i, (title, doi) in enumerate(keys)
+                            if not deduplicator._is_duplicate(title, doi))
+    return Deduplicator()(results)
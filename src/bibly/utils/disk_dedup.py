@@ -0,0 +1,172 @@
+"""Out-of-core deduplication of result streams larger than memory, backed by SQLite."""
+from dataclasses import dataclass
+from hashlib import blake2b
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import json
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bibly.utils.data_types import SearchResult
+from bibly.utils.dedup import _normalize_doi, _normalize_title
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger("bibly")
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY)"
+
+
+@dataclass(slots=True)
+class DedupStats:
+    """Throughput and memory of a :class:`DiskDeduplicator`."""
+    results: int = 0
+    unique: int = 0
+    seconds: float = 0.0
+    # Peak resident memory of the process in bytes, None where unavailable
+    peak_rss: Optional[int] = None
+
+    @property
+    def results_per_second(self) -> Optional[float]:
+        return self.results / self.seconds if self.seconds else None
+
+
+class DiskDeduplicator:
+    """
+    Deduplicator that keeps the seen keys on disk instead of in memory.
+
+    Same semantics as :func:`deduplicate`: first occurrence wins, and entries
+    match on the normalized title OR the DOI. Each key is stored as a 64-bit
+    BLAKE2b digest in a SQLite table, so memory is bounded by the chunk size
+    and the SQLite page cache, not by the number of results. With 64-bit
+    digests, a false match is expected only once in billions of keys.
+    """
+
+    def __init__(self,
+                 path: Optional[str | Path] = None,
+                 chunk_size: int = 50_000,
+                 cache_bytes: int = 64 * 1024 ** 2):
+        """
+        :param path: Path of the SQLite database of seen keys. Defaults to a
+            temporary file that is deleted on :meth:`close`.
+        :param chunk_size: Number of results held in memory and checked at once by :meth:`iter`.
+        :param cache_bytes: Size of the SQLite page cache.
+        """
+        self.chunk_size = chunk_size
+        self.stats = DedupStats()
+        self._directory = None
+        if path is None:
+            self._directory = tempfile.TemporaryDirectory(prefix="bibly-dedup-")
+            path = Path(self._directory.name) / "seen.sqlite"
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(f"PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF; "
+                                 f"PRAGMA cache_size=-{cache_bytes // 1024}; {_SCHEMA};")
+
+    def __call__(self, results: Iterable[SearchResult]) -> list[SearchResult]:
+        """
+        Remove the duplicates from a chunk of results.
+
+        :param results: The next chunk of search results. It is held in memory.
+
+        :return: The entries of the chunk that were not seen before, in order.
+        """
+        start = time.perf_counter()
+        results = list(results)
+        keys = list(zip(_digests(b"t", map(_normalize_title, (result.title for result in results))),
+                        _digests(b"d", map(_normalize_doi, (result.doi for result in results)))))
+        seen = self._lookup({key for pair in keys for key in pair if key is not None})
+
+        unique, new = [], []
+        for result, (title_key, doi_key) in zip(results, keys):
+            if title_key in seen or doi_key in seen:
+                continue
+            unique.append(result)
+            for key in (title_key, doi_key):
+                if key is not None:
+                    seen.add(key)
+                    new.append(key)
+        # Keys are passed as one JSON array, which is much faster than one statement per key
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO seen SELECT value FROM json_each(?)",
+                               (json.dumps(sorted(new)),))
+
+        self.stats.results += len(results)
+        self.stats.unique += len(unique)
+        self.stats.seconds += time.perf_counter() - start
+        self.stats.peak_rss = _peak_rss()
+        return unique
+
+    def iter(self, results: Iterable[SearchResult]) -> Iterator[SearchResult]:
+        """Lazily remove the duplicates from a stream, ``chunk_size`` results at a time."""
+        iterator = iter(results)
+        while chunk := list(islice(iterator, self.chunk_size)):
+            yield from self(chunk)
+
+    def close(self):
+        """Close the database and delete it if it is temporary."""
+        self._conn.close()
+        if self._directory is not None:
+            self._directory.cleanup()
+
+    def __enter__(self) -> "DiskDeduplicator":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of distinct keys seen."""
+        return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def _lookup(self, keys: set[int]) -> set[int]:
+        """The keys that were seen before, looked up in key order for cache locality."""
+        rows = self._conn.execute("SELECT seen.key FROM json_each(?) JOIN seen ON seen.key = value",
+                                  (json.dumps(sorted(keys)),))
+        return {key for key, in rows}
+
+
+def iter_deduplicate_on_disk(results: Iterable[SearchResult],
+                             path: Optional[str | Path] = None,
+                             chunk_size: int = 50_000) -> Iterator[SearchResult]:
+    """
+    Lazily remove duplicate search results from a stream in bounded memory, keeping the first occurrence.
+
+    Uses the semantics of :func:`deduplicate` with the seen keys on disk, see
+    :class:`DiskDeduplicator`. Its statistics are logged when the stream ends.
+
+    :param results: An iterable of search results, e.g. from ``iter_search``.
+    :param path: Optional path of the database of seen keys, see :class:`DiskDeduplicator`.
+    :param chunk_size: Number of results held in memory at once.
+
+    :return: An iterator over the unique results, in their original order.
+    """
+    with DiskDeduplicator(path, chunk_size) as deduplicator:
+        yield from deduplicator.iter(results)
+        stats = deduplicator.stats
+        peak = f"{stats.peak_rss / 1024 ** 2:.0f} MiB" if stats.peak_rss is not None else "n/a"
+        logger.info(f"DEDUP  | {stats.results} results, {stats.unique} unique | "
+                    f"{stats.results_per_second or 0:,.0f} results/s | peak RSS {peak}")
+
+
+def _digests(kind: bytes, keys: Iterable[Optional[str]]) -> list[Optional[int]]:
+    """Signed 64-bit digests of normalized keys, prefixed with their kind so titles never match DOIs."""
+    from_bytes = int.from_bytes
+    return [None if key is None
+            else from_bytes(blake2b(kind + key.encode(), digest_size=8).digest(), "big", signed=True)
+            for key in keys]
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident memory of the process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
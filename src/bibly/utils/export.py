@@ -0,0 +1,245 @@
+"""Streaming export of search results to Parquet, JSONL, CSV, BibTeX and RIS."""
+from abc import ABC, abstractmethod
+from itertools import islice
+from pathlib import Path
+from typing import IO, Iterable, Optional
+import csv
+import gzip
+import json
+import logging
+import queue
+import re
+import threading
+
+from bibly.utils.data_types import ResultBatch, SearchResult
+from bibly.utils.near_dedup import _fold
+from bibly.utils.normalize import split_authors
+
+logger = logging.getLogger("bibly")
+
+# Format of each file suffix, after stripping a trailing ``.gz``
+EXPORT_FORMATS = {
+    ".parquet": "parquet",
+    ".jsonl": "jsonl",
+    ".csv": "csv",
+    ".bib": "bibtex",
+    ".ris": "ris",
+}
+# Number of chunks queued between the producer and the writer thread
+_QUEUE_SIZE = 2
+_BIBTEX_SPECIAL_RE = re.compile(r"([\\{}%&$#_])")
+_BIBTEX_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+
+class _TextWriter(ABC):
+    """Base class of the text writers, which optionally compress with gzip."""
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Unsupported compression {compression!r} for text formats, use 'gzip'")
+        if compression == "gzip":
+            self.file: IO[str] = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            self.file = open(path, "w", encoding="utf-8", newline="")
+
+    @abstractmethod
+    def write(self, batch: ResultBatch):
+        """Write the results of a batch."""
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter(_TextWriter):
+    """Writes one JSON object per line."""
+
+    def write(self, batch: ResultBatch):
+        names = ResultBatch.FIELDS
+        self.file.writelines(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n"
+                             for row in zip(*(batch.columns[name] for name in names)))
+
+
+class CsvWriter(_TextWriter):
+    """Writes a header row followed by one row per result."""
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self._writer = csv.writer(self.file)
+        self._writer.writerow(ResultBatch.FIELDS)
+
+    def write(self, batch: ResultBatch):
+        self._writer.writerows(zip(*(batch.columns[name] for name in ResultBatch.FIELDS)))
+
+
+class BibtexWriter(_TextWriter):
+    """Writes one ``@misc`` entry per result, keyed by first author surname and year."""
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self._keys: dict[str, int] = {}
+        self._entries = 0
+
+    def write(self, batch: ResultBatch):
+        self.file.writelines(self._entry(result) for result in batch)
+
+    def _entry(self, result: SearchResult) -> str:
+        authors = split_authors([result.authors])[0]
+        year = (result.date or "")[:4]
+        fields = [
+            ("title", result.title),
+            ("author", " and ".join(authors) or None),
+            ("year", year or None),
+            ("date", result.date),
+            ("doi", result.doi),
+            ("abstract", result.abstract),
+            ("note", f"Retrieved from {result.source}" if result.source else None),
+        ]
+        body = ",\n".join(f"  {name} = {{{_escape_bibtex(value)}}}" for name, value in fields if value)
+        self._entries += 1
+        return f"@misc{{{self._key(authors, year, result.doi)},\n{body}\n}}\n\n"
+
+    def _key(self, authors: list[str], year: str, doi: Optional[str]) -> str:
+        """
+        Citation key such as ``kuhne2019``, with a suffix on collisions.
+
+        Surnames without ASCII letters (e.g. in Cyrillic) leave no key; the
+        DOI, or else the position of the entry, is used instead.
+        """
+        first = authors[0] if authors else "anonymous"
+        surname = first.split(",", 1)[0] if "," in first else first.split()[-1]
+        surname = _BIBTEX_KEY_RE.sub("", _fold(surname))
+        if surname:
+            key = surname + year
+        elif doi:
+            key = "doi" + _BIBTEX_KEY_RE.sub("", doi.lower())
+        else:
+            key = f"entry{self._entries}"
+        seen = self._keys.get(key, 0)
+        self._keys[key] = seen + 1
+        return key if not seen else f"{key}_{seen}"
+
+
+class RisWriter(_TextWriter):
+    """Writes one ``JOUR`` record per result."""
+
+    def write(self, batch: ResultBatch):
+        self.file.writelines(self._record(result) for result in batch)
+
+    @staticmethod
+    def _record(result: SearchResult) -> str:
+        lines = ["TY  - JOUR"]
+        if result.title:
+            lines.append(f"TI  - {_single_line(result.title)}")
+        lines += [f"AU  - {author}" for author in split_authors([result.authors])[0]]
+        if result.date:
+            lines.append(f"PY  - {result.date[:4]}")
+            lines.append(f"DA  - {result.date.replace('-', '/')}")
+        if result.doi:
+            lines.append(f"DO  - {result.doi}")
+        if result.abstract:
+            lines.append(f"AB  - {_single_line(result.abstract)}")
+        if result.source:
+            lines.append(f"DB  - {result.source}")
+        lines.append("ER  - ")
+        return "\n".join(lines) + "\n\n"
+
+
+class ParquetWriter:
+    """Writes one Parquet row group per chunk. Requires ``pyarrow``."""
+
+    def __init__(self, path: Path, compression: Optional[str] = None):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+        self._writer = pq.ParquetWriter(path, ResultBatch().to_arrow().schema, compression=compression or "none")
+
+    def write(self, batch: ResultBatch):
+        self._writer.write_table(batch.to_arrow())
+
+    def close(self):
+        self._writer.close()
+
+
+_WRITERS = {
+    "parquet": ParquetWriter,
+    "jsonl": JsonlWriter,
+    "csv": CsvWriter,
+    "bibtex": BibtexWriter,
+    "ris": RisWriter,
+}
+
+
+def export_results(results: Iterable[SearchResult],
+                   path: str | Path,
+                   format: Optional[str] = None,
+                   chunk_size: int = 10_000,
+                   compression: Optional[str] = None) -> int:
+    """
+    Write search results to a file while they are produced.
+
+    Results are collected in chunks of ``chunk_size`` (one Parquet row group
+    each) and handed to a background thread that writes them, so fetching and
+    writing overlap and at most a few chunks are held in memory.
+
+    :param results: The search results, e.g. the iterator of ``BibLy.iter_search``.
+    :param path: The output file.
+    :param format: One of ``parquet``, ``jsonl``, ``csv``, ``bibtex`` and
+        ``ris``. Defaults to the format of the file suffix (``.parquet``,
+        ``.jsonl``, ``.csv``, ``.bib``, ``.ris``, optionally followed by ``.gz``).
+    :param chunk_size: Number of results written at once.
+    :param compression: ``gzip`` for the text formats, any Parquet codec (e.g.
+        ``zstd``, ``snappy``) for Parquet. Defaults to gzip for ``.gz`` paths
+        and to no compression otherwise.
+
+    :return: The number of written results.
+    """
+    path = Path(path)
+    if path.suffix == ".gz" and compression is None:
+        compression = "gzip"
+    if format is None:
+        suffix = Path(path.stem).suffix if path.suffix == ".gz" else path.suffix
+        format = EXPORT_FORMATS.get(suffix.lower())
+        if format is None:
+            raise ValueError(f"Cannot infer the export format of {path}, pass format")
+    if format not in _WRITERS:
+        raise ValueError(f"Unknown export format {format!r}, expected one of {list(_WRITERS)}")
+
+    writer = _WRITERS[format](path, compression)
+    chunks: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+    failure: list[BaseException] = []
+
+    def write():
+        while (batch := chunks.get()) is not None:
+            if not failure:
+                try:
+                    writer.write(batch)
+                except BaseException as e:
+                    failure.append(e)
+
+    thread = threading.Thread(target=write, name="bibly-export", daemon=True)
+    thread.start()
+    written = 0
+    try:
+        iterator = iter(results)
+        while not failure and (batch := ResultBatch.from_results(islice(iterator, chunk_size))):
+            chunks.put(batch)
+            written += len(batch)
+    finally:
+        chunks.put(None)
+        thread.join()
+        writer.close()
+    if failure:
+        raise failure[0]
+    logger.info(f"EXPORT | {written} results to {path}")
+    return written
+
+
+def _single_line(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _escape_bibtex(value: str) -> str:
+    return _BIBTEX_SPECIAL_RE.sub(lambda m: r"\textbackslash{}" if m[1] == "\\" else "\\" + m[1],
+                                  _single_line(value))
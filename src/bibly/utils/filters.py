@@ -0,0 +1,64 @@
+"""Unified search filters, compiled by each handler to the native filters of its API."""
+from dataclasses import dataclass, fields
+from typing import ClassVar, Iterable, Optional
+
+from bibly.utils.data_types import SearchResult
+
+# Document types of the unified filter model
+DOC_TYPES = ("article", "review", "book", "book-chapter", "conference-paper")
+
+
+@dataclass(frozen=True)
+class Filters:
+    """
+    Restrictions of a search beyond the query and the year range.
+
+    Each handler pushes the filters its API supports to the server (see
+    ``SearchHandler.supported_filters``). Other filters are applied to the
+    downloaded results if they can be evaluated on a :class:`SearchResult`
+    (``has_doi``); otherwise the handler fails with a ValueError.
+
+    :param doc_types: Document types to keep, out of :data:`DOC_TYPES`.
+    :param languages: ISO 639-1 codes of the languages to keep, e.g. ``("en", "de")``.
+    :param open_access: True to keep only open-access records, False to drop them.
+    :param has_doi: True to keep only records with a DOI, False for records without.
+    """
+    doc_types: Optional[tuple[str, ...]] = None
+    languages: Optional[tuple[str, ...]] = None
+    open_access: Optional[bool] = None
+    has_doi: Optional[bool] = None
+
+    # Filters that can be evaluated on a SearchResult
+    LOCAL: ClassVar[frozenset[str]] = frozenset({"has_doi"})
+
+    def __post_init__(self):
+        # Accept single values and any iterable, and store them canonically
+        for name in ("doc_types", "languages"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                value = (value,)
+            if value is not None:
+                object.__setattr__(self, name, tuple(sorted({v.strip().lower() for v in value})) or None)
+        unknown = set(self.doc_types or ()) - set(DOC_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown document type(s) {sorted(unknown)}, expected a subset of {list(DOC_TYPES)}")
+
+    def active(self) -> dict[str, tuple[str, ...] | bool]:
+        """The filters that are set, by name."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name) is not None}
+
+    def key(self) -> str:
+        """Canonical text of the filters, e.g. ``doc_types=article|review;open_access=1``."""
+        return ";".join(f"{name}={'|'.join(value) if isinstance(value, tuple) else int(value)}"
+                        for name, value in self.active().items())
+
+    def matches(self, result: SearchResult) -> bool:
+        """Whether a result passes the filters that can be evaluated locally."""
+        return self.has_doi is None or bool(result.doi) == self.has_doi
+
+    def apply(self, results: Iterable[SearchResult]) -> list[SearchResult]:
+        """The results that pass the filters that can be evaluated locally, in order."""
+        return [result for result in results if self.matches(result)]
+
+    def __bool__(self) -> bool:
+        return bool(self.active())
@@ -0,0 +1,61 @@
+"""Cross-provider fusion of search results that share a DOI."""
+from typing import Iterable
+
+from bibly.utils.data_types import ResultBatch, SearchResult
+from bibly.utils.normalize import canonical_doi
+
+
+def index_by_doi(results: Iterable[SearchResult]) -> dict[str, list[SearchResult]]:
+    """Hash index of search results by canonical DOI. Results without a DOI are left out."""
+    index: dict[str, list[SearchResult]] = {}
+    for result in results:
+        key = canonical_doi(result.doi)
+        if key is not None:
+            index.setdefault(key, []).append(result)
+    return index
+
+
+def fuse_fields(results: Iterable[SearchResult],
+                index: dict[str, list[SearchResult]],
+                names: Iterable[str]) -> list[SearchResult]:
+    """
+    Fill missing fields of search results from results of other providers with the same DOI, in place.
+
+    Filled fields are recorded in the ``provenance`` of each result, with the
+    source of the result the value was taken from. Of several candidates, the
+    first one in the index wins.
+
+    :param results: The search results to complete.
+    :param index: Results of all providers, see :func:`index_by_doi`.
+    :param names: The fields to fill in.
+
+    :return: The results that still miss one of the fields.
+    """
+    names = tuple(names)
+    incomplete = []
+    for result in results:
+        others = [other for other in index.get(canonical_doi(result.doi), []) if other.source != result.source]
+        for name in names:
+            if getattr(result, name) is not None:
+                continue
+            for other in others:
+                value = getattr(other, name)
+                if value is not None:
+                    setattr(result, name, value)
+                    if result.provenance is None:
+                        result.provenance = {}
+                    result.provenance[name] = other.source
+                    break
+        if any(getattr(result, name) is None for name in names):
+            incomplete.append(result)
+    return incomplete
+
+
+def set_provenance(results: Iterable[SearchResult]) -> None:
+    """Attribute the fields of search results without a recorded provider to their own source, in place."""
+    for result in results:
+        provenance = result.provenance if result.provenance is not None else {}
+        for name in ResultBatch.FIELDS:
+            if name != 'source' and name not in provenance and getattr(result, name) is not None:
+                provenance[name] = result.source
+        result.provenance = provenance
@@ -0,0 +1,75 @@
+"""Storage for incremental searches that only fetch records newer than the last run."""
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+import re
+import sys
+
+from bibly.utils.cache import ResultCache
+from bibly.utils.constants import INCREMENTAL_STORE
+from bibly.utils.data_types import SearchResult
+
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def latest_date(results: Iterable[SearchResult]) -> Optional[str]:
+    """
+    Latest publication date of the results.
+
+    :return: The date as ``YYYY-MM-DD``, or None if no result has a full ISO date.
+    """
+    dates = [result.date[:10] for result in results
+             if result.date and _ISO_DATE_RE.match(result.date)]
+    return max(dates, default=None)
+
+
+def rewind_date(watermark: Optional[str], days: int) -> Optional[str]:
+    """
+    Move a watermark back by a number of days, so that a run overlaps with the previous one.
+
+    :return: The earlier date as ``YYYY-MM-DD``, or None if there is no watermark.
+    """
+    if watermark is None or days <= 0:
+        return watermark
+    return (date.fromisoformat(watermark[:10]) - timedelta(days=days)).isoformat()
+
+
+class IncrementalStore(ResultCache):
+    """
+    Persistent result set and watermark of each (handler, query, year range).
+
+    The watermark is the latest publication date of the stored results. It is
+    passed to the handlers as ``since`` on the next run. Unlike the cache,
+    entries never expire and are never evicted.
+    """
+
+    def __init__(self, path: str | Path = INCREMENTAL_STORE):
+        """
+        :param path: Path of the SQLite database. Created if it does not exist.
+        """
+        super().__init__(path, ttl=None, max_bytes=sys.maxsize)
+
+    def load(self,
+             handler: str,
+             query: str,
+             year_from: Optional[str | int] = None,
+             year_to: Optional[str | int] = None) -> tuple[Optional[str], list[SearchResult]]:
+        """
+        Load the state of a previous run.
+
+        :return: A tuple ``(watermark, results)``. The watermark is None if
+            there was no previous run.
+        """
+        watermark = self.get("watermark", handler, query, year_from, year_to)
+        results = self.get("search", handler, query, year_from, year_to) or []
+        return watermark, results
+
+    def save(self,
+             handler: str,
+             query: str,
+             year_from: Optional[str | int],
+             year_to: Optional[str | int],
+             results: list[SearchResult]):
+        """Store the merged results of a run and advance the watermark to their latest date."""
+        self.set("search", handler, query, year_from, year_to, results)
+        self.set("watermark", handler, query, year_from, year_to, latest_date(results))
@@ -0,0 +1,432 @@
+"""Local full-text index over retrieved search results, backed by SQLite FTS5."""
+from pathlib import Path
+from typing import Iterable, Optional
+import re
+import sqlite3
+import threading
+
+from bibly.utils.cache import normalize_query
+from bibly.utils.constants import LOCAL_INDEX
+from bibly.utils.data_types import SearchResult
+from bibly.utils.dedup import _normalize_doi, _normalize_title
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    doi TEXT,
+    title TEXT,
+    abstract TEXT,
+    authors TEXT,
+    date TEXT,
+    source TEXT,
+    year INTEGER,
+    doi_key TEXT UNIQUE,
+    title_key TEXT UNIQUE
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    title, abstract, authors, content='records', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS harvests (
+    query TEXT NOT NULL,
+    year_from TEXT NOT NULL,
+    year_to TEXT NOT NULL,
+    PRIMARY KEY (query, year_from, year_to)
+);
+CREATE TABLE IF NOT EXISTS harvest_records (
+    harvest INTEGER NOT NULL,
+    record INTEGER NOT NULL,
+    PRIMARY KEY (harvest, record)
+);
+"""
+
+# Columns searched by the field functions of the Scopus query syntax
+_FIELD_COLUMNS = {
+    "TITLE-ABS-KEY": "{title abstract}",
+    "TITLE-ABS": "{title abstract}",
+    "TITLE": "{title}",
+    "ABS": "{abstract}",
+    "AUTH": "{authors}",
+    "AUTHOR-NAME": "{authors}",
+}
+# Field functions whose fields are all indexed. TITLE-ABS-KEY also
+# searches the author keywords, which are not.
+_INDEXED_FIELDS = {"TITLE-ABS", "TITLE", "ABS", "AUTH", "AUTHOR-NAME"}
+_TOKEN_RE = re.compile(r'\s*(?:([A-Za-z][A-Za-z-]*)\(|(\()|(\))|"([^"]*)"(\*?)|([^\s()"]+))')
+_OPERATORS = {"AND", "OR", "NOT"}
+
+
+def translate_query(query: str) -> str:
+    """
+    Translate a query in the syntax passed to the handlers into an FTS5 query.
+
+    Supports ``AND``, ``OR``, ``NOT``/``AND NOT``, parentheses, quoted
+    phrases, ``*`` prefix wildcards and the Scopus field functions
+    ``TITLE-ABS-KEY``, ``TITLE-ABS``, ``TITLE``, ``ABS`` and ``AUTH``. Adjacent
+    terms are combined with AND. Every term is matched as a phrase, so
+    hyphenated terms such as ``iab-bamf-soep`` match their parts in sequence.
+
+    The translation approximates the providers: FTS5 binds AND tighter than
+    OR (Scopus the other way round), ``TITLE-ABS-KEY`` searches title and
+    abstract only, and terms are stemmed with the Porter stemmer.
+    :meth:`LocalIndex.can_answer` only accepts queries where this makes no
+    difference.
+
+    :raises ValueError: If the query uses syntax the index cannot evaluate,
+        e.g. other field functions, comparisons (``PUBYEAR > 2015``) or a
+        leading ``NOT``.
+    """
+    return _to_fts(_parse(query))
+
+
+def _parse(query: str) -> list[str]:
+    """
+    Split a query into tokens: ``(``, ``)``, operators, field functions
+    (e.g. ``TITLE(``) and terms as FTS5 phrases (e.g. ``"refugee" *``).
+    """
+    parts: list[str] = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Cannot parse the query at {query[position:]!r}")
+        position = match.end()
+        function, opening, closing, phrase, prefix, word = match.groups()
+        previous = parts[-1] if parts else None
+        if function is not None:
+            if function.upper() not in _FIELD_COLUMNS:
+                raise ValueError(f"Field {function} is not indexed locally")
+            parts.append(f"{function.upper()}(")
+        elif opening is not None:
+            parts.append("(")
+        elif closing is not None:
+            if parts.count(")") >= sum(map(_opens, parts)):
+                raise ValueError(f"Unbalanced parenthesis in query {query!r}")
+            parts.append(")")
+        elif phrase is not None:
+            parts.append(_phrase(phrase) + (" *" if prefix else ""))
+        elif word.upper() in _OPERATORS:
+            operator = word.upper()
+            if operator == "NOT" and previous == "AND":
+                parts[-1] = "NOT"
+                continue
+            if previous is None or previous in _OPERATORS or previous.endswith("("):
+                raise ValueError(f"Operator {operator} cannot start an expression locally")
+            parts.append(operator)
+        elif any(c in word for c in "<>=?"):
+            raise ValueError(f"Term {word!r} is not supported locally")
+        else:
+            prefix = word.endswith("*")
+            parts.append(_phrase(word.rstrip("*")) + (" *" if prefix else ""))
+    if not parts or parts[-1] in _OPERATORS or parts.count(")") != sum(map(_opens, parts)):
+        raise ValueError("Incomplete query")
+    return parts
+
+
+def _to_fts(parts: list[str]) -> str:
+    """Join query tokens into an FTS5 query, with field functions as column filters."""
+    tokens = [f"{_FIELD_COLUMNS[part[:-1]]} : (" if _is_function(part) else part for part in parts]
+    return " ".join(tokens).replace("( ", "(").replace(" )", ")")
+
+
+def _opens(part: str) -> bool:
+    return part.endswith("(")
+
+
+def _is_function(part: str) -> bool:
+    return part.endswith("(") and part != "("
+
+
+def _is_term(part: str) -> bool:
+    return part.startswith('"')
+
+
+def _phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _check_precedence(parts: list[str]):
+    """
+    Reject groups whose meaning depends on operator precedence, which differs
+    between Scopus (OR, AND, AND NOT) and FTS5 (NOT, AND, OR).
+
+    Within each group, OR must not be combined with AND (explicit or between
+    adjacent terms) or NOT, and a NOT must come last.
+    """
+    # Operators seen in each open group, innermost last
+    groups: list[set[str]] = [set()]
+    previous = None
+    for part in parts:
+        if previous is not None and (_is_term(part) or part.endswith("(")) and previous not in _OPERATORS \
+                and not previous.endswith("("):
+            operator = "AND"  # Adjacent operands
+        elif part in _OPERATORS:
+            operator = part
+        else:
+            operator = None
+        if operator is not None:
+            seen = groups[-1]
+            if "NOT" in seen or (operator == "OR" and seen - {"OR"}) or (operator != "OR" and "OR" in seen):
+                raise ValueError("Groups mixing OR with AND or NOT, or with terms after NOT, "
+                                 "are not evaluated like the providers do")
+            seen.add(operator)
+        if part.endswith("("):
+            groups.append(set())
+        elif part == ")":
+            groups.pop()
+        previous = part
+
+
+def _conjuncts(query: str) -> dict[str, list[str]]:
+    """
+    The top-level AND terms of a query, by their lower-cased text.
+
+    A term after a top-level ``NOT`` is keyed with a leading ``NOT``. A query
+    with a top-level OR is a single term.
+
+    :raises ValueError: If the query cannot be evaluated locally, see :func:`_check_precedence`.
+    """
+    parts = _parse(query)
+    _check_precedence(parts)
+    terms: list[list[str]] = [[]]
+    depth = 0
+    for part in parts:
+        if part.endswith("("):
+            depth += 1
+        elif part == ")":
+            depth -= 1
+        elif depth == 0 and part == "OR":
+            return {" ".join(parts).lower(): parts}
+        elif depth == 0 and part in ("AND", "NOT"):
+            terms.append(["NOT"] if part == "NOT" else [])
+            continue
+        terms[-1].append(part)
+    return {" ".join(term).lower(): term for term in terms}
+
+
+def _is_indexed(parts: list[str]) -> bool:
+    """Whether every term of a query part lies within a field function whose fields are all indexed."""
+    # Whether each open group is within such a field function, innermost last
+    groups = [False]
+    for part in parts:
+        if _is_function(part):
+            groups.append(part[:-1] in _INDEXED_FIELDS)
+        elif part == "(":
+            groups.append(groups[-1])
+        elif part == ")":
+            groups.pop()
+        elif _is_term(part) and not groups[-1]:
+            return False
+    return True
+
+
+class LocalIndex:
+    """
+    Full-text index over search results, stored in SQLite (FTS5).
+
+    Title, abstract and authors are indexed. Records are deduplicated on
+    insertion with the semantics of :func:`deduplicate` (same title OR same
+    DOI). The index also remembers which queries and year ranges were
+    harvested into it, and which records each returned, so it can answer
+    refinements of them (see :meth:`can_answer`). The index is safe to share
+    between threads.
+    """
+
+    def __init__(self, path: str | Path = LOCAL_INDEX):
+        """
+        :param path: Path of the SQLite database, created if it does not
+            exist, or ``":memory:"`` for a transient index.
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def add(self,
+            results: Iterable[SearchResult],
+            query: Optional[str] = None,
+            year_from: Optional[str | int] = None,
+            year_to: Optional[str | int] = None) -> int:
+        """
+        Add search results to the index.
+
+        :param results: The search results. Duplicates of indexed records are skipped.
+        :param query: The query that returned the complete ``results``, if any.
+            It is remembered as covered by the index together with the year
+            range and the records it returned.
+        :param year_from: Start year of the query
+        :param year_to: End year of the query
+
+        :return: The number of added records.
+        """
+        added = 0
+        with self._lock, self._conn:
+            harvest = None
+            if query is not None:
+                key = (normalize_query(query), *_years(year_from, year_to))
+                self._conn.execute("INSERT OR IGNORE INTO harvests VALUES (?, ?, ?)", key)
+                harvest = self._conn.execute("SELECT rowid FROM harvests WHERE query=? AND year_from=? "
+                                             "AND year_to=?", key).fetchone()[0]
+            for result in results:
+                doi_key, title_key = _normalize_doi(result.doi), _normalize_title(result.title)
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO records (doi, title, abstract, authors, date, source, year, "
+                    "doi_key, title_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (result.doi, result.title, result.abstract, result.authors, result.date, result.source,
+                     int(result.date[:4]) if result.date and result.date[:4].isdigit() else None,
+                     doi_key, title_key))
+                if cursor.rowcount:
+                    record = cursor.lastrowid
+                    self._conn.execute(
+                        "INSERT INTO records_fts (rowid, title, abstract, authors) VALUES (?, ?, ?, ?)",
+                        (record, result.title, result.abstract, result.authors))
+                    added += 1
+                elif harvest is not None:
+                    # The duplicate that was indexed before
+                    record = self._conn.execute("SELECT id FROM records WHERE doi_key=? OR title_key=?",
+                                                (doi_key, title_key)).fetchone()[0]
+                if harvest is not None:
+                    self._conn.execute("INSERT OR IGNORE INTO harvest_records VALUES (?, ?)", (harvest, record))
+        return added
+
+    def search(self,
+               query: str,
+               year_from: Optional[str | int] = None,
+               year_to: Optional[str | int] = None,
+               limit: Optional[int] = None) -> list[SearchResult]:
+        """
+        Search the index.
+
+        :param query: The query, in the syntax supported by :func:`translate_query`.
+        :param year_from: Optional start year
+        :param year_to: Optional end year
+        :param limit: Optional maximum number of results
+
+        :return: The matching records, in the order they were added.
+        """
+        sql = ("SELECT doi, title, abstract, authors, date, source FROM records "
+               "WHERE id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)")
+        params: list = [translate_query(query)]
+        if year_from is not None:
+            sql += " AND year >= ?"
+            params.append(int(year_from))
+        if year_to is not None:
+            sql += " AND year <= ?"
+            params.append(int(year_to))
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [SearchResult(*row) for row in rows]
+
+    def can_answer(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None) -> bool:
+        """
+        Check whether the index holds every result the providers would return for a query.
+
+        That is the case if the query narrows a harvested query: it contains
+        all top-level AND terms of the harvested query, and its year range
+        lies within the harvested one. The additional terms are evaluated on
+        the records of that harvest, so they must only search indexed fields
+        (``TITLE``, ``ABS``, ``TITLE-ABS``, ``AUTH``, not ``TITLE-ABS-KEY``
+        or bare terms) and must not depend on operator precedence (see
+        :func:`translate_query`). Locally, terms are stemmed.
+        """
+        return self._covering(query, year_from, year_to) is not None
+
+    def answer(self,
+               query: str,
+               year_from: Optional[str | int] = None,
+               year_to: Optional[str | int] = None) -> list[SearchResult]:
+        """
+        Answer a query from the records of a harvested query it narrows, see :meth:`can_answer`.
+
+        :return: The matching records, in the order they were added.
+
+        :raises ValueError: If no harvested query covers the query.
+        """
+        covering = self._covering(query, year_from, year_to)
+        if covering is None:
+            raise ValueError(f"No harvested query covers query='{query}'")
+        harvest, extra = covering
+        sql = ("SELECT doi, title, abstract, authors, date, source FROM records "
+               "WHERE id IN (SELECT record FROM harvest_records WHERE harvest = ?)")
+        params: list = [harvest]
+        included = [parts for parts in extra if parts[0] != "NOT"]
+        excluded = [parts[1:] for parts in extra if parts[0] == "NOT"]
+        if included:
+            sql += " AND id IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)"
+            params.append(_to_fts([part for parts in included for part in ["AND", *parts]][1:]))
+        for parts in excluded:
+            sql += " AND id NOT IN (SELECT rowid FROM records_fts WHERE records_fts MATCH ?)"
+            params.append(_to_fts(parts))
+        if year_from is not None:
+            sql += " AND year >= ?"
+            params.append(int(year_from))
+        if year_to is not None:
+            sql += " AND year <= ?"
+            params.append(int(year_to))
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [SearchResult(*row) for row in rows]
+
+    def _covering(self,
+                  query: str,
+                  year_from: Optional[str | int],
+                  year_to: Optional[str | int]) -> Optional[tuple[int, list[list[str]]]]:
+        """The harvest covering a query and the query's additional top-level terms, or None."""
+        try:
+            conjuncts = _conjuncts(query)
+        except ValueError:
+            conjuncts = None
+        with self._lock:
+            harvests = self._conn.execute("SELECT rowid, query, year_from, year_to FROM harvests").fetchall()
+        for harvest, harvested, harvest_from, harvest_to in harvests:
+            if harvest_from and (year_from is None or int(year_from) < int(harvest_from)):
+                continue
+            if harvest_to and (year_to is None or int(year_to) > int(harvest_to)):
+                continue
+            # The harvested query itself needs no local evaluation
+            if harvested == normalize_query(query):
+                return harvest, []
+            if conjuncts is None:
+                continue
+            try:
+                harvested_conjuncts = _conjuncts(harvested)
+            except ValueError:
+                continue
+            if not harvested_conjuncts.keys() <= conjuncts.keys():
+                continue
+            extra = [parts for key, parts in conjuncts.items() if key not in harvested_conjuncts]
+            if all(_is_indexed(parts) for parts in extra):
+                return harvest, extra
+        return None
+
+    def clear(self):
+        """Remove all records and harvested queries."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records")
+            self._conn.execute("DELETE FROM harvests")
+            self._conn.execute("DELETE FROM harvest_records")
+            self._conn.execute("INSERT INTO records_fts (records_fts) VALUES ('delete-all')")
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+
+def _years(year_from: Optional[str | int], year_to: Optional[str | int]) -> tuple[str, str]:
+    return "" if year_from is None else str(year_from), "" if year_to is None else str(year_to)
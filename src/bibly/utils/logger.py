@@ -3,6 +3,8 @@ from typing import Any, Callable, Optional
 from functools import wraps
 import logging
 
+from bibly.utils.metrics import metrics
+
 logger = logging.getLogger("bibly")
 logger.setLevel(logging.INFO)
 logger.propagate = False
@@ -12,7 +14,8 @@ def log_count(func: Callable) -> Callable:
     def wrapper(self, query: str, *args, **kwargs) -> int:
         handler = self.__class__.__name__
         try:
-            count = func(self, query, *args, **kwargs)
+            with metrics.timer(handler, "count"):
+                count = func(self, query, *args, **kwargs)
             logger.info(
                 f"COUNT  | {handler:<20} | query='{query}' | count={count}"
             )
@@ -31,7 +34,8 @@ def log_initialization(func: Callable) -> Callable:
     def wrapper(self, *args, **kwargs) -> Any:
         handler = self.__class__.__name__
         try:
-            result = func(self, *args, **kwargs)
+            with metrics.timer(handler, "initialize"):
+                result = func(self, *args, **kwargs)
             logger.info(f"INIT   | {handler:<20} | initialized successfully")
         except Exception as e:
             logger.error(
@@ -47,7 +51,9 @@ def log_search(func: Callable) -> Callable:
     def wrapper(self, query: str, year_from: Optional[str | int] = None, year_to: Optional[str | int] = None, *args, **kwargs) -> list:
         handler = self.__class__.__name__
         try:
-            result = func(self, query, year_from, year_to, *args, **kwargs)
+            with metrics.timer(handler, "search"):
+                result = func(self, query, year_from, year_to, *args, **kwargs)
+            metrics.inc("results_total", len(result), handler=handler)
             logger.info(
                 f"SEARCH | {handler:<20} | query='{query}' | "
                 f"years={year_from}-{year_to} | results={len(result)}"
@@ -0,0 +1,193 @@
+"""In-process metrics of the handlers: latency histograms and counters."""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+import cProfile
+import pstats
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+_PREFIX = "bibly_"
+_HELP = {
+    "phase_seconds": "Duration of a handler phase in seconds.",
+    "requests_total": "API requests issued.",
+    "retries_total": "Throttled API requests that were retried.",
+    "pages_total": "Result pages fetched.",
+    "results_total": "Search results returned.",
+    "errors_total": "Failed handler phases.",
+    "singleflight_calls_total": "Handler calls issued through the single-flight group.",
+    "singleflight_coalesced_total": "Handler calls served by an identical call in flight.",
+    "fused_results_total": "Search results completed with the fields of other providers.",
+    "count_estimates_total": "Count estimates returned, by status.",
+    "skipped_dois_total": "DOIs skipped because the Article Metadata API rejected them.",
+}
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        cumulative, total = {}, 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"buckets": cumulative, "sum": self.sum, "count": self.count}
+
+
+class Metrics:
+    """
+    Thread-safe registry of the counters and latency histograms of BibLy.
+
+    Series are identified by a name and labels, e.g. ``handler`` and
+    ``phase``. Hooks registered with :meth:`add_hook` are called with every
+    timed phase, e.g. to forward spans to a tracing system. With
+    ``profile=True``, phases are additionally run under :mod:`cProfile` and
+    the statistics are aggregated per handler and phase. Only one profiler can
+    run at a time, so nested and concurrent phases are covered by the profile
+    of the phase that started first.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, profile: bool = False):
+        """
+        :param buckets: Upper bounds in seconds of the latency histogram buckets.
+        :param profile: Whether to profile the timed phases with cProfile.
+        """
+        self.buckets = buckets
+        self.profile = profile
+        self.profiles: dict[tuple[str, str], pstats.Stats] = {}
+        self._counters: dict[tuple[str, _Labels], float] = {}
+        self._histograms: dict[tuple[str, _Labels], Histogram] = {}
+        self._hooks: list[Callable[[str, str, float], None]] = []
+        self._lock = threading.Lock()
+        # Only one cProfile profiler can be active per interpreter
+        self._profile_lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Record a value in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def add_hook(self, hook: Callable[[str, str, float], None]):
+        """Register a callable receiving ``(handler, phase, seconds)`` after every timed phase."""
+        self._hooks.append(hook)
+
+    @contextmanager
+    def timer(self, handler: str, phase: str) -> Iterator[None]:
+        """
+        Time a phase of a handler, e.g. ``search``, ``page``, ``request`` or ``parse``.
+
+        Failures are counted in ``errors_total`` and re-raised.
+        """
+        profiler = None
+        if self.profile and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc("errors_total", handler=handler, phase=phase)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profile_lock.release()
+                self._add_profile(handler, phase, profiler)
+            self.observe("phase_seconds", elapsed, handler=handler, phase=phase)
+            for hook in self._hooks:
+                hook(handler, phase, elapsed)
+
+    def profile_stats(self, handler: str, phase: str) -> Optional[pstats.Stats]:
+        """The aggregated cProfile statistics of a phase, or None if it was not profiled."""
+        return self.profiles.get((handler, phase))
+
+    def reset(self):
+        """Drop all recorded values."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.profiles.clear()
+
+    def to_dict(self) -> dict:
+        """
+        Export all series as a dictionary.
+
+        :return: ``{"counters": {...}, "histograms": {...}}``, each mapping a
+            name to a list of ``(labels, value)`` pairs.
+        """
+        with self._lock:
+            counters, histograms = {}, {}
+            for (name, labels), value in self._counters.items():
+                counters.setdefault(name, []).append((dict(labels), value))
+            for (name, labels), histogram in self._histograms.items():
+                histograms.setdefault(name, []).append((dict(labels), histogram.to_dict()))
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        """Export all series in the Prometheus text exposition format."""
+        exported = self.to_dict()
+        lines = []
+        for name, series in sorted(exported["counters"].items()):
+            lines += _header(name, "counter")
+            lines += [f"{_PREFIX}{name}{_format_labels(labels)} {value:g}" for labels, value in series]
+        for name, series in sorted(exported["histograms"].items()):
+            lines += _header(name, "histogram")
+            for labels, histogram in series:
+                for bound, count in histogram["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{_PREFIX}{name}_bucket{_format_labels({**labels, 'le': le})} {count}")
+                lines.append(f"{_PREFIX}{name}_sum{_format_labels(labels)} {histogram['sum']:g}")
+                lines.append(f"{_PREFIX}{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def _add_profile(self, handler: str, phase: str, profiler: cProfile.Profile):
+        """Merge the statistics of a profiler into those of its phase."""
+        with self._lock:
+            stats = self.profiles.get((handler, phase))
+            if stats is None:
+                self.profiles[(handler, phase)] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+
+
+def _header(name: str, kind: str) -> list[str]:
+    return [f"# HELP {_PREFIX}{name} {_HELP.get(name, name)}", f"# TYPE {_PREFIX}{name} {kind}"]
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
+
+
+# Registry shared by all handlers and clients
+metrics = Metrics()
@@ -0,0 +1,198 @@
+"""Near-duplicate detection for search results using MinHash/LSH candidate generation."""
+from dataclasses import replace
+from typing import Optional, Sequence
+import random
+import re
+import unicodedata
+import zlib
+
+from bibly.utils.data_types import ResultBatch, SearchResult
+from bibly.utils.dedup import _normalize_doi
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_SUBTITLE_RE = re.compile(r"\s*(?::|\s-\s|\s–\s|\s—\s)")
+# Modulus of the MinHash permutations (Mersenne prime 2**61 - 1)
+_PRIME = (1 << 61) - 1
+# Max earlier members of an LSH bucket a new entry is compared against. Keeps
+# huge buckets (e.g. many papers titled "Editorial") from turning quadratic.
+_MAX_BUCKET_COMPARISONS = 50
+# Fields filled from other cluster members when merging
+_MERGE_FIELDS = tuple(name for name in ResultBatch.FIELDS if name != 'source')
+
+
+def _fold(text: str) -> str:
+    """Strip diacritics, lower-case and replace punctuation by single spaces."""
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def _title_tokens(title: Optional[str]) -> tuple[frozenset[str], frozenset[str]]:
+    """Token sets of the full title and of the main title (without subtitle)."""
+    if not title:
+        return frozenset(), frozenset()
+    main = _SUBTITLE_RE.split(title, maxsplit=1)[0]
+    return frozenset(_fold(title).split()), frozenset(_fold(main).split())
+
+
+def _first_author(authors: Optional[str]) -> Optional[str]:
+    """Folded surname of the first author, for both 'Given Surname' and 'Surname, Given' lists."""
+    if not authors:
+        return None
+    first = authors.split(";", 1)[0]
+    surname = first.split(",", 1)[0] if "," in first else first
+    tokens = _fold(surname).split()
+    return tokens[-1] if tokens else None
+
+
+def _year(date: Optional[str]) -> Optional[int]:
+    """Year of an ISO-like date string."""
+    if date and date[:4].isdigit():
+        return int(date[:4])
+    return None
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class _UnionFind:
+    """Disjoint sets over positions, always rooted at the smallest position."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def cluster_duplicates(results: Sequence[SearchResult],
+                       threshold: float = 0.8,
+                       num_perm: int = 32,
+                       bands: int = 8,
+                       seed: int = 1) -> list[int]:
+    """
+    Group search results that describe the same work.
+
+    Entries with the same DOI always share a cluster. Otherwise, candidate
+    pairs are generated with MinHash/LSH over the folded main title tokens
+    (case, punctuation and diacritics are ignored), so the cost grows close to
+    linearly with the number of results. A candidate pair is merged when the
+    Jaccard similarity of the titles, or of the main titles without subtitles,
+    reaches ``threshold`` and neither the publication years (more than one
+    year apart) nor the first authors' surnames contradict each other.
+
+    :param results: The search results to cluster.
+    :param threshold: Minimum title similarity between 0 and 1.
+    :param num_perm: Number of MinHash permutations.
+    :param bands: Number of LSH bands. Must divide ``num_perm``. More bands
+        find more candidates at a lower similarity, at a higher cost.
+    :param seed: Seed of the MinHash permutations.
+
+    :return: One cluster ID per result. The ID is the position of the first
+        member of the cluster, so clusters are numbered in order of appearance.
+    """
+    if num_perm % bands:
+        raise ValueError("bands must divide num_perm")
+    rows = num_perm // bands
+    rng = random.Random(seed)
+    perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    union_find = _UnionFind(len(results))
+    doi_owner: dict[str, int] = {}
+    buckets: dict[tuple, list[int]] = {}
+    token_hashes: dict[str, tuple[int, ...]] = {}
+    tokens: list[tuple[frozenset[str], frozenset[str]]] = []
+    authors: list[Optional[str]] = []
+    years: list[Optional[int]] = []
+
+    for i, result in enumerate(results):
+        tokens.append(_title_tokens(result.title))
+        authors.append(_first_author(result.authors))
+        years.append(_year(result.date))
+
+        doi = _normalize_doi(result.doi)
+        if doi is not None:
+            union_find.union(doi_owner.setdefault(doi, i), i)
+
+        full, main = tokens[i]
+        if not full:
+            continue
+        # The signature covers the main title, so a missing or different
+        # subtitle does not keep two entries from becoming candidates. Titles
+        # share most of their vocabulary, so the permuted hashes are computed
+        # once per distinct token and combined with a C-level min.
+        vectors = []
+        for token in main or full:
+            vector = token_hashes.get(token)
+            if vector is None:
+                h = zlib.crc32(token.encode())
+                vector = token_hashes[token] = tuple((a * h + b) % _PRIME for a, b in perms)
+            vectors.append(vector)
+        signature = list(map(min, *vectors)) if len(vectors) > 1 else vectors[0]
+        for band in range(bands):
+            key = (band, *signature[band * rows:(band + 1) * rows])
+            members = buckets.setdefault(key, [])
+            for j in members[-_MAX_BUCKET_COMPARISONS:]:
+                if union_find.find(i) == union_find.find(j):
+                    continue
+                if years[i] and years[j] and abs(years[i] - years[j]) > 1:
+                    continue
+                if authors[i] and authors[j] and authors[i] != authors[j]:
+                    continue
+                similarity = max(_jaccard(full, tokens[j][0]), _jaccard(main, tokens[j][1]))
+                if similarity >= threshold:
+                    union_find.union(i, j)
+            members.append(i)
+
+    return [union_find.find(i) for i in range(len(results))]
+
+
+def merge_duplicates(results: Sequence[SearchResult], cluster_ids: Sequence[int]) -> list[SearchResult]:
+    """
+    Merge each cluster into its first member.
+
+    Missing fields (e.g. abstract or DOI) of the first member are filled in
+    from the other members of its cluster, in order of appearance.
+
+    :param results: The search results.
+    :param cluster_ids: The cluster ID of each result, see :func:`cluster_duplicates`.
+
+    :return: One merged result per cluster, in order of first appearance.
+    """
+    merged: dict[int, SearchResult] = {}
+    for result, cluster_id in zip(results, cluster_ids):
+        representative = merged.get(cluster_id)
+        if representative is None:
+            merged[cluster_id] = replace(result)
+            continue
+        for name in _MERGE_FIELDS:
+            if not getattr(representative, name) and getattr(result, name):
+                setattr(representative, name, getattr(result, name))
+    return list(merged.values())
+
+
+def near_deduplicate(results: Sequence[SearchResult], threshold: float = 0.8) -> list[SearchResult]:
+    """
+    Remove near-duplicate search results, merging the fields of each cluster.
+
+    :param results: The search results to deduplicate.
+    :param threshold: Minimum title similarity between 0 and 1, see :func:`cluster_duplicates`.
+
+    :return: One merged result per cluster, in order of first appearance.
+    """
+    return merge_duplicates(results, cluster_duplicates(results, threshold))
@@ -0,0 +1,137 @@
+"""Column-wise normalization of search results from different providers."""
+from html import unescape
+from typing import Iterable, Optional
+import re
+
+from bibly.utils.data_types import SearchResult
+
+_DOI_PREFIX_RE = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_DATE_RE = re.compile(r"^(\d{4})(?:[-/.](\d{1,2})(?:[-/.](\d{1,2}))?)?")
+# HTML tags of abstracts and titles, e.g. <p>, <sup> or Scopus' <inf>
+_MARKUP_TAGS = ("a", "abstract", "b", "bold", "br", "div", "em", "h[1-6]", "i", "inf", "italic", "li", "ol", "p",
+                "sc", "section", "small", "span", "strong", "sub", "sup", "title", "u", "ul", "underline")
+# Tags among the known ones or of the JATS and MathML namespaces, e.g.
+# <jats:italic>, with quoted attributes only, so that comparisons like
+# "n<k and m>2" are left alone
+_TAG_RE = re.compile(r"</?(?:(?:jats|mml):[\w.-]+|(?:" + "|".join(_MARKUP_TAGS) + r"))"
+                     r"(?:\s+[\w:.-]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*\s*/?>", re.IGNORECASE)
+
+
+def canonical_doi(doi: Optional[str]) -> Optional[str]:
+    """Strip resolver prefixes (``https://doi.org/``, ``doi:``) and whitespace, and lower-case a DOI."""
+    if not doi:
+        return None
+    doi = doi.strip()
+    if doi[:4].lower() in ("http", "doi:"):
+        doi = _DOI_PREFIX_RE.sub("", doi)
+    return doi.lower() or None
+
+
+def normalize_dois(dois: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """Canonicalize a column of DOIs, see :func:`canonical_doi`."""
+    return list(map(canonical_doi, dois))
+
+
+def _iso_date(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    # Most providers already return YYYY-MM-DD
+    if len(value) == 10 and value[4] == "-" == value[7] and value.replace("-", "").isdigit():
+        return value
+    match = _DATE_RE.match(value.strip())
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    if month is None:
+        return year
+    if day is None:
+        return f"{year}-{int(month):02d}"
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+def normalize_dates(dates: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """
+    Convert a column of dates to ISO 8601 strings.
+
+    Accepts the formats of all providers, e.g. ``2019-04-02``,
+    ``2019-04-02T00:00:00Z``, ``2019/4/2`` or ``2019-04``. Partial dates stay
+    partial (``YYYY-MM`` or ``YYYY``), unparseable dates become None. Each
+    distinct value is parsed once, as dates repeat heavily in a result set.
+    """
+    dates = list(dates)
+    parsed = {value: _iso_date(value) for value in set(dates)}
+    return [parsed[value] for value in dates]
+
+
+def split_authors(authors: Iterable[Optional[str]]) -> list[list[str]]:
+    """Split a column of ``;``-separated author lists into lists of names."""
+    return [[name.strip() for name in value.split(";") if name.strip()] if value else []
+            for value in authors]
+
+
+def normalize_authors(authors: Iterable[Optional[str | list[Optional[str]]]]) -> list[Optional[str]]:
+    """
+    Join a column of author lists with a uniform ``"; "`` separator. Empty lists become None.
+
+    Values are ``;``-separated strings or, from handlers that leave the
+    joining to this stage, lists of names. Each distinct string is rewritten
+    once, as prolific author groups repeat.
+    """
+    rewritten: dict[Optional[str], Optional[str]] = {}
+    column = []
+    for value in authors:
+        if isinstance(value, list):
+            column.append("; ".join([name.strip() for name in value if name and name.strip()]) or None)
+            continue
+        if value not in rewritten:
+            names = split_authors([value])[0] if value and ";" in value else [value.strip()] if value else []
+            rewritten[value] = "; ".join(names) or None
+        column.append(rewritten[value])
+    return column
+
+
+def strip_markup(texts: Iterable[Optional[str]]) -> list[Optional[str]]:
+    """
+    Remove HTML and JATS tags and entities from a column of texts and collapse whitespace.
+
+    Texts without tags or entities only have their whitespace collapsed.
+    """
+    stripped = []
+    for text in texts:
+        if text:
+            if "<" in text:
+                text = _TAG_RE.sub(" ", text)
+            if "&" in text:
+                text = unescape(text)
+            # Separate substring checks are much faster than a generator or isprintable()
+            if (text[:1] == " " or text[-1:] == " " or "  " in text
+                    or "\n" in text or "\t" in text or "\r" in text or "\xa0" in text):
+                text = " ".join(text.split())
+        stripped.append(text or None)
+    return stripped
+
+
+# Normalization of each column that is normalized
+_NORMALIZERS = {
+    'doi': normalize_dois,
+    'title': strip_markup,
+    'abstract': strip_markup,
+    'authors': normalize_authors,
+    'date': normalize_dates,
+}
+
+
+def normalize_results(results: list[SearchResult]) -> list[SearchResult]:
+    """
+    Normalize search results column by column, in place.
+
+    DOIs are canonicalized, dates converted to ISO 8601, author lists joined
+    with ``"; "`` and markup stripped from titles and abstracts.
+
+    :return: The same results
+    """
+    for name, normalize in _NORMALIZERS.items():
+        column = normalize([getattr(result, name) for result in results])
+        for result, value in zip(results, column):
+            setattr(result, name, value)
+    return results
@@ -0,0 +1,120 @@
+"""Per-provider rate limiting of backend library calls."""
+from typing import Any, Callable, Optional
+import logging
+import random
+import threading
+import time
+
+from bibly.utils.metrics import metrics
+
+logger = logging.getLogger("bibly")
+
+# Default sustained requests per second of each provider. Scopus and
+# ScienceDirect follow Elsevier's per-key quotas, Springer the basic plan
+# (100 requests per minute) and OpenAlex its polite-pool limit.
+DEFAULT_RATES: dict[str, float] = {
+    "Scopus": 9.0,
+    "ScienceDirect": 2.0,
+    "ArticleMetadata": 6.0,
+    "Springer": 100 / 60,
+    "OpenAlex": 10.0,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, i.e. the allowed burst. Defaults to ``rate``
+            (but at least 1).
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until ``tokens`` tokens are available and take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_throttled(error: Exception) -> bool:
+    """Check whether an exception raised by a backend library signals HTTP 429 (Too Many Requests)."""
+    # sprynger sets the status on the exception, requests on its response
+    if getattr(error, "status_code", None) == 429:
+        return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    return "429" in type(error).__name__
+
+
+class RequestScheduler:
+    """
+    Scheduler that paces the calls of the handlers per provider.
+
+    Every call of a backend library (e.g. constructing a ``ScopusSearch`` or
+    fetching an OpenAlex page) takes a token from its provider's bucket
+    first, in the calling thread. Libraries that page internally issue
+    several HTTP requests per call: pybliometrics paces those itself, while
+    the Springer and OpenAlex handlers call their libraries once per page.
+    Calls rejected with HTTP 429 are retried with exponential backoff and
+    full jitter.
+    """
+
+    def __init__(self,
+                 rates: Optional[dict[str, float]] = None,
+                 max_retries: int = 5,
+                 backoff: float = 1.0,
+                 max_backoff: float = 60.0):
+        """
+        :param rates: Calls per second per provider, merged into :data:`DEFAULT_RATES`.
+            Providers without a rate are not limited.
+        :param max_retries: Maximum number of retries of a throttled call.
+        :param backoff: Base delay in seconds of the exponential backoff.
+        :param max_backoff: Upper bound of a single backoff delay in seconds.
+        """
+        self.buckets = {provider: TokenBucket(rate)
+                        for provider, rate in {**DEFAULT_RATES, **(rates or {})}.items()}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def set_rate(self, provider: str, rate: float, capacity: Optional[float] = None):
+        """Set the quota of a provider, e.g. for a premium API key."""
+        self.buckets[provider] = TokenBucket(rate, capacity)
+
+    def call(self, provider: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a request for a provider as soon as its quota allows, retrying when throttled.
+
+        :param provider: Name of the provider, e.g. ``"Scopus"``.
+        :param func: The callable issuing the request.
+
+        :return: The return value of ``func``.
+        """
+        bucket = self.buckets.get(provider)
+        for attempt in range(self.max_retries + 1):
+            if bucket is not None:
+                bucket.acquire()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    raise
+                metrics.inc("retries_total", provider=provider)
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                logger.warning(f"{provider} throttled, retrying in {delay:.1f}s")
+                time.sleep(delay)
@@ -0,0 +1,69 @@
+"""Planning of date-range shards that stay below a provider's result limit."""
+from calendar import monthrange
+from typing import Callable, Optional
+
+# A window of a search: ``(year_from, year_to)`` as years, or as ISO dates within a year
+_Window = tuple[int | str, int | str]
+
+
+def plan_shards(count: Callable[[int | str, int | str], int],
+                year_from: int,
+                year_to: int,
+                max_results: int,
+                dates: bool = False) -> list[_Window]:
+    """
+    Split a year range into consecutive windows that each hold at most ``max_results`` results.
+
+    The range is bisected until every window fits. If ``dates`` is True, a
+    single year that still exceeds the limit is bisected into months, and a
+    single month into days, given as ISO dates (``YYYY-MM-DD``).
+
+    :param count: Callable returning the number of results for ``(year_from, year_to)``.
+    :param year_from: First year of the range.
+    :param year_to: Last year of the range.
+    :param max_results: Maximum number of results per window.
+    :param dates: Whether ``count`` and the search accept ISO dates instead of years.
+
+    :return: List of ``(year_from, year_to)`` windows in chronological order.
+
+    :raises RuntimeError: If a window that cannot be split further exceeds the
+        limit, since its results would be truncated.
+    """
+    units = [(year, year) for year in range(year_from, year_to + 1)]
+    return _bisect(count, units, max_results, _finer_units if dates else lambda window: None)
+
+
+def _bisect(count: Callable[[int | str, int | str], int],
+            units: list[_Window],
+            max_results: int,
+            refine: Callable[[_Window], Optional[list[_Window]]],
+            total: Optional[int] = None) -> list[_Window]:
+    """Bisect consecutive units until every window of units fits, refining single units that do not."""
+    def plan(lo: int, hi: int, total: Optional[int] = None) -> list[_Window]:
+        window = (units[lo][0], units[hi][1])
+        if total is None:
+            total = count(*window)
+        if total <= max_results:
+            return [window]
+        if lo == hi:
+            finer = refine(window)
+            if finer is None:
+                raise RuntimeError(f"{window[0]} to {window[1]} has {total} results, more than the limit of "
+                                   f"{max_results}, and cannot be split further")
+            return _bisect(count, finer, max_results, refine, total)
+        middle = (lo + hi) // 2
+        return plan(lo, middle) + plan(middle + 1, hi)
+
+    return plan(0, len(units) - 1, total)
+
+
+def _finer_units(window: _Window) -> Optional[list[_Window]]:
+    """The months of a year, or the days of a month, as ISO date windows. Days are not split."""
+    start, end = window
+    if isinstance(start, int):
+        return [(f"{start}-{month:02d}-01", f"{start}-{month:02d}-{monthrange(start, month)[1]:02d}")
+                for month in range(1, 13)]
+    if start == end:
+        return None
+    year, month = int(start[:4]), int(start[5:7])
+    return [(f"{year}-{month:02d}-{day:02d}",) * 2 for day in range(1, monthrange(year, month)[1] + 1)]
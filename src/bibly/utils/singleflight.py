@@ -0,0 +1,89 @@
+"""Coalescing of identical concurrent calls, e.g. of a client shared by the threads of a web service."""
+from typing import Any, Callable, Hashable, Optional
+import threading
+
+from bibly.utils.metrics import metrics
+
+
+class _Flight:
+    """A call in progress and the number of callers waiting for it."""
+    __slots__ = ("done", "value", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Thread-safe coalescer of identical concurrent calls.
+
+    While a call for a key is in flight, further calls with the same key wait
+    for it and share its outcome instead of running it again. Outcomes are
+    not kept once the call returns; a later call runs again.
+    """
+
+    def __init__(self, clone: Optional[Callable[[Any], Any]] = None):
+        """
+        :param clone: Copies the value of a shared call for each of its callers,
+            so that they can modify it independently. Defaults to handing
+            every caller the same value.
+        """
+        self.clone = clone
+        # Number of calls, and of those that waited for an identical call
+        self.calls = 0
+        self.coalesced = 0
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any], **labels: str) -> Any:
+        """
+        Run ``func``, or wait for the running call with the same key and return its value.
+
+        Calls are counted in ``singleflight_calls_total`` and the calls served
+        by another call in ``singleflight_coalesced_total`` of
+        :data:`~bibly.utils.metrics.metrics`, with the given labels.
+
+        :raises Exception: The error of the call, in each of its callers.
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+        metrics.inc("singleflight_calls_total", **labels)
+
+        if not leader:
+            metrics.inc("singleflight_coalesced_total", **labels)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._copy(flight.value)
+
+        try:
+            flight.value = func()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # Later calls start a new flight, so no waiter joins after this
+            with self._lock:
+                del self._flights[key]
+                shared = flight.waiters > 0
+            flight.done.set()
+        # The value itself stays untouched while the waiters copy it
+        return self._copy(flight.value) if shared else flight.value
+
+    def in_flight(self) -> int:
+        """Number of calls currently running."""
+        with self._lock:
+            return len(self._flights)
+
+    def _copy(self, value: Any) -> Any:
+        return value if self.clone is None else self.clone(value)
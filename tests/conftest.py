@@ -0,0 +1,78 @@
+"""Shared fixtures: an in-memory handler and a client that only uses it."""
+from typing import Iterator, Optional
+import threading
+
+import pytest
+
+from bibly import BibLy
+from bibly.base_handler import SearchHandler
+from bibly.utils import Filters, SearchResult
+
+
+class FakeHandler(SearchHandler):
+    """Handler serving ``per_year`` synthetic records per year, truncated at ``max_results`` like the real APIs."""
+    provider = 'Fake'
+
+    def __init__(self, per_year: int = 100, max_results: Optional[int] = None, page_size: int = 50):
+        self.per_year = per_year
+        self.max_results = max_results
+        self.page_size = page_size
+        self.calls = {'count': 0, 'search': 0}
+        self.fail: Optional[Exception] = None
+        # Set to block searches until released, to hold calls in flight
+        self.gate: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def initialize(self):
+        pass
+
+    def count(self,
+              query: str,
+              year_from: Optional[str | int] = None,
+              year_to: Optional[str | int] = None,
+              filters: Optional[Filters] = None) -> int:
+        with self._lock:
+            self.calls['count'] += 1
+        return len(self._records(query, year_from, year_to))
+
+    def iter_pages(self,
+                   query: str,
+                   year_from: Optional[str | int] = None,
+                   year_to: Optional[str | int] = None,
+                   fields: Optional[list[str]] = None,
+                   since: Optional[str] = None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        with self._lock:
+            self.calls['search'] += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail is not None:
+            raise self.fail
+        records = self._records(query, year_from, year_to)[:self.max_results]
+        for start in range(0, len(records), self.page_size):
+            yield records[start:start + self.page_size]
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        return iter(())
+
+    def _records(self, query, year_from, year_to) -> list[SearchResult]:
+        years = range(int(year_from or 2000), int(year_to or 2000) + 1)
+        return [SearchResult(doi=f"10.1/{query}.{year}.{i}", title=f"{query} {year} {i}", abstract=None,
+                             authors="Doe, J.", date=f"{year}-01-01", source='Fake')
+                for year in years for i in range(self.per_year)]
+
+
+@pytest.fixture
+def fake_handler() -> FakeHandler:
+    return FakeHandler()
+
+
+@pytest.fixture
+def make_client():
+    """Build a client whose only handler is the given one."""
+    def make(handler: SearchHandler, **kwargs) -> BibLy:
+        client = BibLy(**kwargs)
+        client.handlers = {'Fake': handler}
+        return client
+    return make
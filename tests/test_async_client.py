@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from conftest import FakeHandler
+
+from bibly import AsyncBibLy, BibLy
+from bibly.async_handler import AsyncSearchHandler, ExecutorHandler
+from bibly.handler_registry import HandlerRegistry
+from bibly.utils import Filters, ResultCache
+
+
+class NativeHandler(AsyncSearchHandler):
+    required_params = ['native_key']
+
+    def __init__(self, **kwargs):
+        self.key = kwargs.get('native_key')
+        super().__init__()
+
+    def initialize(self):
+        self.initialized = True
+
+    async def count(self, query, year_from=None, year_to=None, filters=None):
+        return 1
+
+    async def search(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        return []
+
+
+@pytest.fixture
+def native_registered():
+    HandlerRegistry.register_handler('Native', NativeHandler)
+    yield
+    with HandlerRegistry._lock:
+        del HandlerRegistry._registry['Native']
+
+
+def make_async_client(handler: FakeHandler, **kwargs) -> AsyncBibLy:
+    client = AsyncBibLy(**kwargs)
+    client.handlers = {'Fake': ExecutorHandler(handler, client._semaphore('fake'), client._executor)}
+    return client
+
+
+def test_async_handlers_are_only_built_for_the_async_client(native_registered):
+    assert 'Native' not in BibLy(native_key='key').handlers
+    client = AsyncBibLy(native_key='key')
+    assert client.handlers['Native'].key == 'key' and client.handlers['Native'].initialized
+    client.close()
+
+
+def test_search_is_filtered_and_cached(tmp_path):
+    handler = FakeHandler(per_year=10)
+    client = make_async_client(handler, cache=ResultCache(tmp_path / "cache.sqlite"))
+
+    async def main():
+        assert len(await client.search("q", 2000, 2001)) == 20
+        assert await client.search("q", 2000, 2001, filters=Filters(has_doi=False)) == []
+        assert len(await client.search("q", 2000, 2001)) == 20
+        assert await client.count("q", 2000, 2001) == {'Fake': 20}
+
+    asyncio.run(main())
+    client.close()
+    assert handler.calls == {'count': 1, 'search': 2}
+
+
+def test_cancelled_handler_is_not_a_result():
+    client = AsyncBibLy()
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(client._gather({'Fake': cancelled}))
+    client.close()
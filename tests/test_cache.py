@@ -0,0 +1,67 @@
+from conftest import FakeHandler
+
+from bibly.utils import Filters, ResultCache, SearchResult
+
+
+def results() -> list[SearchResult]:
+    return [SearchResult(doi=f"10.1/{i}", title=f"Título {i}", abstract="An abstract", authors="Doe, J.",
+                         date="2020-01-01", source="Fake")
+            for i in range(3)]
+
+
+def test_result_cache_round_trip(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    cache.set("search", "Fake", "refugee  integration", 2015, 2020, results())
+    cache.set("count", "Fake", "refugee integration", 2015, 2020, 3)
+
+    assert cache.get("search", "Fake", " refugee integration", "2015", "2020") == results()
+    assert cache.get("count", "Fake", "refugee integration", 2015, 2020) == 3
+    assert cache.get("search", "Fake", "refugee integration") is None
+    assert cache.get("search:date", "Fake", "refugee integration", 2015, 2020) is None
+    assert cache.age("count", "Fake", "refugee integration", 2015, 2020) < 60
+
+    # Entries survive reopening the database
+    cache.close()
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    assert cache.get("search", "Fake", "refugee integration", 2015, 2020) == results()
+    assert cache.invalidate(kind="count") == 1
+    assert cache.get("count", "Fake", "refugee integration", 2015, 2020) is None
+
+
+def test_result_cache_expires_and_evicts(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", ttl=60, max_bytes=10 ** 6)
+    cache.set("count", "Fake", "old", None, None, 1)
+    with cache._conn:
+        cache._conn.execute("UPDATE entries SET created = created - 120")
+    assert cache.get("count", "Fake", "old") is None
+
+    cache.max_bytes = 1
+    cache.set("count", "Fake", "a", None, None, 1)
+    cache.set("count", "Fake", "b", None, None, 2)
+    assert cache.get("count", "Fake", "a") is None
+
+
+def test_client_serves_repeated_calls_from_the_cache(tmp_path, make_client):
+    handler = FakeHandler(per_year=2)
+    client = make_client(handler, cache=ResultCache(tmp_path / "cache.sqlite"))
+    first = client.search("q", 2000, 2001)
+    assert client.search(" q ", "2000", "2001") == first
+    assert client.count("q", 2000, 2001) == client.count("q", 2000, 2001) == {'Fake': 4}
+    assert handler.calls == {'count': 1, 'search': 1}
+
+    # Other field selections and filters are cached separately, refresh bypasses the cache
+    client.search("q", 2000, 2001, fields=["title"])
+    client.search("q", 2000, 2001, filters=Filters(has_doi=True))
+    assert client.search("q", 2000, 2001, refresh=True) == first
+    assert handler.calls['search'] == 4
+
+
+def test_client_does_not_cache_failures(tmp_path, make_client):
+    handler = FakeHandler(per_year=1)
+    client = make_client(handler, cache=ResultCache(tmp_path / "cache.sqlite"))
+    handler.fail = RuntimeError("unavailable")
+    assert client.search("q") == [] and list(client.errors) == ['Fake']
+
+    handler.fail = None
+    assert len(client.search("q")) == 1 and not client.errors
+    assert handler.calls['search'] == 2
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from conftest import FakeHandler
+
+from bibly.utils import run_concurrently
+
+
+def test_timeout_keeps_partial_results_and_reports_the_rest(make_client):
+    slow, fast = FakeHandler(per_year=1), FakeHandler(per_year=2)
+    slow.gate = threading.Event()
+    client = make_client(slow, timeout=0.3)
+    client.handlers = {'Slow': slow, 'Fast': fast}
+    try:
+        start = time.monotonic()
+        results = client.search("q")
+        elapsed = time.monotonic() - start
+    finally:
+        slow.gate.set()
+
+    assert elapsed < 2
+    assert [r.title for r in results] == ["q 2000 0", "q 2000 1"]
+    assert list(client.errors) == ['Slow']
+    assert isinstance(client.errors['Slow'], TimeoutError)
+
+
+def test_results_and_errors_follow_task_order():
+    def fail():
+        raise ValueError("failed")
+
+    def late():
+        time.sleep(0.1)
+        return "late"
+
+    results, errors = run_concurrently({'late': late, 'fail': fail, 'early': lambda: "early"}, timeout=5)
+    assert list(results.items()) == [('late', 'late'), ('early', 'early')]
+    assert list(errors) == ['fail'] and isinstance(errors['fail'], ValueError)
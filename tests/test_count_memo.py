@@ -0,0 +1,32 @@
+from conftest import FakeHandler
+
+from bibly.utils import CountMemo, ResultCache
+
+
+def test_count_memo_round_trip():
+    memo = CountMemo(ttl=60)
+    memo.set("Fake", "refugee  integration", 2015, 2020, 42)
+    count, age = memo.get("Fake", "refugee integration", "2015", "2020")
+    assert count == 42 and memo.is_fresh(age)
+    assert memo.get("Fake", "refugee integration") is None
+
+    memo.set("Fake", "q", None, None, 7, age=120)
+    count, age = memo.get("Fake", "q")
+    assert count == 7 and age >= 120 and not memo.is_fresh(age)
+
+
+def test_cached_counts_keep_their_age(tmp_path, make_client):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    cache.set("count", "Fake", "q", 2000, 2001, 200)
+    with cache._conn:
+        cache._conn.execute("UPDATE entries SET created = created - 3600")
+
+    client = make_client(FakeHandler(), cache=cache)
+    assert client.count("q", 2000, 2001) == {'Fake': 200}
+    assert client.handlers['Fake'].calls['count'] == 0
+    _, age = client.count_memo.get("Fake", "q", 2000, 2001)
+    assert age >= 3600
+
+    client.count("q", 2000, 2001, refresh=True)
+    _, age = client.count_memo.get("Fake", "q", 2000, 2001)
+    assert age < 60
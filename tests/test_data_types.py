@@ -0,0 +1,29 @@
+import pytest
+
+from bibly.utils import deduplicate, ResultBatch, SearchResult
+
+
+def results() -> list[SearchResult]:
+    return [SearchResult(doi=f"10.1/{i % 3}", title=f"Title {i}", abstract=None, authors="Doe, J.",
+                         date="2020-01-01", source="Fake")
+            for i in range(5)]
+
+
+def test_batch_round_trips_to_search_results():
+    batch = ResultBatch.from_results(results())
+    assert len(batch) == 5
+    assert batch.to_results() == results()
+    assert batch[1] == results()[1]
+    assert batch[1:3].to_results() == results()[1:3]
+    assert ResultBatch(batch.columns) == batch
+
+
+def test_batch_is_deduplicated_like_results():
+    assert deduplicate(ResultBatch.from_results(results())).to_results() == deduplicate(results())
+
+
+def test_batch_exports_to_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = ResultBatch.from_results(results()).to_arrow()
+    assert table.num_rows == 5
+    assert pa.types.is_dictionary(table.schema.field('source').type)
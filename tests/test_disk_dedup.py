@@ -0,0 +1,46 @@
+import pytest
+
+from bibly.utils import deduplicate, DiskDeduplicator, iter_deduplicate, iter_deduplicate_on_disk, SearchResult
+
+
+def record(title, doi) -> SearchResult:
+    return SearchResult(doi=doi, title=title, abstract=None, authors=None, date=None, source="Fake")
+
+
+RESULTS = [
+    record("Refugee integration", "10.1/a"),
+    # Same title up to case and whitespace
+    record(" Refugee  INTEGRATION ", "10.1/b"),
+    # Same DOI up to case and surrounding whitespace
+    record("Another title", " 10.1/A "),
+    # Its title is not remembered, as it was dropped
+    record("Another title", "10.1/c"),
+    record(None, None),
+    record(None, None),
+    record("Labour market", None),
+    record(None, "10.1/d"),
+    record("Labour market", "10.1/d"),
+    # Punctuation and resolver prefixes are not normalized
+    record("Refugee integration.", "https://doi.org/10.1/a"),
+] * 2 + [record(f"Title {i}", f"10.2/{i}") for i in range(20)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1000])
+def test_disk_deduplication_agrees_with_deduplicate(chunk_size):
+    expected = deduplicate(RESULTS)
+    assert [(r.title, r.doi) for r in expected[:7]] == [
+        ("Refugee integration", "10.1/a"), ("Another title", "10.1/c"), (None, None), (None, None),
+        ("Labour market", None), (None, "10.1/d"), ("Refugee integration.", "https://doi.org/10.1/a")]
+    assert list(iter_deduplicate_on_disk(RESULTS, chunk_size=chunk_size)) == expected
+    assert list(iter_deduplicate(RESULTS)) == expected
+
+
+def test_disk_deduplicator_remembers_keys_across_chunks(tmp_path):
+    with DiskDeduplicator(tmp_path / "seen.sqlite", chunk_size=3) as deduplicator:
+        first = deduplicator(RESULTS[:10])
+        # Only the records without any key are kept again
+        second = deduplicator(RESULTS[10:20])
+        assert second == [record(None, None)] * 2
+        assert first + second + deduplicator(RESULTS[20:]) == deduplicate(RESULTS)
+        assert deduplicator.stats.results == len(RESULTS)
+        assert deduplicator.stats.unique == len(deduplicate(RESULTS))
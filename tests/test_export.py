@@ -0,0 +1,38 @@
+import gzip
+import json
+import re
+
+import pytest
+
+from bibly.utils import export_results, SearchResult
+from bibly.utils.export import _TextWriter
+
+
+def record(authors: str, date: str = None, doi: str = None) -> SearchResult:
+    return SearchResult(doi=doi, title="Title", abstract=None, authors=authors, date=date, source="Fake")
+
+
+def bibtex_keys(path) -> list[str]:
+    return re.findall(r"@misc\{(.*),", path.read_text(encoding="utf-8"))
+
+
+def test_text_writer_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        _TextWriter(tmp_path / "out.txt")
+
+
+def test_bibtex_keys_are_never_empty(tmp_path):
+    path = tmp_path / "out.bib"
+    export_results([record("Kühne, S.", "2019-01-01"),
+                    record("Kühne, S.", "2019-05-01"),
+                    record("Иванов, И.", doi="10.1000/ABC.1"),
+                    record("Иванов, И.")], path)
+    assert bibtex_keys(path) == ["kuhne2019", "kuhne2019_1", "doi101000abc1", "entry4"]
+
+
+def test_jsonl_export_round_trips(tmp_path):
+    results = [record("Doe, J.", "2020-01-01", f"10.1/{i}") for i in range(5)]
+    path = tmp_path / "out.jsonl.gz"
+    assert export_results(results, path, chunk_size=2) == 5
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        assert [SearchResult(**json.loads(line)) for line in file] == results
@@ -0,0 +1,70 @@
+import pytest
+from conftest import FakeHandler
+
+from bibly.utils import SearchResult
+
+
+class LookupHandler(FakeHandler):
+    """Fake handler recording its field hints and knowing the full records of its DOIs."""
+
+    def __init__(self, **kwargs):
+        self.hints: list = []
+        self.looked_up: list[str] = []
+        super().__init__(**kwargs)
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        self.hints.append(fields)
+        return super().iter_pages(query, year_from, year_to, fields, since, filters)
+
+    def lookup(self, dois):
+        if self.fail is not None:
+            raise self.fail
+        self.looked_up.extend(dois)
+        for doi in dois:
+            query, year, i = doi.removeprefix("10.1/").split(".")
+            yield SearchResult(doi=doi, title=f"{query} {year} {i}", abstract=f"Abstract {i}",
+                               authors="Doe, J.", date=f"{year}-01-01", source='Fake')
+
+
+def test_projection_drops_unrequested_fields(make_client):
+    handler = LookupHandler(per_year=2)
+    results = make_client(handler).search("q", fields=["title"])
+
+    assert handler.hints == [["title"]]
+    assert [(r.doi, r.title, r.abstract, r.authors, r.date, r.source) for r in results] == [
+        ("10.1/q.2000.0", "q 2000 0", None, None, None, 'Fake'),
+        ("10.1/q.2000.1", "q 2000 1", None, None, None, 'Fake')]
+
+
+def test_unknown_fields_fail_early(make_client):
+    handler = LookupHandler()
+    with pytest.raises(ValueError, match="Unknown field"):
+        make_client(handler).search("q", fields=["titel"])
+    assert handler.hints == []
+
+
+def test_hydrate_fills_requested_fields_later(make_client):
+    handler = LookupHandler(per_year=2)
+    client = make_client(handler)
+    results = client.search("q", fields=["title"])
+    assert client.hydrate(results, ["abstract", "date"]) is results
+
+    assert handler.looked_up == ["10.1/q.2000.0", "10.1/q.2000.1"]
+    assert [(r.abstract, r.date, r.authors) for r in results] == [
+        ("Abstract 0", "2000-01-01", None), ("Abstract 1", "2000-01-01", None)]
+    # Complete results are not looked up again
+    client.hydrate(results, ["abstract"])
+    assert len(handler.looked_up) == 2
+
+
+def test_hydrate_skips_results_without_doi_and_reports_failures(make_client):
+    handler = LookupHandler(per_year=1)
+    client = make_client(handler)
+    untitled = SearchResult(doi=None, title="t", abstract=None, authors=None, date=None, source='Fake')
+    client.hydrate([untitled])
+    assert handler.looked_up == [] and untitled.abstract is None
+
+    results = client.search("q", fields=["title"])
+    handler.fail = RuntimeError("lookup failed")
+    client.hydrate(results)
+    assert list(client.errors) == ['Fake'] and results[0].abstract is None
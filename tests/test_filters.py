@@ -0,0 +1,67 @@
+from urllib.parse import unquote
+
+from pyalex import Works
+import pytest
+
+from bibly.handlers import sciencedirect_handler, scopus_handler, springer_handler
+from bibly.handlers.openalex_handler import OpenAlexHandler
+from bibly.utils import Filters
+
+
+@pytest.fixture
+def handlers(monkeypatch) -> dict:
+    # The backend configuration functions would write files to the home directory
+    for module in (sciencedirect_handler, scopus_handler, springer_handler):
+        monkeypatch.setattr(module, 'init', lambda *args, **kwargs: None)
+    return {'Scopus': scopus_handler.ScopusHandler(scopus_key='key'),
+            'ScienceDirect': sciencedirect_handler.SciencedirectHandler(scopus_key='key'),
+            'Springer': springer_handler.SpringerHandler(springer_key='key'),
+            'OpenAlex': OpenAlexHandler(openalex_key='key')}
+
+
+def test_openalex_filters(handlers):
+    params = handlers['OpenAlex']._filter_params(
+        Filters(doc_types=["review", "article"], languages="EN", open_access=True, has_doi=False))
+    assert params == {'type': 'article|review', 'language': 'en', 'is_oa': True, 'has_doi': False}
+    url = unquote(Works().filter(**params).url)
+    assert url.endswith("filter=type:article|review,language:en,is_oa:true,has_doi:false")
+    assert handlers['OpenAlex']._filter_params(None) == {}
+    with pytest.raises(ValueError, match="conference-paper"):
+        handlers['OpenAlex']._filter_params(Filters(doc_types=["conference-paper"]))
+
+
+def test_scopus_filters(handlers):
+    clauses = handlers['Scopus']._filter_clauses(
+        Filters(doc_types=["article", "conference-paper"], languages=["de", "en"], open_access=False))
+    assert clauses == (" AND (DOCTYPE(ar) OR DOCTYPE(cp)) AND (LANGUAGE(german) OR LANGUAGE(english))"
+                       " AND OPENACCESS(0)")
+    with pytest.raises(ValueError, match="language"):
+        handlers['Scopus']._filter_clauses(Filters(languages=["xx"]))
+
+
+def test_springer_filters(handlers):
+    springer = handlers['Springer']
+    assert springer._filter_constraints(Filters(languages=["en", "de"], open_access=True)) == (
+        " AND (language:de OR language:en) AND openaccess:true")
+    with pytest.raises(ValueError, match="not exclude"):
+        springer._filter_constraints(Filters(open_access=False))
+    with pytest.raises(ValueError, match="Springer cannot filter by doc_types"):
+        springer._filter_constraints(Filters(doc_types=["article"]))
+
+
+def test_sciencedirect_filters(handlers):
+    sciencedirect = handlers['ScienceDirect']
+    assert sciencedirect._filter_params(Filters(open_access=True)) == {'filters': {'openAccess': True}}
+    assert sciencedirect._filter_params(Filters(has_doi=True)) == {}
+    with pytest.raises(ValueError, match="languages"):
+        sciencedirect._filter_params(Filters(languages=["en"]))
+
+
+@pytest.mark.parametrize("name", ['Scopus', 'ScienceDirect', 'Springer'])
+def test_has_doi_falls_back_to_local_filtering(handlers, name):
+    local = handlers[name]._local_filters(Filters(open_access=True, has_doi=True))
+    assert local == Filters(has_doi=True)
+
+
+def test_openalex_pushes_all_filters(handlers):
+    assert handlers['OpenAlex']._local_filters(Filters(has_doi=True, doc_types=["book"])) is None
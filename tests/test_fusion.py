@@ -0,0 +1,102 @@
+from typing import Iterator, Optional
+
+from bibly import BibLy
+from bibly.base_handler import SearchHandler
+from bibly.utils import Filters, fuse_fields, index_by_doi, SearchResult, set_provenance
+
+
+def record(doi, title, abstract=None, source="Full") -> SearchResult:
+    return SearchResult(doi=doi, title=title, abstract=abstract, authors="Doe, J.", date="2020-01-01", source=source)
+
+
+class RecordsHandler(SearchHandler):
+    """Handler returning fixed records, and abstracts by DOI from ``lookup``."""
+
+    def __init__(self, name: str, records: list[tuple], abstracts: Optional[dict[str, str]] = None,
+                 deferred: tuple[str, ...] = ()):
+        self.name = name
+        self.records = records
+        self.abstracts = abstracts or {}
+        self.deferred_fields = deferred
+        self.looked_up: list[str] = []
+        super().__init__()
+
+    def initialize(self):
+        pass
+
+    def count(self, query, year_from=None, year_to=None, filters=None) -> int:
+        return len(self.records)
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None,
+                   filters: Optional[Filters] = None) -> Iterator[list[SearchResult]]:
+        yield [record(*values, source=self.name) for values in self.records]
+
+    def lookup(self, dois: list[str]) -> Iterator[SearchResult]:
+        self.looked_up.extend(dois)
+        for doi in dois:
+            if doi in self.abstracts:
+                yield record(doi, "Looked up", self.abstracts[doi], source=self.name)
+
+
+def make_client(*handlers: RecordsHandler) -> BibLy:
+    client = BibLy()
+    client.handlers = {handler.name: handler for handler in handlers}
+    return client
+
+
+def test_deferred_fields_come_from_other_providers_first():
+    listing = RecordsHandler('Listing', [("10.1/a", "A", "dropped"), ("10.1/b", "B", "dropped")],
+                             abstracts={"10.1/b": "Abstract B"}, deferred=('abstract',))
+    full = RecordsHandler('Full', [("https://doi.org/10.1/A", "A (full)", "Abstract A")])
+    results = make_client(listing, full).search("q", fuse=True)
+
+    a, b, a_full = results
+    assert (a.abstract, b.abstract) == ("Abstract A", "Abstract B")
+    # Only the DOI no other provider covers is looked up
+    assert listing.looked_up == ["10.1/b"]
+    assert a.provenance == {'doi': 'Listing', 'title': 'Listing', 'abstract': 'Full',
+                            'authors': 'Listing', 'date': 'Listing'}
+    assert b.provenance['abstract'] == 'Listing'
+    assert set(a_full.provenance.values()) == {'Full'}
+
+
+def test_conflicting_values_are_kept():
+    first = record("10.1/a", "Own title", source="Listing")
+    first.abstract = None
+    second = record("10.1/A", "Other title", "Other abstract")
+    incomplete = fuse_fields([first], index_by_doi([first, second]), ['title', 'abstract'])
+
+    assert incomplete == []
+    assert (first.title, first.abstract) == ("Own title", "Other abstract")
+    assert first.provenance == {'abstract': 'Full'}
+
+
+def test_first_candidate_wins_and_own_source_is_skipped():
+    result = record("10.1/a", "A", source="Listing")
+    own = record("10.1/a", "A", "Own abstract", source="Listing")
+    first = record("10.1/a", "A", "First abstract", source="Full")
+    second = record("10.1/a", "A", "Second abstract", source="Other")
+    fuse_fields([result], index_by_doi([own, first, second]), ['abstract'])
+    assert (result.abstract, result.provenance) == ("First abstract", {'abstract': 'Full'})
+
+
+def test_results_without_doi_are_not_fused():
+    listing = RecordsHandler('Listing', [(None, "A")], abstracts={}, deferred=('abstract',))
+    full = RecordsHandler('Full', [(None, "A", "Abstract A")])
+    client = make_client(listing, full)
+    untitled, complete = client.search("q", fuse=True)
+
+    assert untitled.abstract is None
+    assert listing.looked_up == []
+    assert 'abstract' not in untitled.provenance
+    assert untitled.provenance['title'] == 'Listing'
+    assert complete.provenance['abstract'] == 'Full'
+    assert not client.errors
+
+
+def test_set_provenance_keeps_recorded_sources():
+    result = record("10.1/a", "A", "Abstract")
+    result.provenance = {'abstract': 'Other'}
+    set_provenance([result])
+    assert result.provenance == {'doi': 'Full', 'title': 'Full', 'abstract': 'Other',
+                                 'authors': 'Full', 'date': 'Full'}
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from conftest import FakeHandler
+
+from bibly.harvest import HarvestJob
+
+
+class FlakyHandler(FakeHandler):
+    """Handler whose page ``fail_page`` fails the next ``failures`` times it is fetched."""
+
+    def __init__(self, fail_page: int, failures: int):
+        super().__init__(per_year=50, page_size=10)
+        self.fail_page = fail_page
+        self.failures = failures
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        for number, page in enumerate(super().iter_pages(query, year_from, year_to, fields, since), start=1):
+            if number == self.fail_page and self.failures:
+                self.failures -= 1
+                raise RuntimeError(f"page {number} failed")
+            yield page
+
+
+def test_pages_are_checkpointed(tmp_path):
+    job = HarvestJob(FakeHandler(per_year=50, page_size=10), "q", 2000, 2000, directory=tmp_path)
+    results = job.run()
+
+    assert len(results) == 50 and job.complete
+    state = json.loads((tmp_path / "state.json").read_text())
+    assert state["pages"] == 5 and state["results"] == 50 and state["position"] == 5
+    assert job.results() == results
+
+
+def test_failed_page_is_retried(tmp_path):
+    handler = FlakyHandler(fail_page=3, failures=1)
+    results = HarvestJob(handler, "q", 2000, 2000, directory=tmp_path, backoff=0).run()
+    assert [r.doi for r in results] == [f"10.1/q.2000.{i}" for i in range(50)]
+
+
+def test_failed_harvest_resumes_after_the_last_checkpoint(tmp_path):
+    handler = FlakyHandler(fail_page=3, failures=10)
+    job = HarvestJob(handler, "q", 2000, 2000, directory=tmp_path, max_retries=0)
+    with pytest.raises(RuntimeError):
+        job.run()
+    assert len(job.results()) == 20 and not job.complete
+
+    # A crash after writing results but before the checkpoint leaves a partial page
+    with open(tmp_path / "results.jsonl", "a") as file:
+        file.write('{"doi": "10.1/partial"')
+    handler.failures = 0
+    results = job.run()
+    assert [r.doi for r in results] == [f"10.1/q.2000.{i}" for i in range(50)]
+
+
+def test_checkpoint_of_another_search_is_rejected(tmp_path):
+    HarvestJob(FakeHandler(), "q", 2000, 2000, directory=tmp_path).run()
+    with pytest.raises(ValueError, match="another search"):
+        HarvestJob(FakeHandler(), "other", 2000, 2000, directory=tmp_path).run()
+
+
+def test_completed_harvest_is_reused_until_refreshed(tmp_path, make_client):
+    handler = FakeHandler(per_year=10)
+    client = make_client(handler)
+
+    assert len(client.harvest("q", 2000, 2001, directory=tmp_path)) == 20
+    assert len(client.harvest("q", 2000, 2001, directory=tmp_path)) == 20
+    assert handler.calls['search'] == 1
+    assert len(client.harvest("q", 2000, 2001, directory=tmp_path, refresh=True)) == 20
+    assert handler.calls['search'] == 2
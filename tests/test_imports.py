@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+_LAZY_MODULES = ("asyncio", "bibly.async_client", "pyalex", "pybliometrics", "sprynger")
+
+
+def loaded_modules(statement: str) -> set[str]:
+    """The modules of ``_LAZY_MODULES`` loaded after running a statement in a fresh interpreter."""
+    code = f"{statement}; import sys; print(*(m for m in {_LAZY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return set(output.split())
+
+
+def test_import_loads_no_backends_and_no_asyncio():
+    assert loaded_modules("import bibly") == set()
+
+
+def test_async_client_is_imported_on_first_access():
+    assert loaded_modules("from bibly import AsyncBibLy") == {"asyncio", "bibly.async_client"}
+    assert loaded_modules("from bibly import *; AsyncBibLy") == {"asyncio", "bibly.async_client"}
@@ -0,0 +1,32 @@
+from conftest import FakeHandler
+
+from bibly.utils import IncrementalStore, rewind_date
+
+
+class SinceHandler(FakeHandler):
+    """Records the ``since`` of each search."""
+
+    def __init__(self):
+        super().__init__(per_year=10)
+        self.since = []
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        self.since.append(since)
+        return super().iter_pages(query, year_from, year_to, fields, since, filters)
+
+
+def test_rewind_date():
+    assert rewind_date("2020-03-01", 30) == "2020-01-31"
+    assert rewind_date("2020-03-01", 0) == "2020-03-01"
+    assert rewind_date(None, 30) is None
+
+
+def test_runs_overlap_by_the_lookback(tmp_path, make_client):
+    handler = SinceHandler()
+    client = make_client(handler)
+    store = IncrementalStore(tmp_path / "store.sqlite")
+
+    assert len(client.search_incremental("q", 2000, 2001, store=store)) == 20
+    # Records fetched again within the overlap are merged, not duplicated
+    assert len(client.search_incremental("q", 2000, 2001, store=store, lookback=10)) == 20
+    assert handler.since == [None, "2000-12-22"]
@@ -0,0 +1,62 @@
+from conftest import FakeHandler
+
+from bibly.utils import Filters, SearchResult
+
+
+class PagedHandler(FakeHandler):
+    """Fake handler serving raw pages as an API would, recording how many were fetched."""
+
+    def __init__(self, pages: list[list[SearchResult]], fail_after: int = None):
+        self.pages = pages
+        self.fail_after = fail_after
+        self.fetched = 0
+        super().__init__()
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        for number, page in enumerate(self.pages):
+            if number == self.fail_after:
+                raise RuntimeError("connection reset")
+            self.fetched += 1
+            yield page
+
+
+def raw(i: int, doi=True) -> SearchResult:
+    return SearchResult(doi=f"https://doi.org/10.1/{i}" if doi else None, title=f"<i>Title</i>  {i}",
+                        abstract=None, authors=["Doe, J.", " Roe, R. "], date="2020/1/2", source='Fake')
+
+
+def test_pages_are_fetched_one_at_a_time(make_client):
+    handler = PagedHandler([[raw(0), raw(1)], [raw(2), raw(3)], [raw(4)]])
+    results = make_client(handler).iter_search("q")
+
+    assert handler.fetched == 0
+    next(results)
+    assert handler.fetched == 1
+    next(results)
+    next(results)
+    assert handler.fetched == 2
+    assert len(list(results)) == 2 and handler.fetched == 3
+
+
+def test_each_page_is_normalized_and_filtered(make_client):
+    handler = PagedHandler([[raw(0), raw(1, doi=False)], [raw(2, doi=False)], [raw(3)]])
+    results = make_client(handler).iter_search("q", filters=Filters(has_doi=True))
+
+    first = next(results)
+    assert (first.doi, first.title, first.authors, first.date) == (
+        "10.1/0", "Title 0", "Doe, J.; Roe, R.", "2020-01-02")
+    assert handler.fetched == 1
+    # The second page is filtered out entirely, so the next result comes from the third
+    assert next(results).doi == "10.1/3"
+    assert handler.fetched == 3
+
+
+def test_error_midway_keeps_yielded_results_and_continues(make_client):
+    failing = PagedHandler([[raw(0), raw(1)], [raw(2)]], fail_after=1)
+    client = make_client(failing)
+    client.handlers['Other'] = PagedHandler([[raw(9)]])
+    results = list(client.iter_search("q"))
+
+    assert [r.doi for r in results] == ["10.1/0", "10.1/1", "10.1/9"]
+    assert list(client.errors) == ['Fake']
+    assert "connection reset" in str(client.errors['Fake'])
@@ -0,0 +1,91 @@
+import pytest
+from conftest import FakeHandler
+
+from bibly.utils import LocalIndex, SearchResult, translate_query
+
+
+def record(title: str, abstract: str = None, year: int = 2016, doi: str = None) -> SearchResult:
+    return SearchResult(doi=doi, title=title, abstract=abstract, authors="Doe, J.",
+                        date=f"{year}-01-01", source="Fake")
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("refugee", '"refugee"'),
+    ("refugee integration", '"refugee" "integration"'),
+    ("refugee* AND NOT asylum", '"refugee" * NOT "asylum"'),
+    ('TITLE("labour market") OR ABS(migra*)', '{title} : ("labour market") OR {abstract} : ("migra" *)'),
+    ("TITLE-ABS-KEY(iab-bamf-soep)", '{title abstract} : ("iab-bamf-soep")'),
+    ("(a OR b) AND c", '("a" OR "b") AND "c"'),
+])
+def test_translate_query(query, expected):
+    assert translate_query(query) == expected
+
+
+@pytest.mark.parametrize("query", ["NOT refugee", "refugee AND", "PUBYEAR > 2015", "AFFIL(berlin)",
+                                   "a AND (b", "a) OR (b"])
+def test_translate_query_rejects_unsupported_syntax(query):
+    with pytest.raises(ValueError):
+        translate_query(query)
+
+
+@pytest.fixture
+def index() -> LocalIndex:
+    index = LocalIndex(":memory:")
+    index.add([record("Refugees on the labour market", year=2016),
+               record("Integration courses", "Refugee integration in schools", year=2018),
+               # Matched by the provider through a field that is not indexed
+               record("Language acquisition", year=2017)],
+              "integration", 2015, 2020)
+    return index
+
+
+def test_can_answer_narrowed_queries(index):
+    assert index.can_answer("integration", 2016, 2018)
+    assert index.can_answer("integration AND TITLE(refugee*)", 2015, 2020)
+    assert index.can_answer("integration AND TITLE-ABS(refugee) AND NOT AUTH(smith)", 2015, 2020)
+    assert not index.can_answer("integration", 2010, 2020)
+    assert not index.can_answer("migration AND TITLE(refugee*)", 2015, 2020)
+
+
+@pytest.mark.parametrize("query", [
+    # Keywords are not indexed
+    "integration AND TITLE-ABS-KEY(refugee)",
+    # Bare terms search fields that differ between providers
+    "integration AND refugee",
+    # Scopus binds OR tighter than AND, FTS5 the other way round
+    "integration AND TITLE(refugee OR asylum AND school)",
+    "integration AND TITLE(refugee asylum OR school)",
+    "integration AND NOT TITLE(refugee) AND ABS(school)",
+])
+def test_can_answer_rejects_differing_semantics(index, query):
+    assert not index.can_answer(query, 2015, 2020)
+
+
+def test_answer_evaluates_refinements_on_the_harvest(index):
+    assert len(index.answer("integration", 2015, 2020)) == 3
+    assert [r.title for r in index.answer("integration AND TITLE(refugee*)", 2015, 2020)] == \
+        ["Refugees on the labour market"]
+    # Stemmed: "refugees" matches "Refugee"
+    assert [r.title for r in index.answer("integration AND ABS(refugees)", 2015, 2020)] == \
+        ["Integration courses"]
+    assert [r.title for r in index.answer("integration AND NOT TITLE(refugee)", 2017, 2020)] == \
+        ["Integration courses", "Language acquisition"]
+    with pytest.raises(ValueError):
+        index.answer("migration", 2015, 2020)
+
+
+def test_duplicates_are_members_of_later_harvests(index):
+    index.add([record("Integration Courses", doi="10.1/x", year=2018)], "courses", 2018, 2018)
+    assert len(index) == 3
+    assert [r.title for r in index.answer("courses", 2018, 2018)] == ["Integration courses"]
+
+
+def test_truncated_search_is_not_recorded(make_client):
+    client = make_client(FakeHandler(per_year=100, max_results=150), index=LocalIndex(":memory:"))
+    client.search("q", 2000, 2001)
+    assert not client.index.can_answer("q", 2000, 2001)
+
+    client = make_client(FakeHandler(per_year=100, max_results=500), index=LocalIndex(":memory:"))
+    client.search("q", 2000, 2001)
+    assert client.index.can_answer("q", 2000, 2001)
+    assert len(client.search("q", 2000, 2001)) == 200
@@ -0,0 +1,88 @@
+from pathlib import Path
+import re
+
+import pytest
+
+import bibly
+from bibly.utils import Metrics
+from bibly.utils.metrics import _HELP
+
+_SAMPLE_RE = re.compile(r'^(bibly_\w+?)(?:_bucket|_sum|_count)?(?:\{(.*)\})? (\S+)$')
+
+
+def parse_prometheus(text: str) -> dict:
+    """Parse the text exposition format into ``{name: {"help", "type", "samples"}}``, checking its structure."""
+    families, current = {}, None
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            name, help_text = line[len("# HELP "):].split(" ", 1)
+            current = families.setdefault(name, {"help": help_text, "type": None, "samples": []})
+        elif line.startswith("# TYPE "):
+            name, kind = line[len("# TYPE "):].split(" ")
+            assert name in families and kind in ("counter", "histogram")
+            families[name]["type"] = kind
+        else:
+            match = _SAMPLE_RE.match(line)
+            assert match and current is not None, line
+            labels = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+            current["samples"].append((line.split("{")[0].split(" ")[0], labels, float(match.group(3))))
+    return families
+
+
+def test_counters_and_timers():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("requests_total", handler="A")
+    metrics.inc("requests_total", 2, handler="A")
+    metrics.inc("requests_total", handler="B")
+    with metrics.timer("A", "search"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.timer("A", "page"):
+            raise RuntimeError
+
+    exported = metrics.to_dict()
+    assert sorted(exported["counters"]["requests_total"], key=str) == [({'handler': 'A'}, 3), ({'handler': 'B'}, 1)]
+    assert exported["counters"]["errors_total"] == [({'handler': 'A', 'phase': 'page'}, 1)]
+    histograms = dict((labels['phase'], h) for labels, h in exported["histograms"]["phase_seconds"])
+    assert histograms['search']['count'] == histograms['page']['count'] == 1
+    assert histograms['search']['buckets'] == {0.1: 1, 1.0: 1, float("inf"): 1}
+
+    metrics.reset()
+    assert metrics.to_dict() == {"counters": {}, "histograms": {}}
+
+
+def test_hooks_receive_every_phase():
+    metrics, spans = Metrics(), []
+    metrics.add_hook(lambda handler, phase, seconds: spans.append((handler, phase)))
+    with metrics.timer("A", "parse"):
+        pass
+    assert spans == [("A", "parse")]
+
+
+def test_prometheus_export():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.inc("results_total", 5, handler='Sco"pus')
+    metrics.observe("phase_seconds", 0.5, handler="A", phase="search")
+    families = parse_prometheus(metrics.to_prometheus())
+
+    assert families["bibly_results_total"]["type"] == "counter"
+    assert families["bibly_results_total"]["help"] == _HELP["results_total"]
+    assert families["bibly_results_total"]["samples"] == [("bibly_results_total", {'handler': 'Sco\\"pus'}, 5.0)]
+    histogram = families["bibly_phase_seconds"]
+    assert histogram["type"] == "histogram"
+    assert [(name, labels.get('le'), value) for name, labels, value in histogram["samples"]] == [
+        ("bibly_phase_seconds_bucket", "0.1", 0), ("bibly_phase_seconds_bucket", "1", 1),
+        ("bibly_phase_seconds_bucket", "+Inf", 1), ("bibly_phase_seconds_sum", None, 0.5),
+        ("bibly_phase_seconds_count", None, 1)]
+
+
+def test_every_recorded_series_has_help():
+    source = "\n".join(path.read_text() for path in Path(bibly.__file__).parent.rglob("*.py"))
+    names = set(re.findall(r'(?:inc|observe)\("(\w+)"', source)) | {"phase_seconds", "errors_total"}
+    assert names - set(_HELP) == set()
+
+    metrics = Metrics()
+    for name in names:
+        metrics.inc(name)
+    families = parse_prometheus(metrics.to_prometheus())
+    assert all(family["help"] == _HELP[name.removeprefix("bibly_")] for name, family in families.items())
@@ -0,0 +1,67 @@
+import pytest
+from conftest import FakeHandler
+
+from bibly.utils import cluster_duplicates, merge_duplicates, near_deduplicate, SearchResult
+
+
+def record(title, doi=None, authors="Kühne, Simon", date="2019-05-01", abstract=None, source="Fake") -> SearchResult:
+    return SearchResult(doi=doi, title=title, abstract=abstract, authors=authors, date=date, source=source)
+
+
+def test_near_duplicate_titles_share_a_cluster():
+    results = [
+        record("Refugees' integration into the German labour market", doi="10.1/a"),
+        record("Refugees integration into the german labour-market: evidence from a panel survey"),
+        record("Réfugiés: integration into the German labour market", authors="Smith, J."),
+        record("School choice and segregation in Berlin"),
+    ]
+    assert cluster_duplicates(results) == [0, 0, 2, 3]
+
+
+def test_contradicting_years_and_doi_matches():
+    results = [
+        record("Panel survey of refugees", date="2016-01-01"),
+        record("Panel survey of refugees", date="2019-01-01"),
+        record("Completely different title", doi="10.1/X"),
+        record("Another title altogether", doi="10.1/x"),
+    ]
+    assert cluster_duplicates(results) == [0, 1, 2, 2]
+
+
+@pytest.mark.parametrize("threshold, expected", [(0.9, [0, 1]), (0.5, [0, 0])])
+def test_threshold(threshold, expected):
+    results = [record("Labour market integration of refugees in Germany"),
+               record("Labour market integration of refugees in Austria")]
+    assert cluster_duplicates(results, threshold) == expected
+
+
+def test_empty_and_untitled_input():
+    assert cluster_duplicates([]) == []
+    assert near_deduplicate([]) == []
+    assert cluster_duplicates([record(None), record(None)]) == [0, 1]
+
+
+def test_merge_fills_missing_fields_from_the_cluster():
+    results = [record("Refugee integration in schools"),
+               record("Refugee integration in schools.", doi="10.1/a", abstract="An abstract", source="Other")]
+    merged = merge_duplicates(results, cluster_duplicates(results))
+    assert len(merged) == 1
+    assert (merged[0].doi, merged[0].abstract, merged[0].source) == ("10.1/a", "An abstract", "Fake")
+    # The input is left untouched
+    assert results[0].doi is None
+
+
+class NearDuplicateHandler(FakeHandler):
+    def _records(self, query, year_from, year_to):
+        return [record("Refugee integration in German schools", doi="10.1/a"),
+                record("Refugee integration in German schools: evidence from a panel", abstract="An abstract"),
+                record("School choice and segregation in Berlin")]
+
+
+def test_search_collapses_near_duplicates(make_client):
+    client = make_client(NearDuplicateHandler())
+    assert len(client.search("q", deduplicate=True)) == 3
+    results = client.search("q", deduplicate="near")
+    assert [(r.doi, r.abstract) for r in results] == [("10.1/a", "An abstract"), (None, None)]
+    with pytest.raises(ValueError, match="deduplicate mode"):
+        client.search("q", deduplicate="fuzzy")
@@ -0,0 +1,34 @@
+from bibly.utils import normalize_authors, normalize_dates, normalize_dois, normalize_results, SearchResult, strip_markup
+
+
+def test_normalize_dois():
+    assert normalize_dois(["https://doi.org/10.1000/ABC", "doi: 10.1/x ", "10.2/Y", "", None]) == \
+        ["10.1000/abc", "10.1/x", "10.2/y", None, None]
+
+
+def test_normalize_dates():
+    assert normalize_dates(["2019-04-02", "2019-04-02T00:00:00Z", "2019/4/2", "2019-04", "2019", "n.d.", None]) == \
+        ["2019-04-02", "2019-04-02", "2019-04-02", "2019-04", "2019", None, None]
+
+
+def test_normalize_authors_from_strings_and_lists():
+    assert normalize_authors(["Doe, J.;Roe, R.", " Doe, J. ", ["Doe, J.", None, " Roe, R."], [], None, ""]) == \
+        ["Doe, J.; Roe, R.", "Doe, J.", "Doe, J.; Roe, R.", None, None, None]
+
+
+def test_strip_markup():
+    assert strip_markup(["<jats:p>Refugee <i>integration</i> &amp; labour</jats:p>",
+                         " Two\n lines\xa0here ", "Plain text", "", None]) == \
+        ["Refugee integration & labour", "Two lines here", "Plain text", None, None]
+
+
+def test_strip_markup_keeps_text_in_angle_brackets():
+    assert strip_markup(["n<k and m>2", "a <b and c> d", "x < y > z", "H<sub>2</sub>O <inf>x</inf>",
+                         '<p class="lead">Lead</p><br/>', '<mml:math xmlns:mml="http://www.w3.org">x</mml:math>']) == \
+        ["n<k and m>2", "a <b and c> d", "x < y > z", "H 2 O x", "Lead", "x"]
+
+
+def test_normalize_results_in_place():
+    result = SearchResult("https://doi.org/10.1/A", "<b>Title</b>", None, ["Doe, J."], "2020-01-05T00:00:00", "Fake")
+    assert normalize_results([result]) == [result]
+    assert (result.doi, result.title, result.authors, result.date) == ("10.1/a", "Title", "Doe, J.", "2020-01-05")
@@ -0,0 +1,63 @@
+import pytest
+
+from bibly.handlers import openalex_handler
+from bibly.handlers.openalex_handler import OpenAlexHandler
+
+
+class Page(list):
+    def __init__(self, works, meta):
+        super().__init__(works)
+        self.meta = meta
+
+
+class FakeWorks:
+    """Serves ``total`` works in pages of 200, with cursors ``c<offset>`` in the response metadata."""
+    total = 450
+
+    def __init__(self):
+        self.filters = {}
+
+    def search_filter(self, **kwargs):
+        return self
+
+    def filter(self, **kwargs):
+        self.filters.update(kwargs)
+        return self
+
+    def select(self, fields):
+        return self
+
+    def paginate(self, per_page=25, cursor="*", n_max=10000):
+        FakeWorks.n_max = n_max
+        start = 0 if cursor == "*" else int(cursor[1:])
+        while start < self.total and (not n_max or start < n_max):
+            stop = min(start + per_page, self.total)
+            next_cursor = f"c{stop}" if stop < self.total else None
+            yield Page([{"doi": f"https://doi.org/10.1/{i}", "title": f"Work {i}", "authorships": []}
+                        for i in range(start, stop)], {"next_cursor": next_cursor})
+            start = stop
+
+
+@pytest.fixture
+def handler(monkeypatch) -> OpenAlexHandler:
+    monkeypatch.setattr(openalex_handler, "Works", FakeWorks)
+    return OpenAlexHandler(openalex_key="key")
+
+
+def test_positions_hold_the_cursor_of_the_response(handler):
+    positions = [position for _, position in handler.iter_checkpoints("q", 2000, 2001)]
+    assert positions == [{'cursor': 'c200', 'fetched': 200}, {'cursor': 'c400', 'fetched': 400},
+                         {'cursor': None, 'fetched': 450}]
+
+
+def test_resuming_fetches_no_page_twice(handler):
+    pages = list(handler.iter_checkpoints("q", 2000, 2001, position={'cursor': 'c200', 'fetched': 200}))
+    assert [len(page) for page, _ in pages] == [200, 50]
+    assert pages[0][0][0].title == "Work 200"
+    assert list(handler.iter_checkpoints("q", 2000, 2001, position={'cursor': None, 'fetched': 450})) == []
+
+
+def test_cursor_paging_is_not_capped_at_pyalex_default(handler):
+    assert handler.max_results is None
+    list(handler.iter_checkpoints("q", 2000, 2001))
+    assert FakeWorks.n_max is None
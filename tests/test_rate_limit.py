@@ -0,0 +1,46 @@
+import pytest
+from sprynger.exceptions import RateLimitError
+
+from bibly.base_handler import SearchHandler
+from bibly.utils import is_throttled, RequestScheduler
+
+
+def test_is_throttled():
+    assert is_throttled(RateLimitError(429))
+
+    class Response:
+        status_code = 429
+
+    class HTTPError(Exception):
+        response = Response()
+
+    assert is_throttled(HTTPError())
+    assert not is_throttled(ValueError("bad query"))
+
+
+def test_throttled_call_is_retried():
+    scheduler = RequestScheduler({"Fake": 1e9}, backoff=0.001)
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimitError(429)
+        return "ok"
+
+    assert scheduler.call("Fake", request) == "ok"
+    assert len(attempts) == 3
+
+
+def test_other_errors_are_not_retried():
+    scheduler = RequestScheduler({"Fake": 1e9}, backoff=0.001)
+    with pytest.raises(ValueError):
+        scheduler.call("Fake", lambda: (_ for _ in ()).throw(ValueError("bad query")))
+
+
+def test_rate_limits_are_scoped_to_the_client(make_client, fake_handler):
+    shared = SearchHandler.scheduler.buckets["Springer"].rate
+    client = make_client(fake_handler, rate_limits={"Springer": 5})
+    assert client.scheduler is not SearchHandler.scheduler
+    assert client.scheduler.buckets["Springer"].rate == 5
+    assert SearchHandler.scheduler.buckets["Springer"].rate == shared
@@ -0,0 +1,58 @@
+from types import SimpleNamespace
+
+import pytest
+from pybliometrics.exception import Scopus400Error, Scopus414Error
+
+from bibly.handlers import sciencedirect_handler
+from bibly.handlers.sciencedirect_handler import SciencedirectHandler
+
+
+class FakeMetadataAPI:
+    """Answers DOI queries like the Article Metadata API, rejecting bad DOIs and long queries."""
+
+    def __init__(self, bad: set[str] = frozenset(), max_length: int = 10 ** 6):
+        self.bad = bad
+        self.max_length = max_length
+        self.queries = []
+
+    def __call__(self, provider, func, q):
+        self.queries.append(q)
+        if len(q) > self.max_length:
+            raise Scopus414Error("URI too long")
+        dois = [term[len('DOI('):-1] for term in q.split(' OR ')]
+        if self.bad & set(dois):
+            raise Scopus400Error("invalid query")
+        entries = [SimpleNamespace(doi=doi, title=doi, abstract_text=None, authors=None, coverDate=None)
+                   for doi in dois]
+        return SimpleNamespace(results=entries)
+
+
+@pytest.fixture
+def handler(monkeypatch) -> SciencedirectHandler:
+    # pybliometrics' init would write its configuration file to the home directory
+    configs = []
+    monkeypatch.setattr(sciencedirect_handler, 'init', lambda **kwargs: configs.append(kwargs))
+    handler = SciencedirectHandler(scopus_key='key')
+    assert configs[0]['keys'] == ['key']
+    # Keep the fake API per instance, the scheduler is shared by the handlers
+    handler.scheduler = SimpleNamespace()
+    return handler
+
+
+def test_bad_doi_is_skipped_without_shrinking_batches(handler):
+    handler.scheduler.call = api = FakeMetadataAPI(bad={'10.1/3'})
+    dois = [f'10.1/{i}' for i in range(8)]
+    results = handler._fetch_metadata(dois)
+
+    assert [r.doi for r in results] == [doi for doi in dois if doi != '10.1/3']
+    assert handler._max_query_length == handler._MAX_QUERY_LENGTH
+    assert len(api.queries) == 7
+
+
+def test_too_long_query_lowers_the_query_length(handler):
+    handler.scheduler.call = FakeMetadataAPI(max_length=60)
+    dois = [f'10.1/{i}' for i in range(8)]
+    results = handler._fetch_metadata(dois)
+
+    assert [r.doi for r in results] == dois
+    assert handler._max_query_length < handler._MAX_QUERY_LENGTH
@@ -0,0 +1,64 @@
+import threading
+
+from conftest import FakeHandler
+
+
+class QueryHandler(FakeHandler):
+    """Fake handler recording its queries, failing for ``bad`` and optionally waiting at a barrier."""
+
+    def __init__(self, barrier: threading.Barrier = None, **kwargs):
+        self.barrier = barrier
+        self.queries: list[str] = []
+        super().__init__(**kwargs)
+
+    def iter_pages(self, query, year_from=None, year_to=None, fields=None, since=None, filters=None):
+        with self._lock:
+            self.queries.append(query)
+        if self.barrier is not None:
+            self.barrier.wait(5)
+        if query == "bad":
+            raise RuntimeError("bad query")
+        yield from super().iter_pages(query, year_from, year_to, fields, since, filters)
+
+
+def test_pairs_run_concurrently_in_query_then_handler_order(make_client):
+    barrier = threading.Barrier(4)
+    first, second = QueryHandler(barrier, per_year=2), QueryHandler(barrier, per_year=1)
+    client = make_client(first)
+    client.handlers = {'First': first, 'Second': second}
+    tagged = client.search_many(["a", "b"], deduplicate=False)
+
+    assert not client.errors
+    assert sorted(first.queries) == sorted(second.queries) == ["a", "b"]
+    assert [(t.result.title, t.queries) for t in tagged] == [
+        ("a 2000 0", ["a"]), ("a 2000 1", ["a"]), ("a 2000 0", ["a"]),
+        ("b 2000 0", ["b"]), ("b 2000 1", ["b"]), ("b 2000 0", ["b"])]
+
+
+def test_whitespace_variants_run_once_and_tag_all_aliases(make_client):
+    handler = QueryHandler(per_year=2)
+    tagged = make_client(handler).search_many(["a  b", " a b", "a  b", "c"])
+
+    assert sorted(handler.queries) == ["a b", "c"]
+    assert [(t.result.title, t.queries) for t in tagged] == [
+        ("a b 2000 0", ["a  b", " a b"]), ("a b 2000 1", ["a  b", " a b"]),
+        ("c 2000 0", ["c"]), ("c 2000 1", ["c"])]
+
+
+def test_duplicates_across_queries_collect_their_queries(make_client):
+    class SharedHandler(QueryHandler):
+        def _records(self, query, year_from, year_to):
+            return super()._records("shared", year_from, year_to)
+
+    tagged = make_client(SharedHandler(per_year=2)).search_many(["a", "b"])
+    assert [(t.result.title, t.queries) for t in tagged] == [
+        ("shared 2000 0", ["a", "b"]), ("shared 2000 1", ["a", "b"])]
+
+
+def test_failing_query_does_not_affect_the_others(make_client):
+    client = make_client(QueryHandler(per_year=1))
+    tagged = client.search_many(["a", "bad", "b"])
+
+    assert [(t.result.title, t.queries) for t in tagged] == [("a 2000 0", ["a"]), ("b 2000 0", ["b"])]
+    assert list(client.errors) == ["Fake: bad"]
+    assert "bad query" in str(client.errors["Fake: bad"])
@@ -0,0 +1,77 @@
+import pytest
+from conftest import FakeHandler
+
+from bibly.utils import plan_shards, ResultCache, SearchResult
+
+
+def test_plan_shards_stays_below_limit():
+    per_year = {year: 100 for year in range(2000, 2012)}
+
+    def count(start, end):
+        return sum(per_year[year] for year in range(start, end + 1))
+
+    shards = plan_shards(count, 2000, 2011, 250)
+    assert shards[0][0] == 2000 and shards[-1][1] == 2011
+    assert all(count(start, end) <= 250 for start, end in shards)
+    assert all(end + 1 == start for (_, end), (start, _) in zip(shards, shards[1:]))
+
+
+def test_sharded_search_is_complete(make_client):
+    client = make_client(FakeHandler(per_year=100, max_results=200))
+    assert len(client.search("q", 2000, 2011)) == 200
+    assert len(client.search("q", 2000, 2011, shard=True)) == 1200
+
+
+def test_sharded_search_is_cached_separately(tmp_path, make_client):
+    handler = FakeHandler(per_year=100, max_results=200)
+    client = make_client(handler, cache=ResultCache(tmp_path / "cache.sqlite"))
+
+    assert len(client.search("q", 2000, 2011)) == 200
+    assert len(client.search("q", 2000, 2011, shard=True)) == 1200
+    searches = handler.calls['search']
+    # Both are now served from their own cache entries
+    assert len(client.search("q", 2000, 2011)) == 200
+    assert len(client.search("q", 2000, 2011, shard=True)) == 1200
+    assert handler.calls['search'] == searches
+
+
+class DatedHandler(FakeHandler):
+    """Handler whose records spread over the months of a year and that accepts ISO date windows."""
+    date_windows = True
+
+    def _records(self, query, year_from, year_to):
+        date_from = str(year_from) if len(str(year_from)) > 4 else f"{year_from}-01-01"
+        date_to = str(year_to) if len(str(year_to)) > 4 else f"{year_to}-12-31"
+        records = []
+        for year in range(int(str(year_from)[:4]), int(str(year_to)[:4]) + 1):
+            for i in range(self.per_year):
+                date = f"{year}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+                if date_from <= date <= date_to:
+                    records.append(SearchResult(doi=f"10.1/{query}.{year}.{i}", title=f"{query} {year} {i}",
+                                                abstract=None, authors="Doe, J.", date=date, source='Fake'))
+        return records
+
+
+def test_plan_shards_splits_years_into_months():
+    handler = DatedHandler(per_year=120)
+    shards = plan_shards(lambda start, end: handler.count("q", start, end), 2000, 2001, 50, dates=True)
+    assert shards[0] == ("2000-01-01", "2000-03-31")
+    assert shards[-1][1] == "2001-12-31"
+    assert all(handler.count("q", start, end) <= 50 for start, end in shards)
+
+
+def test_plan_shards_raises_instead_of_truncating():
+    with pytest.raises(RuntimeError, match="cannot be split further"):
+        plan_shards(lambda start, end: 300, 2000, 2001, 250)
+    with pytest.raises(RuntimeError, match="2000-01-01 to 2000-01-01"):
+        plan_shards(lambda start, end: 300, 2000, 2000, 250, dates=True)
+
+
+def test_sharded_search_splits_years_or_reports_truncation(make_client):
+    client = make_client(DatedHandler(per_year=120, max_results=50))
+    assert len(client.search("q", 2000, 2001, shard=True)) == 240
+    assert not client.errors
+
+    client = make_client(FakeHandler(per_year=120, max_results=50))
+    assert client.search("q", 2000, 2001, shard=True) == []
+    assert "cannot be split further" in str(client.errors['Fake'])
@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+from conftest import FakeHandler
+
+from bibly.utils import SingleFlight
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.001)
+
+
+def run_held(flight: SingleFlight, func, callers: int) -> list:
+    """Call ``func`` through the flight from several threads while it is held, then release it."""
+    gate = threading.Event()
+
+    def held():
+        gate.wait(5)
+        return func()
+
+    with ThreadPoolExecutor(callers) as executor:
+        futures = [executor.submit(flight.do, "key", held) for _ in range(callers)]
+        wait_for(lambda: flight.coalesced == callers - 1)
+        gate.set()
+    return futures
+
+
+def test_identical_calls_are_coalesced():
+    flight = SingleFlight(clone=list)
+    calls = []
+    futures = run_held(flight, lambda: calls.append(1) or [1, 2, 3], 4)
+
+    values = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert values == [[1, 2, 3]] * 4
+    # Every caller gets its own copy of a shared value
+    assert len({id(value) for value in values}) == 4
+    assert flight.calls == 4 and flight.in_flight() == 0
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    for future in run_held(flight, fail, 3):
+        with pytest.raises(ValueError, match="boom"):
+            future.result()
+    # The outcome is not kept, a later call runs again
+    assert flight.do("key", lambda: 42) == 42
+
+
+def test_client_coalesces_concurrent_searches(make_client):
+    handler = FakeHandler(per_year=10)
+    handler.gate = threading.Event()
+    client = make_client(handler)
+
+    with ThreadPoolExecutor(3) as executor:
+        futures = [executor.submit(client.search, "q", 2000, 2001) for _ in range(3)]
+        wait_for(lambda: client.flights.coalesced == 2)
+        handler.gate.set()
+    results = [future.result() for future in futures]
+
+    assert handler.calls['search'] == 1
+    assert results[0] == results[1] == results[2]
+    # Fusion and hydration modify results in place, so callers do not share them
+    assert results[0][0] is not results[1][0]
+
+
+def test_errors_are_per_thread(make_client):
+    handler = FakeHandler(per_year=10)
+    client = make_client(handler)
+    client.search("q", 2000, 2000)
+
+    def failing_search():
+        handler.fail = RuntimeError("down")
+        client.search("other", 2000, 2000)
+        return client.errors
+
+    with ThreadPoolExecutor(1) as executor:
+        errors = executor.submit(failing_search).result()
+    assert isinstance(errors['Fake'], RuntimeError)
+    assert client.errors == {}